@@ -0,0 +1,139 @@
+# ============================================
+# FILE: agendador.py
+# Tarefas diárias fora do caminho das requisições
+#
+# A marca d'água (tabela tarefas_agendadas) garante no máximo uma
+# execução por dia, mesmo com vários processos. Pode rodar:
+#   - dentro do app: iniciar_agendador() cria uma thread diária;
+#   - via cron:      python agendador.py
+# ============================================
+
+import threading
+from datetime import date
+
+from database import get_connection
+import debitos
+
+INTERVALO_VERIFICACAO = 3600  # segundos entre verificações da thread
+
+TAREFAS = {
+    "marcar_parcelas_vencidas": debitos.atualizar_status_parcela_vencida,
+}
+
+_thread = None
+_parar = threading.Event()
+_lock = threading.Lock()
+
+
+# ============================================================
+# 🔖 Marca d'água
+# ============================================================
+
+def _reservar(nome, hoje):
+    """Grava hoje como última execução; False se a tarefa já rodou hoje."""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            INSERT INTO tarefas_agendadas (nome, ultima_execucao)
+            VALUES (%s, %s)
+            ON CONFLICT (nome) DO UPDATE
+            SET ultima_execucao = excluded.ultima_execucao
+            WHERE tarefas_agendadas.ultima_execucao IS NULL
+               OR tarefas_agendadas.ultima_execucao < excluded.ultima_execucao
+        """, (nome, hoje))
+
+        reservada = cursor.rowcount == 1
+        conn.commit()
+        conn.close()
+        return reservada
+
+    except Exception:
+        conn.rollback()
+        conn.close()
+        raise
+
+
+def _liberar(nome):
+    """Desfaz a reserva para a tarefa ser tentada de novo."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "UPDATE tarefas_agendadas SET ultima_execucao = NULL WHERE nome = %s",
+        (nome,),
+    )
+    conn.commit()
+    conn.close()
+
+
+# ============================================================
+# ▶️ Execução
+# ============================================================
+
+def executar_pendentes(hoje=None, forcar=False):
+    """
+    Executa as tarefas que ainda não rodaram hoje.
+    Retorna {nome: (sucesso, resultado)} das tarefas executadas.
+    """
+    hoje = hoje or date.today()
+    executadas = {}
+
+    for nome, funcao in TAREFAS.items():
+        if not forcar and not _reservar(nome, hoje):
+            continue
+
+        sucesso, resultado = funcao()
+        if not sucesso and not forcar:
+            _liberar(nome)
+
+        executadas[nome] = (sucesso, resultado)
+
+    return executadas
+
+
+def _laco(intervalo):
+    while not _parar.is_set():
+        try:
+            for nome, (sucesso, resultado) in executar_pendentes().items():
+                print(f"{'✔' if sucesso else '❌'} Tarefa {nome}: {resultado}")
+        except Exception as e:
+            print("❌ Erro no agendador:", e)
+
+        _parar.wait(intervalo)
+
+
+def iniciar_agendador(intervalo=INTERVALO_VERIFICACAO):
+    """Inicia (uma vez por processo) a thread que roda as tarefas diárias."""
+    global _thread
+
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _parar.clear()
+            _thread = threading.Thread(
+                target=_laco, args=(intervalo,), name="agendador-diario", daemon=True
+            )
+            _thread.start()
+
+    return _thread
+
+
+def parar_agendador():
+    _parar.set()
+
+
+# ============================================================
+# Execução direta (cron)
+# ============================================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Executa as tarefas diárias pendentes")
+    parser.add_argument("--forcar", action="store_true", help="Ignora a marca d'água do dia")
+    args = parser.parse_args()
+
+    executadas = executar_pendentes(forcar=args.forcar)
+    for nome, (sucesso, resultado) in executadas.items():
+        print(f"{'✔' if sucesso else '❌'} {nome}: {resultado}")
+    if not executadas:
+        print("Nenhuma tarefa pendente hoje.")
@@ -1,17 +1,17 @@
 # FILE: app.py
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta, date
-import sqlite3
-from database import POSTGRES_CONFIG
 
-# Importa módulos internos
+# Importa módulos internos: aqui só o necessário para inicializar e
+# para o login. Os demais (e pandas/numpy, que vêm com relatorios,
+# formatacao e parcelamento) são importados dentro de cada página:
+# o primeiro acesso não paga pelos relatórios que ninguém abriu.
+# benchmarks/bench_inicializacao.py mede o custo de import e da
+# primeira renderização de cada página.
 import database
 import auth
-import cadastros
-import debitos
-import creditos
-import relatorios
+import agendador
+import cache
 
 # -------------------------------------------------
 # Helpers para datas
@@ -32,6 +32,29 @@ def date_input_br(label: str, value: date, key: str) -> date:
     return parse_br_date(s, value)
 
 
+# -------------------------------------------------
+# Seções das páginas
+# -------------------------------------------------
+def secao_ativa(opcoes, key):
+    """
+    Seletor de seção no lugar de st.tabs: o st.tabs executa (e consulta
+    o banco para) todas as abas a cada rerun; aqui só a escolhida roda.
+    """
+    return st.radio(
+        "Seção", opcoes, horizontal=True, key=key, label_visibility="collapsed"
+    )
+
+
+# -------------------------------------------------
+# Tabelas
+# -------------------------------------------------
+def exibir_tabela(df, **colunas):
+    """st.dataframe com R$ e datas no formato brasileiro (formatacao.tabela)."""
+    import formatacao
+
+    st.dataframe(formatacao.tabela(df, **colunas), use_container_width=True, hide_index=True)
+
+
 # -------------------------------------------------
 # Configuração da página
 # -------------------------------------------------
@@ -42,8 +65,22 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# Inicializa banco
-database.init_database()
+# Inicializa banco e agendador — uma única vez por processo, não a cada rerun.
+# Um backend que só entra depois (PostgreSQL voltando, SQLite quando o
+# disjuntor abre) é migrado por database.get_connection no primeiro uso.
+@st.cache_resource(show_spinner=False)
+def inicializar_banco():
+    database.init_database()
+    agendador.iniciar_agendador()
+    return True
+
+
+try:
+    inicializar_banco()
+except database.BancoOcupado as e:
+    # Não fica em cache: o próximo rerun tenta de novo
+    st.error(f"⏳ {e}")
+    st.stop()
 
 # Inicializa sessão
 if "logged_in" not in st.session_state:
@@ -89,6 +126,8 @@ def login_page():
                     st.session_state.logged_in = True
                     st.session_state.user = user_data
                     st.rerun()
+                elif isinstance(user_data, str):
+                    st.error(user_data)
                 else:
                     st.error("Usuário ou senha incorretos!")
             else:
@@ -135,9 +174,11 @@ def logout():
 # Dashboard
 # -------------------------------------------------
 def pagina_dashboard():
-    st.title("📊 Dashboard Financeiro")
+    import debitos
+    import dinheiro
+    import relatorios
 
-    debitos.atualizar_status_parcela_vencida()
+    st.title("📊 Dashboard Financeiro")
 
     col1, col2 = st.columns(2)
     with col1:
@@ -145,23 +186,39 @@ def pagina_dashboard():
     with col2:
         data_fim = date_input_br("Data Fim", value=date.today(), key="dash_data_fim")
 
-    resumo = relatorios.get_resumo_financeiro(
-        st.session_state.user["id"], data_inicio, data_fim
+    # Período escolhido + comparativos: meses inteiros do resumo mensal,
+    # só as bordas de mês parcial somadas nos lançamentos
+    hoje = date.today()
+    fim_mes_anterior = hoje.replace(day=1) - timedelta(days=1)
+    resumo, resumo_mes_anterior, resumo_ano = relatorios.get_resumo_financeiro(
+        st.session_state.user["id"],
+        janelas=[
+            (data_inicio, data_fim),
+            (fim_mes_anterior.replace(day=1), fim_mes_anterior),
+            (hoje.replace(month=1, day=1), hoje),
+        ],
     )
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("💚 Total Créditos", f"R$ {resumo['total_creditos']:,.2f}")
+        st.metric("💚 Total Créditos", dinheiro.formatar(resumo['total_creditos']))
+    with col2:
+        st.metric("❤️ Total Débitos", dinheiro.formatar(resumo['total_debitos']))
+    with col3:
+        st.metric("💰 Saldo", dinheiro.formatar(resumo['saldo']))
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("⏳ Débitos em Aberto", dinheiro.formatar(resumo['debitos_em_aberto']))
     with col2:
-        st.metric("❤️ Total Débitos", f"R$ {resumo['total_debitos']:,.2f}")
+        st.metric("📆 Saldo do Mês Anterior", dinheiro.formatar(resumo_mes_anterior['saldo']))
     with col3:
-        st.metric("💰 Saldo", f"R$ {resumo['saldo']:,.2f}")
+        st.metric("🗓️ Saldo no Ano", dinheiro.formatar(resumo_ano['saldo']))
 
     st.divider()
 
     st.subheader("📅 Parcelas Próximas do Vencimento")
 
-    hoje = date.today()
     proximos_30 = hoje + timedelta(days=30)
 
     parcelas = debitos.listar_parcelas_debito(
@@ -169,13 +226,15 @@ def pagina_dashboard():
     )
 
     if parcelas:
+        import pandas as pd
+
         df = pd.DataFrame(parcelas)
         df = df[df["status_id"].isin([1, 3])]
         if not df.empty:
             df_display = df[["data_vencimento", "fornecedor_nome", "lancamento_descricao", "valor_parcela", "status_descricao"]].copy()
             df_display.columns = ["Vencimento", "Fornecedor", "Descrição", "Valor", "Status"]
-            df_display["Valor"] = df_display["Valor"].apply(lambda x: f"R$ {x:,.2f}")
-            st.dataframe(df_display, use_container_width=True, hide_index=True)
+            df_display["Valor"] = dinheiro.serie_para_centavos(df_display["Valor"])
+            exibir_tabela(df_display, colunas_moeda=["Valor"], colunas_data=["Vencimento"])
         else:
             st.info("Nenhuma parcela em aberto nos próximos 30 dias.")
     else:
@@ -186,11 +245,13 @@ def pagina_dashboard():
 # Fornecedores
 # -------------------------------------------------
 def pagina_fornecedores():
+    import cadastros
+
     st.title("🏢 Gestão de Fornecedores")
 
-    tab1, tab2 = st.tabs(["Lista de Fornecedores", "Cadastrar Novo"])
+    secao = secao_ativa(["Lista de Fornecedores", "Cadastrar Novo"], key="forn_secao")
 
-    with tab1:
+    if secao == "Lista de Fornecedores":
         fornecedores = cadastros.listar_fornecedores(st.session_state.user["id"])
         if fornecedores:
             for forn in fornecedores:
@@ -205,7 +266,7 @@ def pagina_fornecedores():
         else:
             st.info("Nenhum fornecedor cadastrado ainda.")
 
-    with tab2:
+    elif secao == "Cadastrar Novo":
         st.subheader("Cadastrar Novo Fornecedor")
 
         nome = st.text_input("Nome do Fornecedor *")
@@ -230,12 +291,15 @@ def pagina_fornecedores():
 # 🏧 Meios de Pagamento (cartões / PIX)
 # -------------------------------------------------
 def pagina_meios_pagamento():
+    import cadastros
+    import debitos
+
     st.title("🏧 Meios de Pagamento (Cartões / PIX)")
 
-    tab1, tab2 = st.tabs(["Meus Meios de Pagamento", "Cadastrar Novo"])
+    secao = secao_ativa(["Meus Meios de Pagamento", "Cadastrar Novo"], key="meios_secao")
 
     # LISTA
-    with tab1:
+    if secao == "Meus Meios de Pagamento":
         meios = cadastros.listar_meios_pagamento_usuario(
             st.session_state.user["id"],
             incluir_inativos=True
@@ -278,6 +342,10 @@ def pagina_meios_pagamento():
                     detalhes.append(f"Final: {ult}")
                 if chave_pix:
                     detalhes.append(f"Chave PIX: {chave_pix}")
+                if m.get("dia_fechamento") and m.get("dia_vencimento"):
+                    detalhes.append(
+                        f"Fatura: fecha dia {m['dia_fechamento']}, vence dia {m['dia_vencimento']}"
+                    )
 
                 with st.container():
                     st.markdown(f"<span class='{classe}'>{linha}</span>", unsafe_allow_html=True)
@@ -285,6 +353,34 @@ def pagina_meios_pagamento():
                         st.write(" • " + " | ".join(detalhes))
                     st.write(f"**Status:** {status_txt}")
 
+                    if ativo and m.get("tipo_pagamento") == "CARTAO_CREDITO":
+                        with st.expander("Fechamento e vencimento da fatura"):
+                            c1, c2 = st.columns(2)
+                            fech = c1.number_input(
+                                "Dia do fechamento", min_value=1, max_value=31,
+                                value=m.get("dia_fechamento") or 1,
+                                key=f"fechamento_meio_{m['id']}",
+                            )
+                            venc = c2.number_input(
+                                "Dia do vencimento", min_value=1, max_value=31,
+                                value=m.get("dia_vencimento") or 10,
+                                key=f"vencimento_meio_{m['id']}",
+                            )
+                            st.caption("As parcelas em aberto com vencimento pela fatura são recalculadas; datas escolhidas à mão não mudam.")
+                            if st.button("Salvar fatura", key=f"fatura_meio_{m['id']}"):
+                                ok, msg = cadastros.definir_regra_cartao(
+                                    m["id"], st.session_state.user["id"], int(fech), int(venc)
+                                )
+                                if ok:
+                                    ok, _, msg = debitos.recalcular_vencimentos_cartao(
+                                        st.session_state.user["id"], m["id"]
+                                    )
+                                if ok:
+                                    st.success(msg)
+                                    st.rerun()
+                                else:
+                                    st.error(msg)
+
                     if ativo:
                         if st.button("Desativar", key=f"desativar_meio_{m['id']}"):
                             ok, msg = cadastros.desativar_meio_pagamento(
@@ -324,7 +420,7 @@ def pagina_meios_pagamento():
                     render_meio(m)
 
     # CADASTRO
-    with tab2:
+    elif secao == "Cadastrar Novo":
         st.subheader("Cadastrar Novo Meio de Pagamento")
 
         tipo_map = {
@@ -347,9 +443,21 @@ def pagina_meios_pagamento():
         ultimos_digitos = None
         chave_pix = None
 
+        dia_fechamento = None
+        dia_vencimento = None
+
         if tipo_pagamento in ("CARTAO_CREDITO", "CARTAO_DEBITO"):
             bandeira_cartao = st.text_input("Bandeira do Cartão", help="Ex.: Visa, Master")
             ultimos_digitos = st.text_input("Últimos 4 dígitos", max_chars=4)
+            if tipo_pagamento == "CARTAO_CREDITO":
+                dia_fechamento = st.number_input(
+                    "Dia do fechamento da fatura", min_value=0, max_value=31, value=0,
+                    help="0 = não informado"
+                ) or None
+                dia_vencimento = st.number_input(
+                    "Dia do vencimento da fatura", min_value=0, max_value=31, value=0,
+                    help="0 = não informado"
+                ) or None
         elif tipo_pagamento == "PIX":
             chave_pix = st.text_input("Chave PIX (opcional)")
 
@@ -365,6 +473,8 @@ def pagina_meios_pagamento():
                     bandeira_cartao=bandeira_cartao if bandeira_cartao else None,
                     ultimos_digitos=ultimos_digitos if ultimos_digitos else None,
                     chave_pix=chave_pix if chave_pix else None,
+                    dia_fechamento=dia_fechamento,
+                    dia_vencimento=dia_vencimento,
                 )
                 if ok:
                     st.success(msg)
@@ -377,6 +487,11 @@ def pagina_meios_pagamento():
 # 💳 Lançamento de Débito (AJUSTADO)
 # -------------------------------------------------
 def pagina_lancamento_debito():
+    import cadastros
+    import debitos
+    import dinheiro
+    import parcelamento
+
     st.title("💳 Lançamento de Débito")
 
     fornecedores = cadastros.listar_fornecedores(st.session_state.user["id"])
@@ -474,10 +589,26 @@ def pagina_lancamento_debito():
         else:
             st.caption("📌 Esta forma de pagamento não permite parcelamento (será 1 parcela).")
 
+        # Cartão com fatura cadastrada: sugere o vencimento da fatura
+        if meio_selecionado and meio_selecionado.get("dia_fechamento") and meio_selecionado.get("dia_vencimento"):
+            sugestao = parcelamento.primeiro_vencimento_cartao(
+                date.today(),
+                meio_selecionado["dia_fechamento"],
+                meio_selecionado["dia_vencimento"],
+            )
+            chave_data = f"deb_data_primeira_{meio_selecionado['id']}"
+            st.caption(
+                f"💳 Fatura fecha dia {meio_selecionado['dia_fechamento']} "
+                f"e vence dia {meio_selecionado['dia_vencimento']}."
+            )
+        else:
+            sugestao = parcelamento.somar_meses(date.today(), 1)
+            chave_data = "deb_data_primeira"
+
         data_primeira = date_input_br(
             "Vencimento da 1ª Parcela",
-            value=date.today() + timedelta(days=30),
-            key="deb_data_primeira"
+            value=sugestao,
+            key=chave_data
         )
 
     observacoes = st.text_area("Observações")
@@ -500,14 +631,20 @@ def pagina_lancamento_debito():
                 bandeira_cartao_id=None,
                 data_primeira_parcela=data_primeira,
                 observacoes=observacoes_final,
+                meio_pagamento_id=meio_selecionado["id"] if meio_selecionado else None,
             )
 
             if success:
                 st.success(message)
 
                 if quantidade_parcelas > 1:
-                    valor_parcela = valor_total / quantidade_parcelas
-                    st.info(f"📌 Parcelado em {quantidade_parcelas}x de R$ {valor_parcela:,.2f}")
+                    valor_parcela, _ = parcelamento.dividir_centavos(
+                        dinheiro.centavos(valor_total), quantidade_parcelas
+                    )
+                    st.info(
+                        f"📌 Parcelado em {quantidade_parcelas}x de "
+                        f"{dinheiro.formatar(dinheiro.Centavos(valor_parcela))}"
+                    )
                 else:
                     st.info("📌 Lançado em parcela única.")
 
@@ -522,6 +659,9 @@ def pagina_lancamento_debito():
 # Lançamento de Crédito
 # -------------------------------------------------
 def pagina_lancamento_credito():
+    import cadastros
+    import creditos
+
     st.title("💰 Lançamento de Crédito")
 
     tipos_credito = cadastros.listar_tipos_credito()
@@ -565,13 +705,100 @@ def pagina_lancamento_credito():
             st.warning("Preencha os campos obrigatórios!")
 
 
+# -------------------------------------------------
+# Importar Extrato
+# -------------------------------------------------
+def pagina_importar_extrato():
+    import cadastros
+    import importacao
+
+    st.title("🏦 Importar Extrato")
+    st.caption(
+        "Arquivos OFX ou CSV do banco. Valores positivos viram créditos e "
+        "negativos viram débitos à vista já pagos; linhas já importadas são ignoradas."
+    )
+
+    usuario_id = st.session_state.user["id"]
+    tipos_credito = cadastros.listar_tipos_credito()
+    tipos_documento = cadastros.listar_tipos_documento()
+    fornecedores = cadastros.listar_fornecedores(usuario_id)
+
+    arquivo = st.file_uploader("Extrato *", type=["ofx", "csv", "txt"])
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        tipo_credito = st.selectbox(
+            "Tipo de Crédito padrão *",
+            options=tipos_credito,
+            format_func=lambda x: x["descricao"],
+        )
+    with col2:
+        fornecedor = st.selectbox(
+            "Fornecedor padrão",
+            options=[None] + fornecedores,
+            format_func=lambda x: "Pelo nome na descrição" if x is None else x["nome"],
+        )
+    with col3:
+        tipo_documento = st.selectbox(
+            "Tipo de Documento dos débitos *",
+            options=tipos_documento,
+            format_func=lambda x: x["descricao"],
+        )
+
+    texto_regras = st.text_area(
+        "Regras de crédito (uma por linha: TRECHO = Tipo de Crédito)",
+        placeholder="SALARIO = Salário",
+    )
+
+    if st.button("Importar", type="primary", disabled=arquivo is None):
+        tipos_por_nome = {importacao.normalizar_texto(t["descricao"]): t["id"] for t in tipos_credito}
+        regras = []
+        for linha in texto_regras.splitlines():
+            trecho, _, tipo = linha.partition("=")
+            tipo_credito_id = tipos_por_nome.get(importacao.normalizar_texto(tipo))
+            if trecho.strip() and tipo_credito_id:
+                regras.append({"contem": trecho.strip(), "tipo_credito_id": tipo_credito_id})
+            elif linha.strip():
+                st.warning(f"Regra ignorada: {linha}")
+
+        with st.spinner("Importando..."):
+            sucesso, relatorio = importacao.importar_extrato(
+                arquivo,
+                usuario_id,
+                tipo_credito_id=tipo_credito["id"] if tipo_credito else None,
+                fornecedor_id=fornecedor["id"] if fornecedor else None,
+                tipo_documento_id=tipo_documento["id"] if tipo_documento else None,
+                regras=regras,
+                nome_arquivo=arquivo.name,
+            )
+
+        if sucesso:
+            st.success("Extrato importado!")
+        else:
+            st.error("Nada foi importado.")
+
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Linhas lidas", relatorio["lidas"])
+        c2.metric("Créditos", relatorio["creditos"])
+        c3.metric("Débitos", relatorio["debitos"])
+        c4.metric("Já importadas", relatorio["duplicadas"])
+
+        if relatorio["erros"]:
+            import pandas as pd
+
+            st.warning(f"{len(relatorio['erros'])} linha(s) com erro")
+            exibir_tabela(pd.DataFrame(relatorio["erros"], columns=["Linha", "Erro"]))
+
+
 # -------------------------------------------------
 # Gestão de Parcelas
 # -------------------------------------------------
 def pagina_gestao_parcelas():
-    st.title("📝 Gestão de Parcelas")
+    import cadastros
+    import debitos
+    import dinheiro
 
-    debitos.atualizar_status_parcela_vencida()
+    st.title("📝 Gestão de Parcelas")
 
     col1, col2, col3 = st.columns(3)
 
@@ -627,7 +854,7 @@ def pagina_gestao_parcelas():
                 key="gest_parc_fim"
             )
 
-    parcelas = debitos.listar_parcelas_debito(
+    filtros = dict(
         usuario_id=st.session_state.user["id"],
         fornecedor_id=fornecedor["id"] if fornecedor else None,
         status_id=status["id"] if status else None,
@@ -635,8 +862,80 @@ def pagina_gestao_parcelas():
         data_fim=data_fim,
     )
 
+    tamanho_pagina = st.selectbox(
+        "Parcelas por página", [25, 50, 100],
+        index=1, key="parc_tamanho_pagina"
+    )
+
+    # Pilha de cursores (data_vencimento, id): o topo é o início da página atual.
+    # Qualquer mudança de filtro ou tamanho volta para a primeira página.
+    chave_filtros = (tuple(sorted(filtros.items())), tamanho_pagina)
+    if st.session_state.get("parc_chave_filtros") != chave_filtros:
+        st.session_state.parc_chave_filtros = chave_filtros
+        st.session_state.parc_cursores = [None]
+
+    cursores = st.session_state.parc_cursores
+
+    resumo = debitos.resumir_parcelas_debito(**filtros)
+    parcelas, proximo_cursor = debitos.listar_parcelas_debito_pagina(
+        **filtros, apos=cursores[-1], tamanho_pagina=tamanho_pagina
+    )
+
+    if not parcelas and len(cursores) > 1:
+        # A página ficou vazia (ex.: baixas com filtro de status): volta ao início
+        st.session_state.parc_cursores = [None]
+        st.rerun()
+
     if parcelas:
-        st.write(f"**Total de parcelas encontradas:** {len(parcelas)}")
+        total_paginas = max(1, -(-resumo["total"] // tamanho_pagina))
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Parcelas encontradas", resumo["total"])
+        col2.metric("Valor total", dinheiro.formatar(resumo['valor_total']))
+        col3.metric("Em aberto", dinheiro.formatar(resumo['valor_em_aberto']))
+
+        col_ant, col_pag, col_prox = st.columns([1, 2, 1])
+        with col_ant:
+            if st.button("◀ Anterior", disabled=len(cursores) == 1, key="parc_anterior"):
+                cursores.pop()
+                st.rerun()
+        with col_pag:
+            st.write(f"Página {len(cursores)} de {total_paginas}")
+        with col_prox:
+            if st.button("Próxima ▶", disabled=proximo_cursor is None, key="parc_proxima"):
+                cursores.append(proximo_cursor)
+                st.rerun()
+
+        # Baixa em lote
+        abertas = {p["id"]: p for p in parcelas if p["status_id"] in (1, 3)}
+        if abertas:
+            lote = st.session_state.get("lote_baixa", 0)
+            selecionadas = st.multiselect(
+                "Selecionar parcelas para baixa",
+                options=list(abertas.keys()),
+                format_func=lambda pid: (
+                    f"{abertas[pid]['fornecedor_nome']} – {abertas[pid]['lancamento_descricao']} "
+                    f"{abertas[pid]['numero_parcela']}/{abertas[pid]['quantidade_parcelas']} – "
+                    f"venc. {format_br_date(abertas[pid]['data_vencimento'])} – "
+                    f"{dinheiro.formatar(abertas[pid]['valor_parcela'])}"
+                ),
+                key=f"parcelas_selecionadas_{lote}",
+            )
+
+            if st.button("Baixar selecionadas", type="primary", disabled=not selecionadas):
+                success, resultados = debitos.baixar_parcelas(
+                    selecionadas, st.session_state.user["id"]
+                )
+                falhas = [msg for ok, msg in resultados.values() if not ok]
+                if success and not falhas:
+                    st.success(f"{len(resultados)} parcela(s) baixada(s) com sucesso!")
+                    st.session_state.lote_baixa = lote + 1
+                    st.rerun()
+                else:
+                    for msg in dict.fromkeys(falhas):
+                        st.error(msg)
+
+            st.divider()
 
         for p in parcelas:
             col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
@@ -646,8 +945,8 @@ def pagina_gestao_parcelas():
                 st.write(f"{p['lancamento_descricao']} - Parcela {p['numero_parcela']}/{p['quantidade_parcelas']}")
 
             with col2:
-                st.write(f"**Vencimento:** {p['data_vencimento']}")
-                st.write(f"**Valor:** R$ {p['valor_parcela']:,.2f}")
+                st.write(f"**Vencimento:** {format_br_date(p['data_vencimento'])}")
+                st.write(f"**Valor:** {dinheiro.formatar(p['valor_parcela'])}")
 
             with col3:
                 st.markdown(
@@ -674,16 +973,88 @@ def pagina_gestao_parcelas():
         st.info("Nenhuma parcela encontrada.")
 
 
+# -------------------------------------------------
+# Cache dos relatórios
+# -------------------------------------------------
+# "versao" (cache.versao_dados) faz parte da chave: qualquer escrita do
+# usuário em débitos/créditos gera uma chave nova, sem depender de TTL curto.
+# O TTL só limpa entradas de versões antigas.
+@st.cache_data(max_entries=256, ttl=3600, show_spinner=False)
+def relatorio_conta_corrente(usuario_id, data_inicio, data_fim, fornecedor_id, versao):
+    import relatorios
+
+    return relatorios.gerar_relatorio_conta_corrente(
+        usuario_id, data_inicio, data_fim, fornecedor_id
+    )
+
+
+@st.cache_data(max_entries=256, ttl=3600, show_spinner=False)
+def relatorio_mensal_debitos(usuario_id, ano, mes, versao):
+    import relatorios
+
+    return relatorios.gerar_relatorio_mensal_debitos(usuario_id, ano, mes)
+
+
+@st.cache_data(max_entries=256, ttl=3600, show_spinner=False)
+def relatorio_por_fornecedor(usuario_id, fornecedor_id, data_inicio, data_fim, versao):
+    import relatorios
+
+    return relatorios.gerar_relatorio_por_fornecedor(
+        usuario_id, fornecedor_id, data_inicio, data_fim
+    )
+
+
+@st.cache_data(max_entries=64, ttl=3600, show_spinner=False)
+def arquivo_exportacao(relatorio, formato, usuario_id, filtros, versao):
+    import exportacao
+
+    return exportacao.exportar(relatorio, formato, usuario_id, **filtros)
+
+
+def botoes_exportacao(relatorio, chave, **filtros):
+    """Formato + botão que gera (ou reaproveita do cache) o arquivo para download."""
+    import exportacao
+
+    usuario_id = st.session_state.user["id"]
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        formato = st.selectbox(
+            "Exportar como",
+            options=list(exportacao.FORMATOS),
+            format_func=lambda f: exportacao.FORMATOS[f][0],
+            key=f"{chave}_formato",
+        )
+    with col2:
+        preparar = st.button("Preparar arquivo", key=f"{chave}_preparar")
+
+    if preparar:
+        dados = arquivo_exportacao(
+            relatorio, formato, usuario_id, filtros, cache.versao_dados(usuario_id)
+        )
+        st.download_button(
+            "⬇️ Baixar arquivo",
+            data=dados,
+            file_name=exportacao.nome_arquivo(relatorio, formato),
+            mime=exportacao.FORMATOS[formato][1],
+            on_click="ignore",
+            key=f"{chave}_baixar",
+        )
+
+
 # -------------------------------------------------
 # Relatórios
 # -------------------------------------------------
 def pagina_relatorios():
+    import cadastros
+    import dinheiro
+
     st.title("📈 Relatórios Financeiros")
 
-    tab1, tab2, tab3 = st.tabs(["Conta Corrente", "Mensal", "Por Fornecedor"])
+    secao = secao_ativa(["Conta Corrente", "Mensal", "Por Fornecedor"], key="rel_secao")
 
-    # TAB 1 – Extrato
-    with tab1:
+    # Conta corrente (extrato)
+    if secao == "Conta Corrente":
         st.subheader("Extrato Tipo Conta Corrente")
 
         col1, col2 = st.columns(2)
@@ -707,25 +1078,35 @@ def pagina_relatorios():
         )
 
         if st.button("Gerar Relatório", key="btn_rel1"):
-            df = relatorios.gerar_relatorio_conta_corrente(
+            df = relatorio_conta_corrente(
                 st.session_state.user["id"],
                 data_inicio,
                 data_fim,
                 fornecedor["id"] if fornecedor else None,
+                cache.versao_dados(st.session_state.user["id"]),
             )
 
-            if not df.empty:
-                df_display = df.copy()
-                df_display["credito"] = df_display["credito"].apply(lambda x: f"R$ {x:,.2f}" if x > 0 else "")
-                df_display["debito"] = df_display["debito"].apply(lambda x: f"R$ {x:,.2f}" if x > 0 else "")
-                df_display["saldo"] = df_display["saldo"].apply(lambda x: f"R$ {x:,.2f}")
+            st.caption(f"Saldo anterior ao período: {dinheiro.formatar(df.attrs.get('saldo_anterior', 0))}")
 
-                st.dataframe(df_display, use_container_width=True, hide_index=True)
+            if not df.empty:
+                exibir_tabela(
+                    df,
+                    colunas_moeda=["valor", "saldo"],
+                    colunas_moeda_sem_zero=["credito", "debito"],
+                    colunas_data=["data"],
+                )
             else:
                 st.info("Sem dados no período.")
 
-    # TAB 2 – Mensal
-    with tab2:
+        botoes_exportacao(
+            "conta_corrente", "rel1",
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            fornecedor_id=fornecedor["id"] if fornecedor else None,
+        )
+
+    # Mensal
+    elif secao == "Mensal":
         st.subheader("Relatório Mensal de Débitos")
 
         col1, col2 = st.columns(2)
@@ -743,18 +1124,24 @@ def pagina_relatorios():
             )
 
         if st.button("Gerar Relatório", key="btn_rel_mensal"):
-            df = relatorios.gerar_relatorio_mensal_debitos(
-                st.session_state.user["id"], ano, mes
+            df = relatorio_mensal_debitos(
+                st.session_state.user["id"], ano, mes,
+                cache.versao_dados(st.session_state.user["id"]),
             )
 
             if not df.empty:
-                df["valor_parcela"] = df["valor_parcela"].apply(lambda x: f"R$ {x:,.2f}")
-                st.dataframe(df, use_container_width=True, hide_index=True)
+                exibir_tabela(
+                    df,
+                    colunas_moeda=["valor_parcela", "valor_pago"],
+                    colunas_data=["data_vencimento", "data_pagamento"],
+                )
             else:
                 st.info("Nenhum débito encontrado no mês.")
 
-    # TAB 3 – Por fornecedor
-    with tab3:
+        botoes_exportacao("mensal_debitos", "rel_mensal", ano=int(ano), mes=mes)
+
+    # Por fornecedor
+    elif secao == "Por Fornecedor":
         st.subheader("Relatório por Fornecedor")
 
         fornecedores = cadastros.listar_fornecedores(st.session_state.user["id"])
@@ -789,11 +1176,12 @@ def pagina_relatorios():
                     )
 
             if st.button("Gerar", key="btn_rel3"):
-                relatorio = relatorios.gerar_relatorio_por_fornecedor(
+                relatorio = relatorio_por_fornecedor(
                     st.session_state.user["id"],
                     fornecedor["id"],
                     data_inicio_forn,
                     data_fim_forn,
+                    cache.versao_dados(st.session_state.user["id"]),
                 )
 
                 if relatorio:
@@ -817,11 +1205,20 @@ def pagina_relatorios():
                     st.divider()
 
                     if not relatorio["parcelas"].empty:
-                        df = relatorio["parcelas"].copy()
-                        df["valor_parcela"] = df["valor_parcela"].apply(lambda x: f"R$ {x:,.2f}")
-                        st.dataframe(df, use_container_width=True, hide_index=True)
+                        exibir_tabela(
+                            relatorio["parcelas"],
+                            colunas_moeda=["valor_parcela", "valor_pago"],
+                            colunas_data=["data_vencimento", "data_pagamento"],
+                        )
                 else:
                     st.error("Fornecedor não encontrado.")
+
+            botoes_exportacao(
+                "por_fornecedor", "rel3",
+                fornecedor_id=fornecedor["id"],
+                data_inicio=data_inicio_forn,
+                data_fim=data_fim_forn,
+            )
         else:
             st.info("Nenhum fornecedor cadastrado.")
 
@@ -847,6 +1244,7 @@ def main():
                     "Meios de Pagamento",
                     "Lançar Débito",
                     "Lançar Crédito",
+                    "Importar Extrato",
                     "Gestão de Parcelas",
                     "Relatórios",
                 ],
@@ -868,6 +1266,8 @@ def main():
             pagina_lancamento_debito()
         elif menu_option == "Lançar Crédito":
             pagina_lancamento_credito()
+        elif menu_option == "Importar Extrato":
+            pagina_importar_extrato()
         elif menu_option == "Gestão de Parcelas":
             pagina_gestao_parcelas()
         elif menu_option == "Relatórios":
@@ -875,4 +1275,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except database.BancoOcupado as e:
+        # Pool do PostgreSQL esgotado: avisa em vez de cair no SQLite
+        st.error(f"⏳ {e}")
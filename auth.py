@@ -3,14 +3,110 @@
 # Autenticação e Cadastro de Usuários
 # ============================================
 
-from database import get_connection
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from database import get_connection, carregar_secrets
 import bcrypt
 
+# --------------------------------------------
+# ⚙️ Configuração do bcrypt
+# --------------------------------------------
+# Opcional no secrets.toml:
+#   [auth]
+#   bcrypt_rounds = 12   # custo; cada +1 dobra o tempo de um hash
+#   hash_workers = 2     # hashes/verificações em paralelo
+#   hash_fila = 32       # pedidos aguardando um worker (acima disso recusa)
+BCRYPT_ROUNDS_PADRAO = 12
+BCRYPT_ROUNDS_MINIMO = 4
+BCRYPT_ROUNDS_MAXIMO = 16
+HASH_WORKERS_PADRAO = min(4, os.cpu_count() or 1)
+HASH_FILA_PADRAO = 32
+HASH_ESPERA = 10  # segundos aguardando vaga na fila
+
+
+def _config_auth():
+    config = carregar_secrets("auth") or {}
+    rounds = int(config.get("bcrypt_rounds", BCRYPT_ROUNDS_PADRAO))
+    return {
+        "rounds": min(max(rounds, BCRYPT_ROUNDS_MINIMO), BCRYPT_ROUNDS_MAXIMO),
+        "workers": max(int(config.get("hash_workers", HASH_WORKERS_PADRAO)), 1),
+        "fila": max(int(config.get("hash_fila", HASH_FILA_PADRAO)), 0),
+    }
+
+
+_config = _config_auth()
+BCRYPT_ROUNDS = _config["rounds"]
+
+
+class ServidorOcupado(RuntimeError):
+    """Fila de hashes cheia: muitos logins/cadastros ao mesmo tempo."""
+
+
+# --------------------------------------------
+# 🧵 Pool de hashing
+# --------------------------------------------
+# O bcrypt libera o GIL, então threads bastam. O pool limita quantos
+# hashes rodam juntos (uma rajada de logins não disputa todos os
+# núcleos com o resto do app) e a fila limita quantos esperam.
+_executor = None
+_vagas = None
+_lock_pool = threading.Lock()
+
+
+def _pool():
+    global _executor, _vagas
+    with _lock_pool:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_config["workers"], thread_name_prefix="bcrypt"
+            )
+            _vagas = threading.BoundedSemaphore(_config["workers"] + _config["fila"])
+        return _executor, _vagas
+
+
+def configurar_hash(rounds=None, workers=None, fila=None):
+    """Troca custo e tamanho do pool em tempo de execução (ex.: benchmark)."""
+    global _executor, BCRYPT_ROUNDS
+    with _lock_pool:
+        if rounds is not None:
+            BCRYPT_ROUNDS = min(max(int(rounds), BCRYPT_ROUNDS_MINIMO), BCRYPT_ROUNDS_MAXIMO)
+        if workers is not None:
+            _config["workers"] = max(int(workers), 1)
+        if fila is not None:
+            _config["fila"] = max(int(fila), 0)
+        antigo, _executor = _executor, None
+
+    if antigo is not None:
+        antigo.shutdown(wait=True)
+
+
+def _executar(funcao, *args):
+    """Roda funcao no pool e espera o resultado."""
+    executor, vagas = _pool()
+    if not vagas.acquire(timeout=HASH_ESPERA):
+        raise ServidorOcupado("Muitos acessos ao mesmo tempo. Tente novamente em instantes.")
+    try:
+        return executor.submit(funcao, *args).result()
+    finally:
+        vagas.release()
+
+
+def _agendar(funcao, *args):
+    """Roda funcao no pool sem esperar; descarta se a fila estiver cheia."""
+    executor, vagas = _pool()
+    if not vagas.acquire(blocking=False):
+        return False
+    executor.submit(funcao, *args).add_done_callback(lambda _: vagas.release())
+    return True
+
+
 # --------------------------------------------
 # 🔑 Criar hash da senha
 # --------------------------------------------
-def hash_password(password: str) -> str:
-    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+def hash_password(password: str, rounds: int = None) -> str:
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds or BCRYPT_ROUNDS))
     return hashed.decode('utf-8')
 
 # --------------------------------------------
@@ -19,6 +115,40 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+# --------------------------------------------
+# 🔁 Custo do hash e atualização no login
+# --------------------------------------------
+def custo_hash(hashed: str):
+    """Custo gravado no hash ("$2b$12$..." -> 12), ou None se ilegível."""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+def _rehash(usuario_id, password, hash_antigo):
+    novo = hash_password(password)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        # Só troca se ninguém alterou a senha nesse meio tempo
+        cursor.execute(
+            """
+            UPDATE usuarios SET password_hash = %(novo)s
+            WHERE id = %(id)s AND password_hash = %(antigo)s
+            """,
+            {"novo": novo, "id": usuario_id, "antigo": hash_antigo}
+        )
+        conn.commit()
+        conn.close()
+
+    except Exception as e:
+        conn.rollback()
+        conn.close()
+        print(f"⚠️ Falha ao atualizar o hash do usuário {usuario_id}: {e}")
+
 # --------------------------------------------
 # 👤 Autenticar usuário
 # --------------------------------------------
@@ -39,7 +169,11 @@ def authenticate_user(username, password):
         user = cursor.fetchone()
         conn.close()
 
-        if user and verify_password(password, user["password_hash"]):
+        if user and _executar(verify_password, password, user["password_hash"]):
+            # Custo mudou na configuração: regrava o hash em segundo plano
+            if custo_hash(user["password_hash"]) != BCRYPT_ROUNDS:
+                _agendar(_rehash, user["id"], password, user["password_hash"])
+
             return True, {
                 "id": user["id"],
                 "username": user["username"],
@@ -49,6 +183,9 @@ def authenticate_user(username, password):
 
         return False, None
 
+    except ServidorOcupado as e:
+        return False, str(e)
+
     except Exception as e:
         conn.close()
         return False, f"Erro na autenticação: {str(e)}"
@@ -57,6 +194,13 @@ def authenticate_user(username, password):
 # 🆕 Criar novo usuário (RETORNO PADRONIZADO)
 # --------------------------------------------
 def create_user(username, password, nome_completo, email):
+    # Hash antes de pegar a conexão: não prende uma conexão do pool
+    # enquanto o bcrypt trabalha
+    try:
+        hashed = _executar(hash_password, password)
+    except ServidorOcupado as e:
+        return False, None, str(e)
+
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -71,8 +215,6 @@ def create_user(username, password, nome_completo, email):
             conn.close()
             return False, None, "Usuário já existe."
 
-        hashed = hash_password(password)
-
         cursor.execute(
             """
             INSERT INTO usuarios (username, password_hash, nome_completo, email)
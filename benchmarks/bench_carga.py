@@ -0,0 +1,462 @@
+# ============================================
+# FILE: benchmarks/bench_carga.py
+# Teste de carga: N sessões simultâneas do app num único processo,
+# como num servidor Streamlit. Cada sessão usa um usuário sintético
+# e percorre login -> Dashboard -> Gestão de Parcelas -> Relatórios.
+#
+# Por nível de concorrência:
+#   - latência dos reruns concluídos (p50/p95/máx), reruns por segundo
+#     e taxa de reruns com erro (que ficam fora dos tempos e médias);
+#   - idas ao banco por rerun (execute/commit/rollback, incluindo o
+#     ROLLBACK que o pool do PostgreSQL faz na devolução);
+#   - conexões emprestadas do pool e conexões físicas abertas por rerun;
+#   - esgotamentos do pool e quedas para o SQLite.
+#
+# As sessões são AppTest (streamlit.testing) em threads. Elas
+# compartilham módulos, pool, caches (st.cache_data, cadastros) e
+# agendador, como num servidor. Fica de fora o websocket: a latência
+# inclui a montagem da árvore de elementos do AppTest, e não a
+# serialização para o navegador.
+#
+# Cada nível usa usuários próprios, para começar com os caches frios.
+#
+# Uso (banco descartável!):
+#   python benchmarks/bench_carga.py --sqlite /tmp/carga.db
+#   python benchmarks/bench_carga.py --dsn "host=localhost dbname=bench" --sessoes 1,10,50
+# ============================================
+
+import argparse
+import os
+import threading
+import time
+
+import dados_sinteticos
+import database
+import auth
+
+from psycopg2 import extensions as pg_extensions
+from psycopg2 import pool as pg_pool
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(RAIZ, "app.py")
+
+SENHA = "senha-carga"
+CHAVE_SESSAO = "bench_carga_sessao"
+TENTATIVAS_LOGIN = 5  # a fila do bcrypt recusa logins além da espera; o usuário tenta de novo
+
+
+# ============================================================
+# 🧭 Roteiro de cada sessão
+# ============================================================
+
+def _menu(pagina):
+    return lambda at: at.radio(key="menu_option").set_value(pagina).run()
+
+
+def _secao(secao):
+    return lambda at: at.radio(key="rel_secao").set_value(secao).run()
+
+
+def _clicar(chave):
+    return lambda at: at.button(key=chave).click().run()
+
+
+# (rótulo, interação); cada interação é um rerun
+ROTEIRO = [
+    ("Dashboard", _menu("Dashboard")),
+    ("Gestão de Parcelas", _menu("Gestão de Parcelas")),
+    ("Gestão: próxima página", _clicar("parc_proxima")),
+    ("Relatórios", _menu("Relatórios")),
+    ("Conta Corrente", _secao("Conta Corrente")),
+    ("Conta Corrente: gerar", _clicar("btn_rel1")),
+    ("Mensal", _secao("Mensal")),
+    ("Mensal: gerar", _clicar("btn_rel_mensal")),
+    ("Por Fornecedor", _secao("Por Fornecedor")),
+    ("Por Fornecedor: gerar", _clicar("btn_rel3")),
+]
+
+
+def _entrar(at, username):
+    at.text_input(key="login_username").input(username)
+    at.text_input(key="login_password").input(SENHA)
+    next(b for b in at.button if b.label == "Entrar").click().run()
+    if not at.session_state.logged_in:
+        motivo = at.error[0].value if len(at.error) else "sem mensagem"
+        raise RuntimeError(f"login recusado ({motivo})")
+
+
+# ============================================================
+# 🔢 Contagem de acessos ao banco por sessão
+# ============================================================
+# Cada rerun roda numa thread de script própria; a sessão é
+# identificada pela chave CHAVE_SESSAO do session_state, lida uma
+# vez por thread. Só a thread da sessão incrementa os seus contadores.
+
+_contagens = {}  # sessão -> {"idas": n, "emprestimos": n, "conexoes": n}
+_local = threading.local()
+
+
+def _contagem_atual():
+    if not hasattr(_local, "contagem"):
+        from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+
+        ctx = get_script_run_ctx(suppress_warning=True)
+        sessao = ctx.session_state.filtered_state.get(CHAVE_SESSAO) if ctx else None
+        _local.contagem = _contagens.get(sessao)
+    return _local.contagem
+
+
+def _contar(campo, quantidade=1):
+    contagem = _contagem_atual()
+    if contagem is not None:
+        contagem[campo] += quantidade
+
+
+class _CursorContado:
+    """Cursor que conta execute/executemany como idas ao banco."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, *args, **kwargs):
+        _contar("idas")
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        _contar("idas")
+        return self._cursor.executemany(*args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+
+def instrumentar():
+    """Envolve pool, conexões e cursores de database.py com os contadores."""
+    cursor_original = database.ConexaoPool.cursor
+    commit_original = database.ConexaoPool.commit
+    rollback_original = database.ConexaoPool.rollback
+
+    def cursor(self, *args, **kwargs):
+        return _CursorContado(cursor_original(self, *args, **kwargs))
+
+    def commit(self):
+        _contar("idas")
+        commit_original(self)
+
+    def rollback(self):
+        _contar("idas")
+        rollback_original(self)
+
+    database.ConexaoPool.cursor = cursor
+    database.ConexaoPool.commit = commit
+    database.ConexaoPool.rollback = rollback
+
+    # PostgreSQL: conexão física nova e ROLLBACK implícito na devolução
+    conectar_original = pg_pool.AbstractConnectionPool._connect
+    devolver_pg_original = database._PoolPostgres.devolver
+    obter_pg_original = database._PoolPostgres.obter
+
+    def conectar(self, *args, **kwargs):
+        _contar("conexoes")
+        return conectar_original(self, *args, **kwargs)
+
+    def devolver_pg(self, conn, registro=None):
+        if not conn.closed and conn.info.transaction_status != pg_extensions.TRANSACTION_STATUS_IDLE:
+            _contar("idas")
+        devolver_pg_original(self, conn, registro)
+
+    def obter_pg(self):
+        _contar("emprestimos")
+        return obter_pg_original(self)
+
+    pg_pool.AbstractConnectionPool._connect = conectar
+    database._PoolPostgres.devolver = devolver_pg
+    database._PoolPostgres.obter = obter_pg
+
+    # SQLite: uma conexão por thread; conta quando a thread ganha uma nova
+    obter_sqlite_original = database._PoolSQLite.obter
+
+    def obter_sqlite(self):
+        anterior = getattr(self._local, "registro", None)
+        conn = obter_sqlite_original(self)
+        _contar("emprestimos")
+        if self._local.registro is not anterior:
+            _contar("conexoes")
+        if database.POSTGRES_CONFIG:
+            _contar("quedas_sqlite")
+        return conn
+
+    database._PoolSQLite.obter = obter_sqlite
+
+
+# ============================================================
+# 🔧 AppTest em paralelo
+# ============================================================
+
+def preparar_apptest():
+    """
+    O AppTest foi feito para um teste por vez. Ajustes para sessões
+    em paralelo, mais próximas de um servidor:
+      - a cada run ele troca Runtime._instance e, no fim, o zera (uma
+        sessão apagaria o runtime da outra): todas usam um runtime
+        simulado único;
+      - cada run compila o app.py de novo num ScriptCache próprio (e
+        compilar em várias threads ao mesmo tempo quebra o ast no
+        Python 3.11): um ScriptCache compartilhado, como no servidor;
+      - um st.rerun() no meio do script (login, paginação) deixa na
+        árvore do AppTest os elementos da execução interrompida, e o
+        run seguinte procura widgets que não existem mais: a fila de
+        mensagens é limpa a cada início de execução, como o navegador
+        descarta os elementos antigos;
+      - a espera pelo fim do script checa a cada 1 ms: espera a thread
+        terminar, para 50 sessões não disputarem a CPU só verificando;
+      - cada run liga global.appTest com um patch do config que outra
+        sessão desfaz no meio (os widgets deixam de registrar o
+        format_func e o run seguinte dá KeyError): a opção é ligada
+        uma vez para o processo todo.
+    """
+    import contextlib
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.scriptrunner.script_runner import ScriptRunnerEvent
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+
+    class _RuntimeDoAppTest:
+        _instance = None  # o AppTest escreve aqui, não no Runtime real
+
+    app_test.Runtime = _RuntimeDoAppTest
+
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+    def aguardar_script(runner, timeout=3):
+        inicio = time.monotonic()
+        while runner._script_thread is None and time.monotonic() - inicio < timeout:
+            time.sleep(0.001)
+        if runner._script_thread is not None:
+            runner._script_thread.join(max(0, timeout - (time.monotonic() - inicio)))
+        if not runner.script_stopped():
+            runner.request_stop()
+            runner.join()
+            raise RuntimeError(f"AppTest script run timed out after {timeout}(s)")
+
+    local_script_runner.require_widgets_deltas = aguardar_script
+
+    iniciar_runner = local_script_runner.LocalScriptRunner.__init__
+
+    def iniciar_runner_limpando(self, *args, **kwargs):
+        iniciar_runner(self, *args, **kwargs)
+
+        def limpar(_sender, event, **_dados):
+            if event == ScriptRunnerEvent.SCRIPT_STARTED:
+                self.forward_msg_queue.clear()
+
+        self.on_event.connect(limpar, weak=False)
+
+    local_script_runner.LocalScriptRunner.__init__ = iniciar_runner_limpando
+
+    def opcoes_do_processo(opcoes):
+        for nome, valor in opcoes.items():
+            config.set_option(nome, valor)
+        return contextlib.nullcontext()
+
+    app_test.patch_config_options = opcoes_do_processo
+
+
+# ============================================================
+# 🏃 Sessões
+# ============================================================
+
+def _rerun(at, sessao, rotulo, interacao, medicoes):
+    contagem = _contagens[sessao]
+    for campo in contagem:
+        contagem[campo] = 0
+
+    inicio = time.perf_counter()
+    try:
+        interacao(at)
+        erro = at.exception[0].value if len(at.exception) else None
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+    tempo = (time.perf_counter() - inicio) * 1000
+
+    medicoes.append({"rotulo": rotulo, "ms": tempo, "erro": erro, **contagem})
+    return erro is None
+
+
+def sessao(sessao_id, username, ciclos, pausa, barreira, medicoes):
+    from streamlit.testing.v1 import AppTest
+
+    _contagens[sessao_id] = {"idas": 0, "emprestimos": 0, "conexoes": 0, "quedas_sqlite": 0}
+    at = AppTest.from_file(APP, default_timeout=600)
+    at.session_state[CHAVE_SESSAO] = sessao_id
+    barreira.wait()
+
+    if not _rerun(at, sessao_id, "Login (tela)", lambda at: at.run(), medicoes):
+        return
+    for _ in range(TENTATIVAS_LOGIN):
+        if _rerun(at, sessao_id, "Login", lambda at: _entrar(at, username), medicoes):
+            break
+    else:
+        return
+
+    for _ in range(ciclos):
+        for rotulo, interacao in ROTEIRO:
+            time.sleep(pausa)
+            _rerun(at, sessao_id, rotulo, interacao, medicoes)
+
+
+def medir_nivel(usernames, ciclos, pausa):
+    medicoes = []
+    barreira = threading.Barrier(len(usernames) + 1)
+    threads = [
+        threading.Thread(target=sessao, args=(i, u, ciclos, pausa, barreira, medicoes))
+        for i, u in enumerate(usernames)
+    ]
+    for t in threads:
+        t.start()
+
+    pool_antes = database.estatisticas_pool()["postgres"] or {}
+    barreira.wait()
+    inicio = time.perf_counter()
+    for t in threads:
+        t.join()
+    total = time.perf_counter() - inicio
+    pool_depois = database.estatisticas_pool()["postgres"] or {}
+
+    esgotamentos = pool_depois.get("esgotamentos", 0) - pool_antes.get("esgotamentos", 0)
+    return medicoes, total, esgotamentos
+
+
+# ============================================================
+# 📋 Relatório
+# ============================================================
+
+def _percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def _media(medicoes, campo):
+    return sum(m[campo] for m in medicoes) / len(medicoes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga com sessões simultâneas")
+    dados_sinteticos.adicionar_argumentos_banco(parser)
+    parser.add_argument("--sessoes", default="1,10,50",
+                        help="Níveis de concorrência separados por vírgula")
+    parser.add_argument("--ciclos", type=int, default=2, help="Voltas no roteiro por sessão")
+    parser.add_argument("--pausa", type=float, default=0.0,
+                        help="Segundos entre as interações de uma sessão (tempo de leitura)")
+    parser.add_argument("--parcelas", type=int, default=2_000, help="Parcelas por usuário")
+    parser.add_argument("--pool-max", type=int, help="Tamanho máximo do pool do PostgreSQL")
+    parser.add_argument("--rounds", type=int, default=auth.BCRYPT_ROUNDS, help="Custo do bcrypt")
+    args = parser.parse_args()
+
+    niveis = [int(n) for n in args.sessoes.split(",")]
+
+    dados_sinteticos.configurar_banco(args.dsn, args.sqlite)
+    if args.dsn and args.pool_max:
+        database.POSTGRES_CONFIG["pool_max"] = args.pool_max
+        database.fechar_pool()
+    auth.configurar_hash(rounds=args.rounds)
+
+    prefixo = f"bench_carga_{int(time.time())}"
+    usuario_ids = dados_sinteticos.popular(
+        usuarios=sum(niveis),
+        parcelas=args.parcelas * sum(niveis),
+        senha_hash=auth.hash_password(SENHA),
+        prefixo_usuario=prefixo,
+    )
+    usernames = [f"{prefixo}_{uid}" for uid in usuario_ids]
+
+    instrumentar()
+    preparar_apptest()
+
+    backend = "PostgreSQL" if args.dsn else "SQLite"
+    print(f"{backend}, {args.parcelas:,} parcelas por usuário, {args.ciclos} volta(s) "
+          f"de {len(ROTEIRO)} reruns por sessão, pausa {args.pausa}s\n")
+    print(f"{'sessões':>7} {'reruns':>7} {'erros':>9} {'p50':>8} {'p95':>8} {'máx':>8} {'reruns/s':>9} "
+          f"{'idas/rerun':>11} {'empr./rerun':>12} {'conex./rerun':>13}  login p50/p95")
+
+    por_rotulo = {}
+    for sessoes in niveis:
+        usuarios_nivel, usernames = usernames[:sessoes], usernames[sessoes:]
+        medicoes, total, esgotamentos = medir_nivel(usuarios_nivel, args.ciclos, args.pausa)
+
+        # Tempos e médias só dos reruns que terminaram sem erro; os que
+        # falharam entram apenas na coluna de erros
+        login = [m["ms"] for m in medicoes if m["rotulo"] == "Login" and not m["erro"]]
+        reruns = [m for m in medicoes if not m["rotulo"].startswith("Login")]
+        concluidos = [m for m in reruns if not m["erro"]]
+        erros = [m["erro"] for m in reruns if m["erro"]]
+        erros_login = [m["erro"] for m in medicoes if m["rotulo"].startswith("Login") and m["erro"]]
+        sem_login = sessoes - len(login)
+        quedas = sum(m["quedas_sqlite"] for m in medicoes)
+        for m in concluidos:
+            por_rotulo.setdefault(m["rotulo"], {}).setdefault(sessoes, []).append(m)
+
+        avisos = []
+        if erros:
+            avisos.append(f"{len(erros)} erro(s) nos reruns: {erros[0][:60]}")
+        if erros_login:
+            avisos.append(f"{len(erros_login)} tentativa(s) de login recusada(s), "
+                          f"{sem_login} sessão(ões) sem login: {erros_login[0][:50]}")
+        if esgotamentos:
+            avisos.append(f"{esgotamentos} esgotamento(s) do pool")
+        if quedas:
+            avisos.append(f"{quedas} conexão(ões) caíram para o SQLite")
+
+        if not concluidos:
+            print(f"{sessoes:>7} {len(reruns):>7}  nenhum rerun concluído")
+        else:
+            tempos = [m["ms"] for m in concluidos]
+            texto_erros = f"{len(erros)} ({len(erros) / len(reruns):.0%})"
+            texto_login = f"{_percentil(login, 0.5):>5.0f}/{_percentil(login, 0.95):.0f}ms" if login else "-"
+            print(
+                f"{sessoes:>7} {len(reruns):>7} {texto_erros:>9} {_percentil(tempos, 0.5):>6.0f}ms "
+                f"{_percentil(tempos, 0.95):>6.0f}ms {max(tempos):>6.0f}ms "
+                f"{len(concluidos) / total:>9.1f} {_media(concluidos, 'idas'):>11.1f} "
+                f"{_media(concluidos, 'emprestimos'):>12.1f} {_media(concluidos, 'conexoes'):>13.2f}  "
+                f"{texto_login}"
+            )
+        for aviso in avisos:
+            print(f"{'':>9}⚠️ {aviso}")
+
+    print("\nPor etapa, reruns sem erro: p50 (idas ao banco por rerun, média)\n")
+    print(f"{'etapa':<26}" + "".join(f"{str(n) + ' sessões':>20}" for n in niveis))
+    for rotulo, _ in ROTEIRO:
+        colunas = []
+        for sessoes in niveis:
+            medicoes = por_rotulo.get(rotulo, {}).get(sessoes)
+            if medicoes:
+                p50 = _percentil([m["ms"] for m in medicoes], 0.5)
+                colunas.append(f"{p50:.0f}ms ({_media(medicoes, 'idas'):.1f})")
+            else:
+                colunas.append("-")
+        print(f"{rotulo:<26}" + "".join(f"{c:>20}" for c in colunas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# ============================================
+# FILE: benchmarks/bench_cronograma.py
+# Geração de parcelas: laço antigo de criar_lancamento_debito
+# (timedelta de 30 dias, round em float) x parcelamento.py
+# (centavos inteiros, meses de calendário, numpy em lote).
+#
+# Não usa banco. Uso:
+#   python benchmarks/bench_cronograma.py --lancamentos 10000 --parcelas 12
+# ============================================
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parcelamento  # noqa: E402
+
+
+def laco_antigo(valor_total, quantidade_parcelas, data_primeira_parcela):
+    # Cópia do cálculo que existia em debitos.criar_lancamento_debito
+    valor_parcela = round(valor_total / quantidade_parcelas, 2)
+    soma_parcelas = valor_parcela * (quantidade_parcelas - 1)
+    ultima_parcela = round(valor_total - soma_parcelas, 2)
+
+    parcelas = []
+    for i in range(quantidade_parcelas):
+        numero_parcela = i + 1
+        data_vencimento = data_primeira_parcela + timedelta(days=30 * i)
+        valor = ultima_parcela if numero_parcela == quantidade_parcelas else valor_parcela
+        parcelas.append((numero_parcela, valor, data_vencimento))
+    return parcelas
+
+
+def cronometrar(funcao, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return resultado, melhor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cronograma de parcelas")
+    parser.add_argument("--lancamentos", type=int, default=10_000)
+    parser.add_argument("--parcelas", type=int, default=12, help="Máximo de parcelas por lançamento")
+    args = parser.parse_args()
+
+    rnd = random.Random(21)
+    valores = [round(rnd.uniform(10, 20_000), 2) for _ in range(args.lancamentos)]
+    quantidades = [rnd.randint(1, args.parcelas) for _ in range(args.lancamentos)]
+    datas = [date(2024, 1, 1) + timedelta(days=rnd.randrange(730)) for _ in range(args.lancamentos)]
+    total_parcelas = sum(quantidades)
+
+    antigo, t_antigo = cronometrar(
+        lambda: [laco_antigo(v, q, d) for v, q, d in zip(valores, quantidades, datas)]
+    )
+    _, t_um_a_um = cronometrar(
+        lambda: [parcelamento.gerar_parcelas(v, q, d) for v, q, d in zip(valores, quantidades, datas)]
+    )
+    _, t_lote = cronometrar(
+        lambda: parcelamento.gerar_cronogramas(valores, quantidades, datas)
+    )
+    novo, t_lote_linhas = cronometrar(
+        lambda: parcelamento.linhas_parcelas(
+            parcelamento.gerar_cronogramas(valores, quantidades, datas),
+            list(range(args.lancamentos)),
+        )
+    )
+
+    print(f"{args.lancamentos:,} lançamentos, {total_parcelas:,} parcelas\n")
+    print(f"{'Estratégia':<34} {'tempo':>10} {'parcelas/s':>14}")
+    for nome, tempo in (
+        ("laço antigo (float, 30 dias)", t_antigo),
+        ("gerar_parcelas um a um", t_um_a_um),
+        ("gerar_cronogramas (arrays)", t_lote),
+        ("gerar_cronogramas + linhas_parcelas", t_lote_linhas),
+    ):
+        print(f"{nome:<34} {tempo:>8.1f}ms {total_parcelas / tempo * 1000:>14,.0f}")
+
+    # Correção: datas fora do dia de vencimento e somas que não batem
+    deriva = sum(
+        1 for parcelas, d in zip(antigo, datas)
+        for numero, _, venc in parcelas
+        if venc != parcelamento.somar_meses(d, numero - 1)
+    )
+    soma_errada_antigo = sum(
+        1 for parcelas, v in zip(antigo, valores)
+        if Decimal(str(round(sum(p[1] for p in parcelas), 2))) != Decimal(str(v))
+        or any(Decimal(str(p[1])).as_tuple().exponent < -2 for p in parcelas)
+    )
+    somas_novo = {}
+    for lancamento, _, valor, _ in novo:
+        somas_novo[lancamento] = somas_novo.get(lancamento, 0) + valor
+    soma_errada_novo = sum(
+        1 for i, v in enumerate(valores) if somas_novo[i] != Decimal(str(v))
+    )
+
+    print(f"\nParcelas fora do dia do mês (laço antigo): {deriva:,} de {total_parcelas:,}")
+    print(f"Lançamentos com soma/centavos inexatos: antigo {soma_errada_antigo:,}, novo {soma_errada_novo:,}")
+
+
+if __name__ == "__main__":
+    main()
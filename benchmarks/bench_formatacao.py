@@ -0,0 +1,86 @@
+# ============================================
+# FILE: benchmarks/bench_formatacao.py
+# Formatação de colunas para st.dataframe, N linhas:
+# apply com f-string / format_br_date por célula (antigo) x
+# formatacao.moeda / formatacao.datas (numpy).
+#
+# Não usa banco. Uso:
+#   python benchmarks/bench_formatacao.py --linhas 100000
+# ============================================
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dinheiro  # noqa: E402
+import formatacao  # noqa: E402
+
+
+def format_br_date(d):
+    # Cópia do helper de app.py (importar o app executaria a página)
+    if isinstance(d, date):
+        return d.strftime("%d/%m/%Y")
+    return ""
+
+
+def cronometrar(funcao, repeticoes=5):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return resultado, melhor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da formatação de colunas")
+    parser.add_argument("--linhas", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(23)
+    # Como o relatório chega do PostgreSQL: Decimal e date, com alguns nulos
+    valores = pd.Series([
+        Decimal(rnd.randrange(-5_000_000, 50_000_000)).scaleb(-2) for _ in range(args.linhas)
+    ])
+    datas = pd.Series([
+        None if rnd.random() < 0.1 else date(2023, 1, 1) + timedelta(days=rnd.randrange(1500))
+        for _ in range(args.linhas)
+    ])
+    centavos = dinheiro.serie_para_centavos(valores)
+
+    resultados = [
+        ("moeda: apply f-string (antigo)",
+         cronometrar(lambda: valores.apply(lambda x: f"R$ {x:,.2f}"))),
+        ("moeda: serie_para_centavos",
+         cronometrar(lambda: dinheiro.serie_para_centavos(valores))),
+        ("moeda: formatacao.moeda",
+         cronometrar(lambda: formatacao.moeda(centavos))),
+        ("datas: map format_br_date (antigo)",
+         cronometrar(lambda: datas.map(format_br_date))),
+        ("datas: formatacao.datas",
+         cronometrar(lambda: formatacao.datas(datas))),
+    ]
+
+    print(f"{args.linhas:,} linhas\n")
+    print(f"{'Estratégia':<36} {'tempo':>10} {'linhas/s':>14}")
+    for nome, (_, tempo) in resultados:
+        print(f"{nome:<36} {tempo:>8.1f}ms {args.linhas / tempo * 1000:>14,.0f}")
+
+    # Mesmo texto do formatador escalar (e separadores brasileiros)
+    moeda = resultados[2][1][0]
+    esperado = [dinheiro.formatar(v) for v in valores]
+    datas_ok = list(resultados[4][1][0]) == list(resultados[3][1][0])
+    print(f"\nExemplo: antigo {resultados[0][1][0].iloc[0]!r} -> novo {moeda.iloc[0]!r}")
+    print(f"Moeda igual a dinheiro.formatar: {list(moeda) == esperado}; datas iguais: {datas_ok}")
+
+
+if __name__ == "__main__":
+    main()
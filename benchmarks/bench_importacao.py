@@ -0,0 +1,98 @@
+# ============================================
+# FILE: benchmarks/bench_importacao.py
+# Tempo de importação de um extrato grande (CSV e OFX gerados),
+# da reimportação (tudo duplicado) e conferência do resumo mensal.
+#
+# Uso (banco descartável!):
+#   python benchmarks/bench_importacao.py --dsn "host=localhost dbname=bench" --linhas 100000
+#   python benchmarks/bench_importacao.py --sqlite /tmp/bench.db
+# ============================================
+
+import argparse
+import io
+import random
+import time
+from datetime import date, timedelta
+
+import dados_sinteticos
+import cadastros
+import importacao
+import resumo_mensal
+
+HISTORICOS_CREDITO = ["SALARIO EMPRESA X", "PIX RECEBIDO", "TED RECEBIDA", "RENDIMENTO POUPANCA"]
+HISTORICOS_DEBITO = ["COMPRA CARTAO MERCADO", "PAGTO ENERGIA", "PIX ENVIADO", "TARIFA BANCARIA"]
+
+
+def gerar_linhas(quantidade, semente=7):
+    rnd = random.Random(semente)
+    inicio = date.today() - timedelta(days=3 * 365)
+    for i in range(quantidade):
+        data = inicio + timedelta(days=rnd.randrange(3 * 365))
+        if rnd.random() < 0.3:
+            yield data, round(rnd.uniform(50, 8000), 2), f"{rnd.choice(HISTORICOS_CREDITO)} {i}"
+        else:
+            yield data, -round(rnd.uniform(5, 900), 2), f"{rnd.choice(HISTORICOS_DEBITO)} {i}"
+
+
+def gerar_csv(quantidade):
+    saida = io.StringIO()
+    saida.write("Data;Histórico;Valor\n")
+    for data, valor, descricao in gerar_linhas(quantidade):
+        saida.write(f"{data:%d/%m/%Y};{descricao};{valor:.2f}".replace(".", ",") + "\n")
+    return io.BytesIO(saida.getvalue().encode("utf-8"))
+
+
+def gerar_ofx(quantidade):
+    partes = ["OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n"]
+    for data, valor, descricao in gerar_linhas(quantidade, semente=8):
+        partes.append(
+            f"<STMTTRN><TRNTYPE>{'CREDIT' if valor > 0 else 'DEBIT'}"
+            f"<DTPOSTED>{data:%Y%m%d}120000[-3:BRT]<TRNAMT>{valor:.2f}"
+            f"<MEMO>{descricao}</STMTTRN>\n"
+        )
+    partes.append("</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n")
+    return io.BytesIO("".join(partes).encode("cp1252"))
+
+
+def importar(arquivo, nome, usuario_id, fornecedor_id):
+    arquivo.seek(0)
+    inicio = time.perf_counter()
+    ok, relatorio = importacao.importar_extrato(
+        arquivo, usuario_id,
+        tipo_credito_id=5, fornecedor_id=fornecedor_id, tipo_documento_id=7,
+        regras=[{"contem": "SALARIO", "tipo_credito_id": 1}],
+        nome_arquivo=nome,
+    )
+    tempo = time.perf_counter() - inicio
+    print(f"  {nome:<14} {tempo:>6.2f}s  lidas={relatorio['lidas']:,} "
+          f"créditos={relatorio['creditos']:,} débitos={relatorio['debitos']:,} "
+          f"duplicadas={relatorio['duplicadas']:,} erros={len(relatorio['erros'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da importação de extratos")
+    dados_sinteticos.adicionar_argumentos_banco(parser)
+    parser.add_argument("--linhas", type=int, default=100_000)
+    args = parser.parse_args()
+
+    dados_sinteticos.configurar_banco(args.dsn, args.sqlite)
+    usuario_id = dados_sinteticos.popular(
+        usuarios=1, parcelas=10, fornecedores_por_usuario=1, creditos_por_usuario=0,
+        prefixo_usuario=f"importacao_{int(time.time())}",
+    )[0]
+    fornecedor_id = cadastros.listar_fornecedores(usuario_id)[0]["id"]
+
+    print(f"Gerando arquivos com {args.linhas:,} linhas...")
+    csv_ = gerar_csv(args.linhas)
+    ofx = gerar_ofx(args.linhas)
+
+    importar(csv_, "extrato.csv", usuario_id, fornecedor_id)
+    importar(csv_, "extrato.csv (2ª)", usuario_id, fornecedor_id)
+    importar(ofx, "extrato.ofx", usuario_id, fornecedor_id)
+
+    divergencias = resumo_mensal.verificar(usuario_id)
+    print("✔ Resumo mensal consistente." if not divergencias else f"❌ {len(divergencias)} divergências")
+
+
+if __name__ == "__main__":
+    main()
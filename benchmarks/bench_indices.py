@@ -0,0 +1,113 @@
+# ============================================
+# FILE: benchmarks/bench_indices.py
+# Tempo de listar_parcelas_debito e gerar_relatorio_conta_corrente
+# com e sem os índices da migração 0003.
+#
+# Uso (banco descartável!):
+#   python benchmarks/bench_indices.py --dsn "host=localhost dbname=bench" --parcelas 1000000
+#   python benchmarks/bench_indices.py --sqlite /tmp/bench.db
+# ============================================
+
+import argparse
+import importlib
+import statistics
+import time
+from datetime import date, timedelta
+
+import dados_sinteticos
+import database
+import debitos
+import relatorios
+import resumo_mensal
+
+indices = importlib.import_module("migrations.0003_indices_consultas")
+
+
+def _executar(sqls):
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    for sql in sqls:
+        cursor.execute(sql)
+    if conn.dialeto == "postgres":
+        cursor.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+def remover_indices():
+    _executar([f"DROP INDEX IF EXISTS {nome}" for nome, _, _ in indices.INDICES])
+
+
+def criar_indices():
+    _executar([indices.sql_criar_indice(*idx) for idx in indices.INDICES])
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def cenarios(usuario_id):
+    hoje = date.today()
+    inicio_mes = hoje.replace(day=1)
+    return [
+        ("listar_parcelas_debito (próx. 30 dias)",
+         lambda: debitos.listar_parcelas_debito(
+             usuario_id, data_inicio=hoje, data_fim=hoje + timedelta(days=30))),
+        ("listar_parcelas_debito (vencidas)",
+         lambda: debitos.listar_parcelas_debito(usuario_id, status_id=3)),
+        ("gerar_relatorio_conta_corrente (mês)",
+         lambda: relatorios.gerar_relatorio_conta_corrente(usuario_id, inicio_mes, hoje)),
+        ("gerar_relatorio_conta_corrente (ano)",
+         lambda: relatorios.gerar_relatorio_conta_corrente(
+             usuario_id, hoje.replace(month=1, day=1), hoje)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos índices de consulta")
+    dados_sinteticos.adicionar_argumentos_banco(parser)
+    parser.add_argument("--parcelas", type=int, default=1_000_000)
+    parser.add_argument("--usuarios", type=int, default=100)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--sem-popular", action="store_true",
+                        help="Reaproveita dados já gerados no banco")
+    args = parser.parse_args()
+
+    dados_sinteticos.configurar_banco(args.dsn, args.sqlite)
+
+    if args.sem_popular:
+        conn = database.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(usuario_id) AS uid FROM lancamentos_debito")
+        usuario_id = cursor.fetchone()["uid"]
+        conn.close()
+        # Dados de outra execução: o saldo de abertura do extrato lê o resumo
+        resumo_mensal.reconstruir(usuario_id)
+    else:
+        print(f"Populando {args.parcelas:,} parcelas para {args.usuarios} usuários...")
+        inicio = time.perf_counter()
+        usuario_id = dados_sinteticos.popular(
+            usuarios=args.usuarios, parcelas=args.parcelas
+        )[0]
+        print(f"  ok em {time.perf_counter() - inicio:.1f}s")
+
+    resultados = {}
+    for rotulo, acao in (("sem índices", remover_indices), ("com índices", criar_indices)):
+        acao()
+        for nome, funcao in cenarios(usuario_id):
+            funcao()  # aquecimento
+            resultados.setdefault(nome, {})[rotulo] = medir(funcao, args.repeticoes)
+
+    print(f"\n{'Consulta':<42} {'sem índices':>12} {'com índices':>12} {'ganho':>8}")
+    for nome, tempos in resultados.items():
+        sem, com = tempos["sem índices"], tempos["com índices"]
+        print(f"{nome:<42} {sem:>10.1f}ms {com:>10.1f}ms {sem / com:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
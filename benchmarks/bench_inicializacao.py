@@ -0,0 +1,164 @@
+# ============================================
+# FILE: benchmarks/bench_inicializacao.py
+# Custo de inicialização do app:
+#   1. tempo de import de cada módulo (processo novo por módulo) e
+#      quais bibliotecas pesadas ele arrasta (pandas, numpy...);
+#   2. primeira renderização de cada página num processo novo
+#      (AppTest) e o rerun seguinte, com as bibliotecas carregadas.
+#
+# Rode antes e depois de mexer em imports/páginas para ver regressões.
+#
+# Uso (banco descartável!):
+#   python benchmarks/bench_inicializacao.py --sqlite /tmp/bench.db
+#   python benchmarks/bench_inicializacao.py --dsn "host=localhost dbname=bench"
+# ============================================
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PESADAS = ("pandas", "numpy", "pyarrow", "openpyxl")
+
+# O que app.py importa no topo, e os módulos que as páginas importam
+MODULOS = [
+    "database, auth, agendador, cache",
+    "cadastros", "debitos", "creditos", "dinheiro", "parcelamento",
+    "relatorios", "exportacao", "importacao", "formatacao",
+]
+
+# (rótulo, página do menu, estado extra da sessão)
+PAGINAS = [
+    ("Login", None, {}),
+    ("Dashboard", "Dashboard", {}),
+    ("Fornecedores", "Fornecedores", {}),
+    ("Meios de Pagamento", "Meios de Pagamento", {}),
+    ("Lançar Débito", "Lançar Débito", {}),
+    ("Lançar Crédito", "Lançar Crédito", {}),
+    ("Importar Extrato", "Importar Extrato", {}),
+    ("Gestão de Parcelas", "Gestão de Parcelas", {}),
+    ("Relatórios / Conta Corrente", "Relatórios", {"rel_secao": "Conta Corrente"}),
+    ("Relatórios / Mensal", "Relatórios", {"rel_secao": "Mensal"}),
+    ("Relatórios / Por Fornecedor", "Relatórios", {"rel_secao": "Por Fornecedor"}),
+]
+
+
+def _filho(*args):
+    """Roda este script em um processo novo e devolve o JSON impresso."""
+    saida = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *args],
+        capture_output=True, text=True, cwd=RAIZ,
+    )
+    if saida.returncode != 0:
+        raise SystemExit(saida.stderr)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+# ============================================================
+# 🧪 Medições (executadas no processo filho)
+# ============================================================
+
+def medir_import(modulos):
+    sys.path.insert(0, RAIZ)
+    import streamlit  # noqa: F401  (sempre presente; fora da conta)
+
+    inicio = time.perf_counter()
+    for nome in modulos.split(", "):
+        __import__(nome)
+    tempo = (time.perf_counter() - inicio) * 1000
+    return {"ms": tempo, "pesadas": [m for m in PESADAS if m in sys.modules]}
+
+
+def medir_pagina(dsn, sqlite, usuario_id, indice):
+    import dados_sinteticos
+    from streamlit.testing.v1 import AppTest
+
+    dados_sinteticos.configurar_banco(dsn, sqlite)
+    _, pagina, estado = PAGINAS[indice]
+
+    at = AppTest.from_file(os.path.join(RAIZ, "app.py"), default_timeout=120)
+    if pagina:
+        at.session_state.logged_in = True
+        at.session_state.user = {"id": usuario_id, "nome_completo": "Benchmark", "username": "bench"}
+        at.session_state.menu_option = pagina
+        for chave, valor in estado.items():
+            at.session_state[chave] = valor
+
+    inicio = time.perf_counter()
+    at.run()
+    primeira = (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    at.run()
+    rerun = (time.perf_counter() - inicio) * 1000
+
+    erros = [e.value for e in at.exception]
+    return {
+        "primeira": primeira,
+        "rerun": rerun,
+        "pesadas": [m for m in PESADAS if m in sys.modules],
+        "erros": erros,
+    }
+
+
+# ============================================================
+# 📋 Relatório (processo principal)
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do app")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import dados_sinteticos
+
+    dados_sinteticos.adicionar_argumentos_banco(parser)
+    parser.add_argument("--parcelas", type=int, default=5_000)
+    parser.add_argument("--repeticoes", type=int, default=3, help="Processos por medição (mediana)")
+    parser.add_argument("--filho-import", help=argparse.SUPPRESS)
+    parser.add_argument("--filho-pagina", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--usuario", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho_import:
+        print(json.dumps(medir_import(args.filho_import)))
+        return
+    if args.filho_pagina is not None:
+        print(json.dumps(medir_pagina(args.dsn, args.sqlite, args.usuario, args.filho_pagina)))
+        return
+
+    def mediana(valores):
+        return sorted(valores)[len(valores) // 2]
+
+    banco = ["--dsn", args.dsn] if args.dsn else ["--sqlite", args.sqlite]
+    dados_sinteticos.configurar_banco(args.dsn, args.sqlite)
+    usuario_id = dados_sinteticos.popular(
+        usuarios=1, parcelas=args.parcelas, prefixo_usuario=f"bench_ini_{int(time.time())}"
+    )[0]
+
+    print("Import (processo novo, streamlit já carregado)\n")
+    print(f"{'módulo':<34} {'tempo':>9}  bibliotecas pesadas")
+    for modulos in MODULOS:
+        medicoes = [_filho("--filho-import", modulos) for _ in range(args.repeticoes)]
+        pesadas = ", ".join(medicoes[0]["pesadas"]) or "-"
+        print(f"{modulos:<34} {mediana([m['ms'] for m in medicoes]):>7.0f}ms  {pesadas}")
+
+    print(f"\nPrimeira renderização por página (processo novo, usuário com {args.parcelas:,} parcelas)\n")
+    print(f"{'página':<30} {'1ª vez':>9} {'rerun':>9}  bibliotecas pesadas")
+    for indice, (rotulo, _, _) in enumerate(PAGINAS):
+        medicoes = [
+            _filho(*banco, "--usuario", str(usuario_id), "--filho-pagina", str(indice))
+            for _ in range(args.repeticoes)
+        ]
+        pesadas = ", ".join(medicoes[0]["pesadas"]) or "-"
+        erros = f"  ERRO: {medicoes[0]['erros'][0][:60]}" if medicoes[0]["erros"] else ""
+        print(
+            f"{rotulo:<30} {mediana([m['primeira'] for m in medicoes]):>7.0f}ms "
+            f"{mediana([m['rerun'] for m in medicoes]):>7.0f}ms  {pesadas}{erros}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# ============================================
+# FILE: benchmarks/bench_login.py
+# Logins por segundo com N sessões entrando ao mesmo tempo:
+# bcrypt na thread de cada sessão (antigo) x pool limitado (auth).
+#
+# Mede também a latência de uma tarefa leve rodando em paralelo
+# (o "resto do app") e o rehash automático quando o custo muda.
+#
+# Uso (banco descartável!):
+#   python benchmarks/bench_login.py --dsn "host=localhost dbname=bench"
+#   python benchmarks/bench_login.py --sqlite /tmp/bench.db --rounds 10
+# ============================================
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dados_sinteticos
+import database
+import auth
+
+SENHA = "senha-benchmark"
+
+
+def _percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def _tarefa_leve(parar, latencias):
+    # Simula o restante do app: um pouco de CPU em Python a cada 10 ms
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        sum(range(20_000))
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        time.sleep(0.01)
+
+
+def medir(username, sessoes, logins):
+    latencias_login, latencias_app = [], []
+    parar = threading.Event()
+    fundo = threading.Thread(target=_tarefa_leve, args=(parar, latencias_app))
+    fundo.start()
+
+    def logar(_):
+        inicio = time.perf_counter()
+        ok, _ = auth.authenticate_user(username, SENHA)
+        latencias_login.append((time.perf_counter() - inicio) * 1000)
+        return ok
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessoes) as sessoes_simultaneas:
+        sucessos = sum(sessoes_simultaneas.map(logar, range(logins)))
+    total = time.perf_counter() - inicio
+
+    parar.set()
+    fundo.join()
+
+    return {
+        "logins_s": logins / total,
+        "p95_login": _percentil(latencias_login, 0.95),
+        "p95_app": _percentil(latencias_app, 0.95) if latencias_app else 0,
+        "falhas": logins - sucessos,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de logins (bcrypt)")
+    dados_sinteticos.adicionar_argumentos_banco(parser)
+    parser.add_argument("--rounds", type=int, default=auth.BCRYPT_ROUNDS)
+    parser.add_argument("--workers", type=int, default=auth.HASH_WORKERS_PADRAO)
+    parser.add_argument("--sessoes", default="1,4,16,64",
+                        help="Níveis de concorrência separados por vírgula")
+    parser.add_argument("--logins", type=int, default=64, help="Logins por medição")
+    args = parser.parse_args()
+
+    dados_sinteticos.configurar_banco(args.dsn, args.sqlite)
+    auth.configurar_hash(rounds=args.rounds, workers=args.workers, fila=256)
+
+    username = f"bench_login_{int(time.time())}"
+    ok, _, msg = auth.create_user(username, SENHA, "Benchmark", None)
+    if not ok:
+        raise SystemExit(msg)
+
+    executar_no_pool = auth._executar
+
+    print(f"bcrypt custo {args.rounds}, pool com {args.workers} worker(s)\n")
+    print(f"{'modo':<8} {'sessões':>7} {'logins/s':>9} {'p95 login':>10} {'p95 app':>9}")
+    for sessoes in (int(n) for n in args.sessoes.split(",")):
+        for modo in ("inline", "pool"):
+            # inline: comportamento antigo, bcrypt na thread da sessão
+            auth._executar = executar_no_pool if modo == "pool" else (lambda f, *a: f(*a))
+            r = medir(username, sessoes, args.logins)
+            falhas = f"  ({r['falhas']} falhas)" if r["falhas"] else ""
+            print(f"{modo:<8} {sessoes:>7} {r['logins_s']:>9.1f} "
+                  f"{r['p95_login']:>8.0f}ms {r['p95_app']:>7.1f}ms{falhas}")
+    auth._executar = executar_no_pool
+
+    # Rehash: usuário com custo menor passa ao custo configurado no login
+    username_antigo = f"{username}_antigo"
+    auth.configurar_hash(rounds=max(args.rounds - 2, auth.BCRYPT_ROUNDS_MINIMO))
+    auth.create_user(username_antigo, SENHA, "Benchmark", None)
+    auth.configurar_hash(rounds=args.rounds)
+
+    ok, usuario = auth.authenticate_user(username_antigo, SENHA)
+    auth.configurar_hash()  # espera o rehash agendado terminar
+
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT password_hash FROM usuarios WHERE id = %s", (usuario["id"],))
+    custo = auth.custo_hash(cursor.fetchone()["password_hash"])
+    conn.close()
+    print(f"\nRehash no login: custo {max(args.rounds - 2, auth.BCRYPT_ROUNDS_MINIMO)} -> {custo}")
+
+
+if __name__ == "__main__":
+    main()
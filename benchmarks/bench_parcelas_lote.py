@@ -0,0 +1,126 @@
+# ============================================
+# FILE: benchmarks/bench_parcelas_lote.py
+# Idas ao banco e tempo para gravar as parcelas de um lançamento:
+# um INSERT por parcela (antigo) x INSERT multi-linha (inserir_em_lote).
+#
+# Cada medição roda dentro de uma transação desfeita no final.
+#
+# Uso:
+#   python benchmarks/bench_parcelas_lote.py --dsn "host=localhost dbname=bench"
+#   python benchmarks/bench_parcelas_lote.py --sqlite /tmp/bench.db
+# ============================================
+
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+import dados_sinteticos
+import database
+
+
+class CursorContador:
+    """Repassa ao cursor real contando instruções enviadas ao banco."""
+
+    def __init__(self, cursor, dialeto):
+        self._cursor = cursor
+        self.dialeto = dialeto
+        self.idas = 0
+
+    def execute(self, *args, **kwargs):
+        self.idas += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, sql, linhas):
+        # psycopg2 executa uma instrução por linha; sqlite3 roda em processo
+        linhas = list(linhas)
+        self.idas += len(linhas) if self.dialeto == "postgres" else 1
+        return self._cursor.executemany(sql, linhas)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+
+SQL_LANCAMENTO = """
+    INSERT INTO lancamentos_debito (
+        usuario_id, fornecedor_id, forma_pagamento_id, tipo_documento_id,
+        valor_total, descricao, quantidade_parcelas, data_lancamento
+    )
+    VALUES (%s, %s, 1, 1, %s, 'benchmark', %s, %s)
+    RETURNING id
+"""
+
+
+def _parcelas(lancamento_id, quantidade):
+    primeira = date.today() + timedelta(days=30)
+    return [
+        (lancamento_id, i + 1, 100.0, primeira + timedelta(days=30 * i))
+        for i in range(quantidade)
+    ]
+
+
+def gravar_em_laco(cursor, quantidade):
+    cursor.execute(SQL_LANCAMENTO, (0, 0, 100.0 * quantidade, quantidade, date.today()))
+    lancamento_id = cursor.fetchone()["id"]
+    for linha in _parcelas(lancamento_id, quantidade):
+        cursor.execute(
+            """
+            INSERT INTO parcelas_debito (
+                lancamento_debito_id, numero_parcela, valor_parcela,
+                data_vencimento, status_id
+            )
+            VALUES (%s, %s, %s, %s, 1)
+        """,
+            linha,
+        )
+
+
+def gravar_em_lote(cursor, quantidade):
+    cursor.execute(SQL_LANCAMENTO, (0, 0, 100.0 * quantidade, quantidade, date.today()))
+    lancamento_id = cursor.fetchone()["id"]
+    database.inserir_em_lote(
+        cursor,
+        """
+        INSERT INTO parcelas_debito (
+            lancamento_debito_id, numero_parcela, valor_parcela,
+            data_vencimento, status_id
+        )
+        VALUES %s
+    """,
+        _parcelas(lancamento_id, quantidade),
+        template="(%s, %s, %s, %s, 1)",
+    )
+
+
+def medir(estrategia, quantidade, repeticoes):
+    tempos, idas = [], 0
+    for _ in range(repeticoes):
+        conn = database.get_connection()
+        cursor = CursorContador(conn.cursor(), conn.dialeto)
+        inicio = time.perf_counter()
+        estrategia(cursor, quantidade)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        idas = cursor.idas
+        conn.rollback()
+        conn.close()
+    return statistics.median(tempos), idas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da gravação de parcelas")
+    dados_sinteticos.adicionar_argumentos_banco(parser)
+    parser.add_argument("--parcelas", type=int, nargs="+", default=[1, 12, 48, 360])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    dados_sinteticos.configurar_banco(args.dsn, args.sqlite)
+
+    print(f"{'Parcelas':>8} | {'laço: idas':>10} {'tempo':>9} | {'lote: idas':>10} {'tempo':>9}")
+    for quantidade in args.parcelas:
+        t_laco, idas_laco = medir(gravar_em_laco, quantidade, args.repeticoes)
+        t_lote, idas_lote = medir(gravar_em_lote, quantidade, args.repeticoes)
+        print(f"{quantidade:>8} | {idas_laco:>10} {t_laco:>7.1f}ms | {idas_lote:>10} {t_lote:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# ============================================
+# FILE: benchmarks/bench_stream_conta_corrente.py
+# Pico de memória e tempo do extrato conta corrente:
+# DataFrame completo (gerar_relatorio_conta_corrente) x
+# streaming em lotes (iterar_relatorio_conta_corrente).
+#
+# Uso (banco já populado, ex. por bench_indices.py):
+#   python benchmarks/bench_stream_conta_corrente.py --dsn "host=localhost dbname=bench"
+#   python benchmarks/bench_stream_conta_corrente.py --sqlite /tmp/bench.db
+# ============================================
+
+import argparse
+import time
+import tracemalloc
+
+import dados_sinteticos
+import database
+import relatorios
+import resumo_mensal
+
+
+def medir(funcao):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    linhas = funcao()
+    tempo = (time.perf_counter() - inicio) * 1000
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return linhas, tempo, pico / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do extrato em streaming")
+    dados_sinteticos.adicionar_argumentos_banco(parser)
+    parser.add_argument("--usuarios", type=int, default=1,
+                        help="Quantos usuários somar no extrato (1 = um extrato)")
+    parser.add_argument("--lote", type=int, default=relatorios.TAMANHO_LOTE_STREAM)
+    args = parser.parse_args()
+
+    dados_sinteticos.configurar_banco(args.dsn, args.sqlite)
+
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT ld.usuario_id, COUNT(*) AS parcelas
+        FROM parcelas_debito pd
+        INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
+        GROUP BY ld.usuario_id
+        ORDER BY parcelas DESC
+        LIMIT %s
+    """, (args.usuarios,))
+    usuario_ids = [r["usuario_id"] for r in cursor.fetchall()]
+    conn.close()
+
+    # O saldo de abertura vem do resumo_mensal, e o banco pode ter sido
+    # populado direto nas tabelas, sem ele
+    for uid in usuario_ids:
+        resumo_mensal.reconstruir(uid)
+
+    def dataframe():
+        return sum(len(relatorios.gerar_relatorio_conta_corrente(uid)) for uid in usuario_ids)
+
+    def streaming():
+        total = 0
+        for uid in usuario_ids:
+            for lote in relatorios.iterar_relatorio_conta_corrente(uid, tamanho_lote=args.lote):
+                total += len(lote)
+        return total
+
+    print(f"{'Estratégia':<12} {'linhas':>9} {'tempo':>10} {'pico memória':>14}")
+    for nome, funcao in (("DataFrame", dataframe), ("streaming", streaming)):
+        funcao()  # aquecimento
+        linhas, tempo, pico = medir(funcao)
+        print(f"{nome:<12} {linhas:>9,} {tempo:>8.0f}ms {pico:>11.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
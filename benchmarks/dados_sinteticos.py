@@ -0,0 +1,183 @@
+# ============================================
+# FILE: benchmarks/dados_sinteticos.py
+# Geração de dados realistas para benchmarks e testes de carga
+#
+# Use SEMPRE um banco descartável: os ids são atribuídos em
+# sequência a partir do maior id existente.
+# ============================================
+
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import resumo_mensal  # noqa: E402
+
+TAMANHO_LOTE = 10_000
+
+
+# ============================================
+# 🔌 Seleção do banco do benchmark
+# ============================================
+def configurar_banco(dsn=None, sqlite=None):
+    """
+    Aponta database.py para o banco do benchmark.
+    Exige escolha explícita para nunca popular o banco de produção.
+    """
+    if bool(dsn) == bool(sqlite):
+        raise SystemExit("Informe exatamente um: --dsn <postgres> ou --sqlite <arquivo>")
+
+    database.POSTGRES_CONFIG = {"dsn": dsn} if dsn else None
+    if sqlite:
+        database.DB_PATH = os.path.abspath(sqlite)
+    database.fechar_pool()
+    database.init_database()
+
+
+def adicionar_argumentos_banco(parser):
+    parser.add_argument("--dsn", help="DSN de um PostgreSQL descartável")
+    parser.add_argument("--sqlite", help="Arquivo SQLite descartável")
+
+
+# ============================================
+# 🧰 Inserção em lote
+# ============================================
+def _inserir(conn, cursor, tabela, colunas, linhas):
+    database.inserir_em_lote(
+        cursor, f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES %s", linhas
+    )
+
+
+def _proximo_id(cursor, tabela):
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS ultimo FROM {tabela}")
+    return cursor.fetchone()["ultimo"] + 1
+
+
+def _somar_meses(d, meses):
+    total = d.year * 12 + d.month - 1 + meses
+    return date(total // 12, total % 12 + 1, min(d.day, 28))
+
+
+# ============================================
+# 🌱 População
+# ============================================
+def popular(
+    usuarios=100,
+    parcelas=1_000_000,
+    fornecedores_por_usuario=10,
+    parcelas_por_lancamento=10,
+    creditos_por_usuario=120,
+    senha_hash="$2b$12$benchmarkbenchmarkbenchmarkbenchmarkbenchmarkbenc",
+    prefixo_usuario="bench",
+    semente=42,
+):
+    """
+    Popula usuários, fornecedores, lançamentos, parcelas e créditos.
+    Retorna a lista de ids de usuário criados.
+
+    As linhas entram direto nas tabelas, sem os deltas de creditos.py e
+    debitos.py: o resumo_mensal dos usuários criados é refeito no fim
+    (dashboard e saldo de abertura do extrato leem dele).
+    """
+    rnd = random.Random(semente)
+    hoje = date.today()
+    inicio = date(hoje.year - 6, 1, 1)
+    dias_periodo = (hoje - inicio).days + 365
+
+    conn = database.get_connection()
+    cursor = conn.cursor()
+
+    try:
+        # Usuários
+        primeiro_usuario = _proximo_id(cursor, "usuarios")
+        usuario_ids = list(range(primeiro_usuario, primeiro_usuario + usuarios))
+        _inserir(conn, cursor, "usuarios",
+                 ["id", "username", "password_hash", "nome_completo", "email"],
+                 [(uid, f"{prefixo_usuario}_{uid}", senha_hash, f"Usuário {uid}", None)
+                  for uid in usuario_ids])
+
+        # Fornecedores
+        proximo_forn = _proximo_id(cursor, "fornecedores")
+        fornecedores = {}
+        linhas = []
+        for uid in usuario_ids:
+            fornecedores[uid] = list(range(proximo_forn, proximo_forn + fornecedores_por_usuario))
+            for fid in fornecedores[uid]:
+                linhas.append((fid, uid, f"Fornecedor {fid}", None, None, None))
+            proximo_forn += fornecedores_por_usuario
+        _inserir(conn, cursor, "fornecedores",
+                 ["id", "usuario_id", "nome", "cpf_cnpj", "telefone", "email"], linhas)
+
+        # Lançamentos + parcelas
+        total_lancamentos = max(1, parcelas // parcelas_por_lancamento)
+        proximo_lanc = _proximo_id(cursor, "lancamentos_debito")
+        colunas_lanc = ["id", "usuario_id", "fornecedor_id", "forma_pagamento_id",
+                        "tipo_documento_id", "valor_total", "descricao",
+                        "quantidade_parcelas", "data_lancamento"]
+        colunas_parc = ["lancamento_debito_id", "numero_parcela", "valor_parcela",
+                        "data_vencimento", "status_id", "data_pagamento", "valor_pago"]
+
+        lote_lanc, lote_parc = [], []
+        for n in range(total_lancamentos):
+            lid = proximo_lanc + n
+            uid = usuario_ids[n % usuarios]
+            data_lanc = inicio + timedelta(days=rnd.randrange(dias_periodo))
+            valor_parcela = round(rnd.uniform(20, 800), 2)
+            qtd = parcelas_por_lancamento
+
+            lote_lanc.append((lid, uid, rnd.choice(fornecedores[uid]), rnd.choice((1, 2)),
+                              rnd.randint(1, 8), round(valor_parcela * qtd, 2),
+                              f"Compra {lid}", qtd, data_lanc))
+
+            for i in range(qtd):
+                venc = _somar_meses(data_lanc, i + 1)
+                if venc < hoje and rnd.random() < 0.9:
+                    lote_parc.append((lid, i + 1, valor_parcela, venc, 2, venc, valor_parcela))
+                elif venc < hoje:
+                    lote_parc.append((lid, i + 1, valor_parcela, venc, 3, None, None))
+                else:
+                    lote_parc.append((lid, i + 1, valor_parcela, venc, 1, None, None))
+
+            if len(lote_parc) >= TAMANHO_LOTE:
+                _inserir(conn, cursor, "lancamentos_debito", colunas_lanc, lote_lanc)
+                _inserir(conn, cursor, "parcelas_debito", colunas_parc, lote_parc)
+                lote_lanc, lote_parc = [], []
+
+        _inserir(conn, cursor, "lancamentos_debito", colunas_lanc, lote_lanc)
+        _inserir(conn, cursor, "parcelas_debito", colunas_parc, lote_parc)
+
+        # Créditos
+        linhas = []
+        for uid in usuario_ids:
+            for _ in range(creditos_por_usuario):
+                linhas.append((uid, rnd.randint(1, 5), round(rnd.uniform(500, 9000), 2),
+                               "Crédito sintético",
+                               inicio + timedelta(days=rnd.randrange(dias_periodo))))
+        _inserir(conn, cursor, "lancamentos_credito",
+                 ["usuario_id", "tipo_credito_id", "valor", "descricao", "data_recebimento"],
+                 linhas)
+
+        if conn.dialeto == "postgres":
+            # Ids explícitos não avançam as sequences do SERIAL
+            for tabela in ("usuarios", "fornecedores", "lancamentos_debito"):
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), "
+                    f"(SELECT MAX(id) FROM {tabela}))"
+                )
+            conn.commit()
+            cursor.execute("ANALYZE")
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    for uid in usuario_ids:
+        resumo_mensal.reconstruir(uid)
+
+    return usuario_ids
@@ -0,0 +1,97 @@
+# ============================================
+# FILE: cache.py
+# Cache em memória do processo (compartilhado entre as sessões
+# do Streamlit no mesmo servidor).
+#
+# CacheLRU: limite de itens com descarte do menos usado, TTL
+# opcional, invalidação explícita e contadores de acerto/falha.
+#
+# versao_dados(usuario_id): muda sempre que os lançamentos do
+# usuário mudam; entra na chave dos caches de relatórios.
+# ============================================
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    obter(chave, carregar) devolve o valor em cache ou chama carregar()
+    e guarda o resultado. Seguro para uso entre threads.
+    """
+
+    def __init__(self, max_itens=None, ttl=None):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens = OrderedDict()  # chave -> (valor, expira_em)
+        self._lock = threading.Lock()
+        # Muda a cada invalidação: carga iniciada antes dela não é guardada
+        self._geracao = 0
+        self._stats = {"acertos": 0, "falhas": 0, "expirados": 0, "descartados": 0}
+
+    def obter(self, chave, carregar):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                valor, expira_em = item
+                if expira_em is None or expira_em > time.monotonic():
+                    self._itens.move_to_end(chave)
+                    self._stats["acertos"] += 1
+                    return valor
+                del self._itens[chave]
+                self._stats["expirados"] += 1
+            self._stats["falhas"] += 1
+            geracao = self._geracao
+
+        # Carrega fora do lock para não serializar as sessões no banco
+        valor = carregar()
+
+        with self._lock:
+            if geracao == self._geracao:
+                expira_em = time.monotonic() + self.ttl if self.ttl else None
+                self._itens[chave] = (valor, expira_em)
+                self._itens.move_to_end(chave)
+                while self.max_itens and len(self._itens) > self.max_itens:
+                    self._itens.popitem(last=False)
+                    self._stats["descartados"] += 1
+        return valor
+
+    def invalidar(self, chave=None):
+        """Remove uma chave ou, sem argumento, tudo."""
+        with self._lock:
+            self._geracao += 1
+            if chave is None:
+                self._itens.clear()
+            else:
+                self._itens.pop(chave, None)
+
+    def estatisticas(self):
+        with self._lock:
+            return {**self._stats, "itens": len(self._itens)}
+
+
+# ============================================
+# 🔢 Versão dos dados por usuário
+# ============================================
+_versoes = {}
+_epoca = 0  # alterações que atingem todos os usuários (ex.: parcelas vencidas)
+_lock_versoes = threading.Lock()
+
+
+def versao_dados(usuario_id):
+    with _lock_versoes:
+        return _epoca, _versoes.get(usuario_id, 0)
+
+
+def nova_versao_dados(usuario_id=None):
+    """
+    Chamar após o commit de qualquer escrita em lançamentos/parcelas.
+    Sem usuario_id, invalida os dados de todos os usuários.
+    """
+    global _epoca
+    with _lock_versoes:
+        if usuario_id is None:
+            _epoca += 1
+        else:
+            _versoes[usuario_id] = _versoes.get(usuario_id, 0) + 1
@@ -10,13 +10,100 @@
 # - Tipos de Crédito
 # ============================================
 
+from cache import CacheLRU
 from database import get_connection
 
 
+# ============================================================
+# 📚 DADOS DE REFERÊNCIA (tabelas de apoio quase estáticas)
+# Carregadas juntas em uma consulta e mantidas em cache no processo.
+# ============================================================
+TTL_DADOS_REFERENCIA = 600  # segundos
+
+# tabela -> (colunas devolvidas, ordenação original do listar_*)
+TABELAS_REFERENCIA = {
+    "formas_pagamento": (("id", "descricao", "ativo"), "descricao"),
+    "tipos_documento": (
+        ("id", "descricao", "requer_bandeira", "permite_parcelamento", "ativo"),
+        "descricao",
+    ),
+    "bandeiras_cartao": (("id", "descricao", "ativo"), "descricao"),
+    "status_documento": (("id", "descricao", "cor"), "id"),
+    "tipos_credito": (("id", "descricao", "ativo"), "descricao"),
+}
+
+# Colunas opcionais do UNION e seu tipo (NULL precisa de tipo no PostgreSQL)
+_COLUNAS_EXTRAS = {
+    "ativo": "BOOLEAN",
+    "cor": "TEXT",
+    "requer_bandeira": "BOOLEAN",
+    "permite_parcelamento": "BOOLEAN",
+}
+
+_cache_referencia = CacheLRU(max_itens=1, ttl=TTL_DADOS_REFERENCIA)
+
+
+def _carregar_dados_referencia():
+    partes = []
+    for tabela, (colunas, ordem) in TABELAS_REFERENCIA.items():
+        extras = [
+            coluna if coluna in colunas else f"CAST(NULL AS {tipo}) AS {coluna}"
+            for coluna, tipo in _COLUNAS_EXTRAS.items()
+        ]
+        partes.append(f"""
+            SELECT '{tabela}' AS tabela, id, descricao, {', '.join(extras)},
+                   ROW_NUMBER() OVER (ORDER BY {ordem}) AS ordem
+            FROM {tabela}
+        """)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(" UNION ALL ".join(partes) + " ORDER BY tabela, ordem")
+    rows = cursor.fetchall()
+    conn.close()
+
+    dados = {tabela: [] for tabela in TABELAS_REFERENCIA}
+    for r in rows:
+        colunas = TABELAS_REFERENCIA[r["tabela"]][0]
+        dados[r["tabela"]].append({c: r[c] for c in colunas})
+    return dados
+
+
+def dados_referencia():
+    """{tabela: [linhas]} de todas as tabelas de referência (em cache)."""
+    return _cache_referencia.obter("referencia", _carregar_dados_referencia)
+
+
+def descricoes_referencia(tabela):
+    """Mapa id -> descricao de uma tabela de referência."""
+    return {r["id"]: r["descricao"] for r in dados_referencia()[tabela]}
+
+
+def invalidar_dados_referencia():
+    """Descarta o cache; chamar após alterar qualquer tabela de referência."""
+    _cache_referencia.invalidar()
+
+
+def estatisticas_cache_referencia():
+    return _cache_referencia.estatisticas()
+
+
+def _listar_referencia(tabela):
+    # Cópias: quem chama pode alterar os dicts sem afetar o cache
+    return [dict(r) for r in dados_referencia()[tabela]]
+
+
 # ============================================================
 # 🏢 FORNECEDORES
+# Cache por usuário; toda escrita em fornecedores deve chamar
+# invalidar_fornecedores(usuario_id) depois do commit.
 # ============================================================
-def listar_fornecedores(usuario_id):
+MAX_USUARIOS_CACHE_FORNECEDORES = 256
+
+_cache_fornecedores = CacheLRU(max_itens=MAX_USUARIOS_CACHE_FORNECEDORES)
+
+
+def _carregar_fornecedores(usuario_id):
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -39,6 +126,21 @@ def listar_fornecedores(usuario_id):
     return [dict(r) for r in rows]
 
 
+def listar_fornecedores(usuario_id):
+    fornecedores = _cache_fornecedores.obter(
+        usuario_id, lambda: _carregar_fornecedores(usuario_id)
+    )
+    return [dict(f) for f in fornecedores]
+
+
+def invalidar_fornecedores(usuario_id):
+    _cache_fornecedores.invalidar(usuario_id)
+
+
+def estatisticas_cache_fornecedores():
+    return _cache_fornecedores.estatisticas()
+
+
 def criar_fornecedor(usuario_id, nome, cpf_cnpj, telefone, email):
     conn = get_connection()
     cursor = conn.cursor()
@@ -53,6 +155,7 @@ def criar_fornecedor(usuario_id, nome, cpf_cnpj, telefone, email):
         novo_id = cursor.fetchone()["id"]
         conn.commit()
         conn.close()
+        invalidar_fornecedores(usuario_id)
         return True, novo_id, "Fornecedor cadastrado com sucesso!"
 
     except Exception as e:
@@ -65,59 +168,21 @@ def criar_fornecedor(usuario_id, nome, cpf_cnpj, telefone, email):
 # 💳 FORMAS DE PAGAMENTO (À Vista / A Prazo)  — NÃO MEXER
 # ============================================================
 def listar_formas_pagamento():
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT id, descricao, ativo
-        FROM formas_pagamento
-        ORDER BY descricao
-    """)
-
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    return _listar_referencia("formas_pagamento")
 
 
 # ============================================================
 # 📄 TIPOS DE DOCUMENTO (Boleto, Cartão, PIX...)
 # ============================================================
 def listar_tipos_documento():
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT 
-            id,
-            descricao,
-            requer_bandeira,
-            permite_parcelamento,
-            ativo
-        FROM tipos_documento
-        ORDER BY descricao
-    """)
-
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    return _listar_referencia("tipos_documento")
 
 
 # ============================================================
 # 🏦 BANDEIRAS DE CARTÃO (Tabela antiga, mantida)
 # ============================================================
 def listar_bandeiras_cartao():
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT id, descricao, ativo
-        FROM bandeiras_cartao
-        ORDER BY descricao
-    """)
-
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    return _listar_referencia("bandeiras_cartao")
 
 
 # ============================================================
@@ -142,6 +207,8 @@ def listar_meios_pagamento_usuario(usuario_id, tipo_pagamento=None, incluir_inat
             bandeira_cartao,
             ultimos_digitos,
             chave_pix,
+            dia_fechamento,
+            dia_vencimento,
             ativo,
             data_criacao
         FROM meios_pagamento_usuario
@@ -177,7 +244,9 @@ def criar_meio_pagamento(
     banco=None,
     bandeira_cartao=None,
     ultimos_digitos=None,
-    chave_pix=None
+    chave_pix=None,
+    dia_fechamento=None,
+    dia_vencimento=None
 ):
     """
     Exemplo cartão:
@@ -186,7 +255,9 @@ def criar_meio_pagamento(
             'Santander – Master – 9999',
             banco='Santander',
             bandeira_cartao='Master',
-            ultimos_digitos='9999'
+            ultimos_digitos='9999',
+            dia_fechamento=3,
+            dia_vencimento=10
         )
 
     Exemplo PIX:
@@ -209,9 +280,11 @@ def criar_meio_pagamento(
                 banco,
                 bandeira_cartao,
                 ultimos_digitos,
-                chave_pix
+                chave_pix,
+                dia_fechamento,
+                dia_vencimento
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING id
         """, (
             usuario_id,
@@ -220,7 +293,9 @@ def criar_meio_pagamento(
             banco,
             bandeira_cartao,
             ultimos_digitos,
-            chave_pix
+            chave_pix,
+            dia_fechamento,
+            dia_vencimento
         ))
 
         novo_id = cursor.fetchone()["id"]
@@ -252,37 +327,42 @@ def desativar_meio_pagamento(meio_id, usuario_id):
         return False, f"Erro ao desativar meio de pagamento: {str(e)}"
 
 
-# ============================================================
-# 🏷️ STATUS (Aberto / Pago / Vencido...)
-# ============================================================
-def listar_status_documento():
+def definir_regra_cartao(meio_id, usuario_id, dia_fechamento, dia_vencimento):
+    """
+    Dias de fechamento e de vencimento da fatura (1 a 31; None remove a regra).
+    Os vencimentos já lançados são refeitos por
+    debitos.recalcular_vencimentos_cartao.
+    """
+    for dia in (dia_fechamento, dia_vencimento):
+        if dia is not None and not 1 <= dia <= 31:
+            return False, "Os dias de fechamento e vencimento devem estar entre 1 e 31."
+
     conn = get_connection()
     cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            UPDATE meios_pagamento_usuario
+            SET dia_fechamento = %s, dia_vencimento = %s
+            WHERE id = %s AND usuario_id = %s
+        """, (dia_fechamento, dia_vencimento, meio_id, usuario_id))
+        conn.commit()
+        conn.close()
+        return True, "Fechamento e vencimento da fatura atualizados."
+    except Exception as e:
+        conn.rollback()
+        conn.close()
+        return False, f"Erro ao atualizar a fatura do cartão: {str(e)}"
 
-    cursor.execute("""
-        SELECT id, descricao, cor
-        FROM status_documento
-        ORDER BY id
-    """)
 
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+# ============================================================
+# 🏷️ STATUS (Aberto / Pago / Vencido...)
+# ============================================================
+def listar_status_documento():
+    return _listar_referencia("status_documento")
 
 
 # ============================================================
 # 💰 TIPOS DE CRÉDITO (Salário, 13º, Férias...)
 # ============================================================
 def listar_tipos_credito():
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT id, descricao, ativo
-        FROM tipos_credito
-        ORDER BY descricao
-    """)
-
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    return _listar_referencia("tipos_credito")
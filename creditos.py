@@ -3,8 +3,11 @@
 # Gestão de Créditos (Entradas Financeiras)
 # ============================================
 
-from database import get_connection
+from database import get_connection, iniciar_escrita, para_atualizar
 from datetime import datetime
+import cache
+import dinheiro
+import resumo_mensal
 
 
 # =====================================================
@@ -14,6 +17,8 @@ from datetime import datetime
 def criar_credito(usuario_id, tipo_credito_id, valor, descricao=None,
                   data_recebimento=None, observacoes=None):
 
+    valor = dinheiro.para_banco(valor)
+
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -31,8 +36,14 @@ def criar_credito(usuario_id, tipo_credito_id, valor, descricao=None,
               data_recebimento, observacoes))
 
         novo_id = cursor.fetchone()["id"]
+
+        resumo_mensal.registrar_deltas(cursor, usuario_id, [
+            (data_recebimento, {"total_creditos": valor}),
+        ])
+
         conn.commit()
         conn.close()
+        cache.nova_versao_dados(usuario_id)
 
         return True, novo_id, "Crédito lançado com sucesso!"
 
@@ -119,6 +130,8 @@ def get_credito(credito_id, usuario_id):
 def editar_credito(credito_id, usuario_id, tipo_credito_id=None, valor=None,
                    descricao=None, data_recebimento=None, observacoes=None):
 
+    valor = dinheiro.para_banco(valor)
+
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -147,18 +160,41 @@ def editar_credito(credito_id, usuario_id, tipo_credito_id=None, valor=None,
             params.append(observacoes)
 
         if not updates:
+            conn.close()
             return False, "Nenhum campo informado para atualização"
 
         params.extend([credito_id, usuario_id])
 
+        # Linha travada até o commit: o delta do resumo parte deste estado
+        iniciar_escrita(cursor)
+        cursor.execute(f"""
+            SELECT valor, data_recebimento
+            FROM lancamentos_credito
+            WHERE id = %s AND usuario_id = %s
+            {para_atualizar(cursor)}
+        """, (credito_id, usuario_id))
+        anterior = cursor.fetchone()
+        if not anterior:
+            conn.rollback()
+            conn.close()
+            return False, "Crédito não encontrado ou sem permissão."
+
         cursor.execute(f"""
             UPDATE lancamentos_credito
             SET {', '.join(updates)}
             WHERE id = %s AND usuario_id = %s
         """, params)
 
+        if valor is not None or data_recebimento is not None:
+            resumo_mensal.registrar_deltas(cursor, usuario_id, [
+                (anterior["data_recebimento"], {"total_creditos": -anterior["valor"]}),
+                (data_recebimento or anterior["data_recebimento"],
+                 {"total_creditos": valor if valor is not None else anterior["valor"]}),
+            ])
+
         conn.commit()
         conn.close()
+        cache.nova_versao_dados(usuario_id)
         return True, "Crédito atualizado com sucesso!"
 
     except Exception as e:
@@ -176,13 +212,26 @@ def excluir_credito(credito_id, usuario_id):
     cursor = conn.cursor()
 
     try:
+        # O delta vem da linha que o DELETE de fato removeu: um segundo
+        # clique no mesmo crédito não desconta o valor de novo
         cursor.execute("""
             DELETE FROM lancamentos_credito
             WHERE id = %s AND usuario_id = %s
+            RETURNING valor, data_recebimento
         """, (credito_id, usuario_id))
+        removido = cursor.fetchone()
+        if not removido:
+            conn.rollback()
+            conn.close()
+            return False, "Crédito não encontrado ou sem permissão."
+
+        resumo_mensal.registrar_deltas(cursor, usuario_id, [
+            (removido["data_recebimento"], {"total_creditos": -removido["valor"]}),
+        ])
 
         conn.commit()
         conn.close()
+        cache.nova_versao_dados(usuario_id)
         return True, "Crédito excluído com sucesso!"
 
     except Exception as e:
@@ -1,11 +1,21 @@
 import sqlite3
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from datetime import datetime
+from psycopg2 import pool as pg_pool
+from psycopg2.extras import RealDictCursor, execute_values
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
 import os
+import re
+import threading
+import time
+import weakref
 import toml
 import streamlit as st
 
+import migrations
+
 
 # ============================================
 # 📌 Caminho banco SQLite local
@@ -18,254 +28,739 @@ DB_PATH = os.path.join(os.path.dirname(__file__), "controle_financeiro.db")
 # ============================================
 POSTGRES_CONFIG = None
 
-if "postgres" in st.secrets:
-    POSTGRES_CONFIG = dict(st.secrets["postgres"])
-else:
+
+def _secrets_streamlit(secao):
+    # Fora do `streamlit run` (CLI, cron) st.secrets falha sem secrets.toml
     try:
-        secrets_path = os.path.join(os.path.dirname(__file__), ".streamlit", "secrets.toml")
-        if os.path.exists(secrets_path):
-            secrets = toml.load(secrets_path)
-            POSTGRES_CONFIG = secrets.get("postgres")
+        if secao in st.secrets:
+            return dict(st.secrets[secao])
     except Exception:
-        POSTGRES_CONFIG = None
+        pass
+    return None
+
+
+def carregar_secrets(secao):
+    """Uma seção do secrets.toml como dict (ou None se não existir)."""
+    config = _secrets_streamlit(secao)
+
+    if config is None:
+        try:
+            secrets_path = os.path.join(os.path.dirname(__file__), ".streamlit", "secrets.toml")
+            if os.path.exists(secrets_path):
+                secrets = toml.load(secrets_path)
+                config = secrets.get(secao)
+        except Exception:
+            config = None
+
+    return config
+
+
+POSTGRES_CONFIG = carregar_secrets("postgres")
 
 
 # ============================================
-# 🔌 Conexão
+# 🔀 Adaptação do SQL ao dialeto
 # ============================================
-def get_connection():
-    if POSTGRES_CONFIG:
+# Os módulos escrevem SQL no estilo do psycopg2 (%s, %(nome)s, %%,
+# RETURNING). No SQLite o cursor é envolvido por CursorAdaptado, que
+# traduz a instrução (com cache por sql/dialeto) e devolve linhas dict,
+# como o RealDictCursor.
+SQLITE_TEM_RETURNING = sqlite3.sqlite_version_info >= (3, 35)
+
+_RE_PARAMETRO = re.compile(r"%%|%s|%\((\w+)\)s")
+_RE_RETURNING = re.compile(r"\s+RETURNING\s+(.+?)\s*;?\s*$", re.IGNORECASE | re.DOTALL)
+_RE_INSERT = re.compile(r"^\s*INSERT\s+INTO\s+(\w+)", re.IGNORECASE)
+
+InstrucaoCompilada = namedtuple("InstrucaoCompilada", "sql returning emular_returning")
+
+
+def _traduzir_parametro(m):
+    if m.group(0) == "%%":
+        return "%"
+    if m.group(1):
+        return f":{m.group(1)}"
+    return "?"
+
+
+@lru_cache(maxsize=2048)
+def compilar_sql(sql, dialeto, com_parametros=True):
+    """
+    Traduz uma instrução escrita para o psycopg2.
+
+    Como no psycopg2, os marcadores só são interpretados quando há
+    parâmetros. emular_returning = (tabela, colunas) quando o SQLite
+    não suporta RETURNING (< 3.35) e o INSERT precisa ser relido.
+    """
+    if dialeto == "postgres":
+        return InstrucaoCompilada(sql, False, None)
+
+    if com_parametros:
+        sql = _RE_PARAMETRO.sub(_traduzir_parametro, sql)
+
+    retorno = _RE_RETURNING.search(sql)
+    if retorno is None:
+        return InstrucaoCompilada(sql, False, None)
+
+    if SQLITE_TEM_RETURNING:
+        return InstrucaoCompilada(sql, True, None)
+
+    insert = _RE_INSERT.match(sql)
+    if insert is None:
+        raise sqlite3.NotSupportedError(
+            f"RETURNING fora de INSERT exige SQLite 3.35+ (atual: {sqlite3.sqlite_version})"
+        )
+    return InstrucaoCompilada(
+        sql[:retorno.start()], True, (insert.group(1), retorno.group(1))
+    )
+
+
+class CursorAdaptado:
+    """Cursor sqlite3 que aceita o SQL do psycopg2 e devolve linhas dict."""
+
+    def __init__(self, cursor, dialeto):
+        self._cursor = cursor
+        self.dialeto = dialeto
+        self._linhas = None
+        self._rowcount = None
+
+    def execute(self, sql, params=None):
+        instrucao = compilar_sql(sql, self.dialeto, params is not None)
+        self._linhas = None
+        self._rowcount = None
+
+        if params is None:
+            self._cursor.execute(instrucao.sql)
+        else:
+            self._cursor.execute(instrucao.sql, params)
+
+        if instrucao.emular_returning:
+            tabela, colunas = instrucao.emular_returning
+            self._rowcount = self._cursor.rowcount
+            self._cursor.execute(
+                f"SELECT {colunas} FROM {tabela} WHERE rowid = ?",
+                (self._cursor.lastrowid,),
+            )
+            self._linhas = self._cursor.fetchall()
+        elif instrucao.returning:
+            # Consome tudo já: o commit não pode achar a instrução pendente
+            self._linhas = self._cursor.fetchall()
+            self._rowcount = len(self._linhas)
+        return self
+
+    def executemany(self, sql, linhas):
+        self._linhas = None
+        self._rowcount = None
+        self._cursor.executemany(compilar_sql(sql, self.dialeto).sql, linhas)
+        return self
+
+    @property
+    def rowcount(self):
+        return self._rowcount if self._rowcount is not None else self._cursor.rowcount
+
+    def fetchone(self):
+        if self._linhas is not None:
+            return self._linhas.pop(0) if self._linhas else None
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        if self._linhas is not None:
+            size = size or self._cursor.arraysize
+            lote, self._linhas = self._linhas[:size], self._linhas[size:]
+            return lote
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    def fetchall(self):
+        if self._linhas is not None:
+            linhas, self._linhas = self._linhas, []
+            return linhas
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+
+def _linha_dict(cursor, row):
+    return {col[0]: valor for col, valor in zip(cursor.description, row)}
+
+
+# Tipos iguais aos do psycopg2 (todas as colunas DECIMAL do schema são (n,2))
+_CENTAVO = Decimal("0.01")
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+sqlite3.register_converter("DATE", lambda b: date.fromisoformat(b.decode()[:10]))
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter("DECIMAL", lambda b: Decimal(b.decode()).quantize(_CENTAVO))
+sqlite3.register_converter("BOOLEAN", lambda b: b not in (b"0", b"FALSE", b"false"))
+
+
+# ============================================
+# 🏊 Pool de conexões
+# ============================================
+# Valores padrão; podem ser sobrescritos no bloco [postgres] do secrets
+# com as chaves pool_min, pool_max e pool_timeout.
+POOL_MIN_CONEXOES = 2
+POOL_MAX_CONEXOES = 10
+POOL_TIMEOUT_CHECKOUT = 10      # segundos aguardando uma conexão livre
+POOL_VERIFICAR_APOS = 30        # segundos ociosa antes do health check
+
+# Chaves do secrets lidas pelo app (não são parâmetros do psycopg2)
+_CHAVES_POOL = {"pool_min", "pool_max", "pool_timeout", "disjuntor_espera"}
+
+CONNECT_TIMEOUT_PADRAO = 5      # segundos para abrir uma conexão
+CONNECT_TIMEOUT_MAXIMO = 30
+DISJUNTOR_ESPERA = 30           # segundos no SQLite antes de testar o PostgreSQL
+
+
+class BancoOcupado(RuntimeError):
+    """Todas as conexões do pool em uso além do tempo de espera (carga, não queda)."""
+
+
+class ConexaoPool:
+    """
+    Conexão emprestada do pool.
+
+    Mantém a mesma interface da conexão DB-API (cursor, commit, rollback),
+    mas close() devolve a conexão ao pool em vez de encerrá-la.
+    """
+
+    def __init__(self, pool, conn, dialeto, registro=None):
+        self._pool = pool
+        self._conn = conn
+        self._registro = registro
+        self.dialeto = dialeto
+
+    def cursor(self, *args, **kwargs):
+        if self._conn is None:
+            raise RuntimeError("Conexão já devolvida ao pool.")
+        cursor = self._conn.cursor(*args, **kwargs)
+        if self.dialeto == "sqlite":
+            return CursorAdaptado(cursor, self.dialeto)
+        return cursor
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        self._pool.devolver(conn, self._registro)
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Rede de segurança para caminhos que esquecem o close()
         try:
-            conn = psycopg2.connect(
-                **POSTGRES_CONFIG,
-                cursor_factory=RealDictCursor
+            self.close()
+        except Exception:
+            pass
+
+
+class _PoolPostgres:
+    """ThreadedConnectionPool com limite de checkout e health check."""
+
+    dialeto = "postgres"
+
+    def __init__(self, config, minconn, maxconn, timeout):
+        self._pool = pg_pool.ThreadedConnectionPool(
+            minconn, maxconn, cursor_factory=RealDictCursor, **config
+        )
+        self._vagas = threading.BoundedSemaphore(maxconn)
+        self._timeout = timeout
+        # Conexões paradas no pool -> instante da devolução. Chave fraca:
+        # a entrada some com a conexão (id() podia ser reaproveitado)
+        self._ociosas = weakref.WeakKeyDictionary()
+        self._em_uso = 0
+        self._lock = threading.Lock()
+        self.maxconn = maxconn
+        self.stats = {
+            "checkouts": 0,
+            "devolucoes": 0,
+            "descartadas": 0,
+            "esgotamentos": 0,
+        }
+
+        # As minconn conexões abertas pelo ThreadedConnectionPool
+        iniciais = [self._pool.getconn() for _ in range(minconn)]
+        agora = time.monotonic()
+        for conn in iniciais:
+            self._ociosas[conn] = agora
+            self._pool.putconn(conn)
+
+    def obter(self):
+        if not self._vagas.acquire(timeout=self._timeout):
+            with self._lock:
+                self.stats["esgotamentos"] += 1
+            raise BancoOcupado(
+                "Muitos acessos ao mesmo tempo. Tente novamente em instantes."
             )
-            return conn
-        except Exception as e:
-            print("❌ Erro PostgreSQL:", e)
-            print("➡️ Usando SQLite...")
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+        try:
+            conn = self._pool.getconn()
+            # Várias ociosas podem ter caído juntas (ex.: servidor
+            # reiniciado); uma conexão nova não tem registro e passa
+            while not self._saudavel(conn):
+                self._descartar(conn)
+                conn = self._pool.getconn()
+        except Exception:
+            self._vagas.release()
+            raise
+
+        with self._lock:
+            self.stats["checkouts"] += 1
+            self._em_uso += 1
+        return ConexaoPool(self, conn, self.dialeto)
+
+    def devolver(self, conn, registro=None):
+        try:
+            with self._lock:
+                self.stats["devolucoes"] += 1
+                self._em_uso -= 1
+            if conn.closed:
+                self._descartar(conn)
+            else:
+                # Registrada antes do putconn: depois dele outra thread
+                # já pode tê-la emprestado
+                with self._lock:
+                    self._ociosas[conn] = time.monotonic()
+                # putconn faz rollback de transações pendentes e fecha
+                # as que passam de minconn
+                self._pool.putconn(conn)
+                if conn.closed:
+                    with self._lock:
+                        self._ociosas.pop(conn, None)
+        finally:
+            self._vagas.release()
+
+    def _saudavel(self, conn):
+        with self._lock:
+            ultimo_uso = self._ociosas.pop(conn, None)
+
+        if conn.closed:
+            return False
+        if ultimo_uso is None or time.monotonic() - ultimo_uso < POOL_VERIFICAR_APOS:
+            return True
+
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _descartar(self, conn):
+        with self._lock:
+            self._ociosas.pop(conn, None)
+            self.stats["descartadas"] += 1
+        self._pool.putconn(conn, close=True)
+
+    def estatisticas(self):
+        with self._lock:
+            dados = dict(self.stats)
+            dados.update({
+                "em_uso": self._em_uso,
+                "ociosas": len(self._ociosas),
+                "max": self.maxconn,
+            })
+        return dados
+
+    def fechar(self):
+        self._pool.closeall()
+
+
+class _ConexaoThread:
+    """Conexão SQLite de uma thread + contador de empréstimos aninhados."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.emprestimos = 0
+
+
+class _PoolSQLite:
+    """Uma conexão SQLite por thread, reaproveitada entre chamadas."""
+
+    dialeto = "sqlite"
+
+    def __init__(self, caminho):
+        self._caminho = caminho
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {"checkouts": 0, "devolucoes": 0, "criadas": 0, "abertas": 0}
+
+    def obter(self):
+        registro = getattr(self._local, "registro", None)
+
+        if registro is None or not self._saudavel(registro.conn):
+            conn = sqlite3.connect(self._caminho, detect_types=sqlite3.PARSE_DECLTYPES)
+            conn.row_factory = _linha_dict
+            registro = _ConexaoThread(conn)
+            self._local.registro = registro
+            # Fecha a conexão quando a thread terminar
+            weakref.finalize(registro, self._encerrar, conn)
+            with self._lock:
+                self.stats["criadas"] += 1
+                self.stats["abertas"] += 1
+
+        registro.emprestimos += 1
+        with self._lock:
+            self.stats["checkouts"] += 1
+        return ConexaoPool(self, registro.conn, self.dialeto, registro)
+
+    def devolver(self, conn, registro=None):
+        registro.emprestimos -= 1
+        if registro.emprestimos == 0 and conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self.stats["devolucoes"] += 1
+
+    @staticmethod
+    def _saudavel(conn):
+        try:
+            conn.total_changes
+            return True
+        except sqlite3.ProgrammingError:
+            return False
+
+    def _encerrar(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self.stats["abertas"] -= 1
+
+    def estatisticas(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def fechar(self):
+        registro = getattr(self._local, "registro", None)
+        if registro is not None:
+            self._local.registro = None
+            self._encerrar(registro.conn)
+
+
+_pool_pg = None
+_pool_sqlite = None
+_pool_lock = threading.Lock()
+
+
+def _separar_config_pool(config):
+    conexao = {k: v for k, v in config.items() if k not in _CHAVES_POOL}
+    timeout_conexao = int(conexao.get("connect_timeout", CONNECT_TIMEOUT_PADRAO))
+    # 0 no libpq é "esperar para sempre": sempre limitamos
+    conexao["connect_timeout"] = min(max(timeout_conexao, 1), CONNECT_TIMEOUT_MAXIMO)
+    minconn = int(config.get("pool_min", POOL_MIN_CONEXOES))
+    maxconn = int(config.get("pool_max", POOL_MAX_CONEXOES))
+    timeout = float(config.get("pool_timeout", POOL_TIMEOUT_CHECKOUT))
+    return conexao, min(minconn, maxconn), maxconn, timeout
+
+
+def _obter_pool_postgres():
+    global _pool_pg
+    if _pool_pg is None:
+        with _pool_lock:
+            if _pool_pg is None:
+                config, minconn, maxconn, timeout = _separar_config_pool(POSTGRES_CONFIG)
+                _pool_pg = _PoolPostgres(config, minconn, maxconn, timeout)
+    return _pool_pg
+
+
+def _obter_pool_sqlite():
+    global _pool_sqlite
+    if _pool_sqlite is None:
+        with _pool_lock:
+            if _pool_sqlite is None:
+                _pool_sqlite = _PoolSQLite(DB_PATH)
+    return _pool_sqlite
 
 
 # ============================================
-# 🏗️ Criar tabelas
+# ⚡ Disjuntor do PostgreSQL
 # ============================================
-def init_database():
-    conn = get_connection()
-    cursor = conn.cursor()
+class _Disjuntor:
+    """
+    fechado: get_connection usa o PostgreSQL.
+    aberto: após uma falha de conexão, vai direto ao SQLite enquanto uma
+    thread testa o PostgreSQL a cada `espera` segundos; o primeiro teste
+    bem-sucedido fecha o disjuntor.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.estado = "fechado"
+        self.falhas = 0
+        self.ultima_falha = None
+        self.aberto_desde = None
+        self.proximo_teste = None
+        self._sonda = None
+
+    def permite(self):
+        return self.estado == "fechado"
+
+    def registrar_falha(self, erro):
+        with self._lock:
+            self.falhas += 1
+            self.ultima_falha = str(erro).strip()
+            if self.estado == "aberto":
+                return False
+            self.estado = "aberto"
+            self.aberto_desde = time.time()
+            self._sonda = threading.Thread(
+                target=self._sondar, name="sonda-postgres", daemon=True
+            )
+            self._sonda.start()
+            return True
+
+    def _sondar(self):
+        sonda = threading.current_thread()
+        while self._sonda is sonda:
+            espera = float((POSTGRES_CONFIG or {}).get("disjuntor_espera", DISJUNTOR_ESPERA))
+            self.proximo_teste = time.time() + espera
+            time.sleep(espera)
+
+            if self._sonda is not sonda or not POSTGRES_CONFIG:
+                return
+            try:
+                config = _separar_config_pool(POSTGRES_CONFIG)[0]
+                conn = psycopg2.connect(**config)
+                conn.close()
+            except Exception as e:
+                with self._lock:
+                    self.ultima_falha = str(e).strip()
+                continue
+
+            with self._lock:
+                if self._sonda is sonda:
+                    self.estado = "fechado"
+                    self.aberto_desde = None
+                    self.proximo_teste = None
+                    self._sonda = None
+            print("✔ PostgreSQL disponível novamente.")
+            return
+
+    def reiniciar(self):
+        with self._lock:
+            self.estado = "fechado"
+            self.aberto_desde = None
+            self.proximo_teste = None
+            self._sonda = None  # uma sonda em andamento encerra sozinha
+
+    def estado_atual(self):
+        with self._lock:
+            return {
+                "estado": self.estado,
+                "falhas": self.falhas,
+                "ultima_falha": self.ultima_falha,
+                "aberto_desde": self.aberto_desde,
+                "proximo_teste": self.proximo_teste,
+            }
+
+
+_disjuntor = _Disjuntor()
+
+
+def estado_backend():
+    """Backend em uso e estado do disjuntor (para monitoramento)."""
+    disjuntor = _disjuntor.estado_atual()
+    usa_postgres = bool(POSTGRES_CONFIG) and disjuntor["estado"] == "fechado"
+    return {
+        "backend": "postgres" if usa_postgres else "sqlite",
+        "postgres_configurado": bool(POSTGRES_CONFIG),
+        "disjuntor": disjuntor,
+    }
+
+
+def estatisticas_pool():
+    """Estatísticas de uso dos pools (None para backend ainda não usado)."""
+    return {
+        "postgres": _pool_pg.estatisticas() if _pool_pg else None,
+        "sqlite": _pool_sqlite.estatisticas() if _pool_sqlite else None,
+    }
+
+
+def fechar_pool():
+    """Fecha as conexões mantidas pelos pools (ex.: ao trocar de banco)."""
+    global _pool_pg, _pool_sqlite
+    with _pool_lock:
+        if _pool_pg is not None:
+            _pool_pg.fechar()
+        if _pool_sqlite is not None:
+            _pool_sqlite.fechar()
+        _pool_pg = None
+        _pool_sqlite = None
+        _backends_migrados.clear()
+    _disjuntor.reiniciar()
 
-    is_postgres = isinstance(conn, psycopg2.extensions.connection)
 
-    def ddl(sql):
+# ============================================
+# 🧱 Migrações por backend
+# ============================================
+# Cada backend é migrado na primeira conexão que o processo faz a ele:
+# o PostgreSQL que volta depois do boot (disjuntor fechando) ou o
+# SQLite usado pela primeira vez quando o disjuntor abre.
+_backends_migrados = set()
+_migracoes_lock = threading.Lock()
+
+
+def _migrar(conn):
+    """Aplica as migrações pendentes no backend de conn e o marca como migrado."""
+    with _migracoes_lock:
+        aplicadas = migrations.aplicar_migracoes(conn)
+        _backends_migrados.add(conn.dialeto)
+    return aplicadas
+
+
+def _garantir_migracoes(conn):
+    if conn.dialeto not in _backends_migrados:
         try:
-            cursor.execute(sql)
-            conn.commit()
-        except Exception as e:
-            if "already exists" not in str(e):
-                print("Erro DDL:", e)
-
-    # ---------------------------
-    # ✔ Tabelas principais
-    # ---------------------------
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            nome_completo TEXT NOT NULL,
-            email TEXT,
-            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS fornecedores (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            usuario_id INTEGER NOT NULL,
-            nome TEXT NOT NULL,
-            cpf_cnpj TEXT,
-            telefone TEXT,
-            email TEXT,
-            ativo {'BOOLEAN DEFAULT TRUE' if is_postgres else 'BOOLEAN DEFAULT 1'},
-            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+            _migrar(conn)
+        except Exception:
+            conn.close()
+            raise
+    return conn
 
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS formas_pagamento (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            descricao TEXT NOT NULL,
-            ativo BOOLEAN DEFAULT TRUE
-        )
-    """)
-
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS tipos_documento (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            descricao TEXT NOT NULL,
-            requer_bandeira BOOLEAN DEFAULT FALSE,
-            permite_parcelamento BOOLEAN DEFAULT FALSE,
-            ativo BOOLEAN DEFAULT TRUE
-        )
-    """)
 
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS bandeiras_cartao (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            descricao TEXT NOT NULL,
-            ativo BOOLEAN DEFAULT TRUE
-        )
-    """)
+# ============================================
+# 🔌 Conexão
+# ============================================
+def get_connection():
+    """
+    Empresta uma conexão do pool. Chamar close() devolve ao pool.
+    Com o disjuntor aberto vai direto ao SQLite, sem esperar timeout.
 
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS status_documento (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            descricao TEXT NOT NULL,
-            cor TEXT
-        )
-    """)
+    Pool esgotado é carga, não queda: espera até pool_timeout e levanta
+    BancoOcupado, sem desviar para o SQLite (os dados ficariam
+    divididos entre os dois bancos).
 
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS tipos_credito (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            descricao TEXT NOT NULL,
-            ativo BOOLEAN DEFAULT TRUE
-        )
-    """)
-
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS lancamentos_debito (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            usuario_id INTEGER NOT NULL,
-            fornecedor_id INTEGER NOT NULL,
-            forma_pagamento_id INTEGER NOT NULL,
-            tipo_documento_id INTEGER NOT NULL,
-            bandeira_cartao_id INTEGER,
-            valor_total DECIMAL(10,2) NOT NULL,
-            descricao TEXT,
-            quantidade_parcelas INTEGER DEFAULT 1,
-            data_lancamento DATE NOT NULL,
-            observacoes TEXT
-        )
-    """)
-
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS parcelas_debito (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            lancamento_debito_id INTEGER NOT NULL,
-            numero_parcela INTEGER NOT NULL,
-            valor_parcela DECIMAL(10,2) NOT NULL,
-            data_vencimento DATE NOT NULL,
-            status_id INTEGER DEFAULT 1,
-            data_pagamento DATE,
-            valor_pago DECIMAL(10,2),
-            observacoes TEXT
-        )
-    """)
-
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS lancamentos_credito (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            usuario_id INTEGER NOT NULL,
-            tipo_credito_id INTEGER NOT NULL,
-            valor DECIMAL(10,2) NOT NULL,
-            descricao TEXT,
-            data_recebimento DATE NOT NULL,
-            observacoes TEXT,
-            data_lancamento TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    # ---------------------------
-    # ✔ NOVA TABELA — meios de pagamento por usuário
-    # ---------------------------
-    ddl(f"""
-        CREATE TABLE IF NOT EXISTS meios_pagamento_usuario (
-            id {'SERIAL' if is_postgres else 'INTEGER PRIMARY KEY AUTOINCREMENT'},
-            usuario_id INTEGER NOT NULL,
-            tipo TEXT NOT NULL,                 -- cartao_credito | cartao_debito | pix
-            banco TEXT NOT NULL,                -- Nubank | Caixa | Santander...
-            bandeira TEXT,                      -- Visa | Master (somente cartões)
-            ultimos_digitos TEXT,               -- 4 últimos dígitos
-            ativo {'BOOLEAN DEFAULT TRUE' if is_postgres else 'BOOLEAN DEFAULT 1'},
-            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+    Na primeira conexão a cada backend, aplica as migrações pendentes.
+    """
+    return _garantir_migracoes(_emprestar())
+
+
+def _emprestar():
+    if POSTGRES_CONFIG and _disjuntor.permite():
+        try:
+            return _obter_pool_postgres().obter()
+        except BancoOcupado:
+            raise
+        except Exception as e:
+            if _disjuntor.registrar_falha(e):
+                print("❌ Erro PostgreSQL:", e)
+                print("➡️ Usando SQLite até o PostgreSQL voltar...")
 
-    _insert_default_data(cursor, is_postgres)
-    conn.close()
+    return _obter_pool_sqlite().obter()
 
 
 # ============================================
-# Inserir dados padrão
+# 📦 Inserção em lote
 # ============================================
-def _insert_default_data(cursor, is_postgres):
+def dialeto_do_cursor(cursor):
+    dialeto = getattr(cursor, "dialeto", None)
+    if dialeto:
+        return dialeto
+    return "postgres" if isinstance(cursor, psycopg2.extensions.cursor) else "sqlite"
 
-    def empty(table):
-        cursor.execute(f"SELECT COUNT(*) as total FROM {table}")
-        row = cursor.fetchone()
-        return (row["total"] if isinstance(row, dict) else row[0]) == 0
 
-    q_pg = "%s, %s" if is_postgres else "?, ?"
-    q_pg4 = "%s, %s, %s, %s" if is_postgres else "?, ?, ?, ?"
+def iniciar_escrita(cursor):
+    """
+    Para ler linhas que a mesma transação vai alterar. No SQLite abre a
+    transação já com o lock de escrita (BEGIN IMMEDIATE); sem ele, duas
+    escritas concorrentes leem o mesmo estado antigo. No PostgreSQL o
+    lock é por linha: use para_atualizar() no SELECT.
+    """
+    if dialeto_do_cursor(cursor) == "sqlite" and not cursor.connection.in_transaction:
+        cursor.execute("BEGIN IMMEDIATE")
 
-    # formas_pagamento
-    if empty("formas_pagamento"):
-        cursor.executemany(
-            f"INSERT INTO formas_pagamento (descricao, ativo) VALUES ({q_pg})",
-            [('À Vista', True), ('A Prazo', True)]
-        )
 
-    # tipos_documento
-    if empty("tipos_documento"):
-        cursor.executemany(
-            f"INSERT INTO tipos_documento (descricao, requer_bandeira, permite_parcelamento, ativo) VALUES ({q_pg4})",
-            [
-                ('Carnê', False, True, True),
-                ('Promissória', False, True, True),
-                ('Boleto Bancário', False, True, True),
-                ('Cartão de Crédito', True, True, True),
-                ('Cartão de Débito', True, False, True),
-                ('Dinheiro', False, False, True),
-                ('PIX', False, False, True),
-                ('Financiamento', False, True, True),
-            ]
-        )
+def para_atualizar(cursor, tabela=None):
+    """Cláusula FOR UPDATE [OF tabela] no PostgreSQL; vazia no SQLite."""
+    if dialeto_do_cursor(cursor) != "postgres":
+        return ""
+    return f"FOR UPDATE OF {tabela}" if tabela else "FOR UPDATE"
 
-    # bandeiras_cartao
-    if empty("bandeiras_cartao"):
-        cursor.executemany(
-            f"INSERT INTO bandeiras_cartao (descricao, ativo) VALUES ({q_pg})",
-            [('Visa', True), ('Mastercard', True), ('Elo', True),
-             ('American Express', True), ('Hipercard', True)]
-        )
 
-    # status_documento
-    if empty("status_documento"):
-        cursor.executemany(
-            f"INSERT INTO status_documento (descricao, cor) VALUES ({q_pg})",
-            [('Aberto', '#FFA500'), ('Pago', '#28A745'),
-             ('Vencido', '#DC3545'), ('Cancelado', '#6C757D')]
-        )
+def inserir_em_lote(cursor, sql, linhas, template=None, page_size=1000):
+    """
+    Executa um INSERT multi-linha (ou UPDATE ... FROM (VALUES %s)).
 
-    # tipos_credito
-    if empty("tipos_credito"):
-        cursor.executemany(
-            f"INSERT INTO tipos_credito (descricao, ativo) VALUES ({q_pg})",
-            [('Salário', True), ('Premiação', True),
-             ('13º Salário', True), ('Férias', True), ('Outros', True)]
-        )
+    sql usa um único %s no lugar da lista de VALUES, ex.:
+        "INSERT INTO t (a, b) VALUES %s ON CONFLICT ..."
+    PostgreSQL: execute_values (uma instrução a cada page_size linhas).
+    SQLite: executemany com o template (sem rede, custo local).
+    """
+    if not linhas:
+        return
+
+    if template is None:
+        template = "(" + ", ".join(["%s"] * len(linhas[0])) + ")"
+
+    if dialeto_do_cursor(cursor) == "postgres":
+        execute_values(cursor, sql, linhas, template=template, page_size=page_size)
+    else:
+        cursor.executemany(sql.replace("%s", template, 1), linhas)
 
-    cursor.connection.commit()
+
+# ============================================
+# 🏗️ Criar / atualizar tabelas
+# ============================================
+def init_database():
+    """
+    Aplica as migrações pendentes (pasta migrations/) no backend em uso.
+    Com o schema em dia, custa uma única consulta de versão.
+    (get_connection já migra cada backend no primeiro uso; esta função
+    devolve a lista do que foi aplicado, para o CLI.)
+    """
+    conn = _emprestar()
+    try:
+        return _migrar(conn)
+    finally:
+        conn.close()
 
 
 # ============================================
 # Execução direta
 # ============================================
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Utilitários do banco de dados")
+    parser.add_argument(
+        "--init-db",
+        action="store_true",
+        help="Aplica as migrações pendentes (padrão sem argumentos)",
+    )
+    parser.add_argument(
+        "--estado",
+        action="store_true",
+        help="Mostra o backend em uso, o disjuntor e os pools",
+    )
+    args = parser.parse_args()
+
+    if args.estado:
+        get_connection().close()
+        print(estado_backend())
+        print(estatisticas_pool())
+        raise SystemExit(0)
+
     print("Inicializando banco...")
-    init_database()
+    aplicadas = init_database()
+    for versao, nome in aplicadas:
+        print(f"  ✔ {versao:04d}_{nome}")
     print("Banco iniciado com sucesso!")
@@ -4,8 +4,12 @@
 # Compatível com PostgreSQL (Supabase)
 # ============================================
 
-from database import get_connection
-from datetime import datetime, timedelta
+from database import get_connection, iniciar_escrita, inserir_em_lote, para_atualizar
+from datetime import datetime
+import cache
+import dinheiro
+import parcelamento
+import resumo_mensal
 
 
 # =====================================================
@@ -22,11 +26,22 @@ def criar_lancamento_debito(
     bandeira_cartao_id=None,
     data_lancamento=None,
     data_primeira_parcela=None,
-    observacoes=None
+    observacoes=None,
+    meio_pagamento_id=None
 ):
     """
     Cria um lançamento de débito e gera as parcelas automaticamente.
+
+    Sem data_primeira_parcela, a 1ª parcela vence pela regra da fatura
+    do cartão (meio_pagamento_id com fechamento/vencimento) ou um mês
+    após o lançamento. As demais vencem mês a mês no mesmo dia.
+
+    data_primeira_parcela igual à sugerida pela regra do cartão conta
+    como regra: o lançamento fica marcado (vencimento_pela_regra) e
+    acompanha mudanças na fatura. Outra data é do usuário e não muda.
     """
+    valor_total = dinheiro.para_banco(valor_total)
+
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -34,8 +49,27 @@ def criar_lancamento_debito(
         if data_lancamento is None:
             data_lancamento = datetime.now().date()
 
-        if data_primeira_parcela is None:
-            data_primeira_parcela = data_lancamento + timedelta(days=30)
+        regra = (None, None)
+        if meio_pagamento_id:
+            regra = _regra_cartao(cursor, usuario_id, meio_pagamento_id)
+
+        pela_regra = all(regra) and (
+            data_primeira_parcela is None
+            or data_primeira_parcela == parcelamento.primeiro_vencimento_cartao(data_lancamento, *regra)
+        )
+
+        if pela_regra:
+            cronograma = parcelamento.gerar_parcelas(
+                valor_total, quantidade_parcelas, data_lancamento, *regra
+            )
+        elif data_primeira_parcela is not None:
+            cronograma = parcelamento.gerar_parcelas(
+                valor_total, quantidade_parcelas, data_primeira_parcela
+            )
+        else:
+            cronograma = parcelamento.gerar_parcelas(
+                valor_total, quantidade_parcelas, data_lancamento, meses_primeira=1
+            )
 
         # Inserir lançamento principal
         cursor.execute(
@@ -50,10 +84,12 @@ def criar_lancamento_debito(
                 descricao,
                 quantidade_parcelas,
                 data_lancamento,
-                observacoes
+                observacoes,
+                meio_pagamento_id,
+                vencimento_pela_regra
             )
             VALUES (%s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s)
+                    %s, %s, %s, %s, %s, %s, %s)
             RETURNING id
         """,
             (
@@ -67,37 +103,45 @@ def criar_lancamento_debito(
                 quantidade_parcelas,
                 data_lancamento,
                 observacoes,
+                meio_pagamento_id,
+                bool(pela_regra),
             ),
         )
 
         lancamento_id = cursor.fetchone()["id"]
 
-        # Cálculo das parcelas (ajustando centavos na última)
-        valor_parcela = round(valor_total / quantidade_parcelas, 2)
-        soma_parcelas = valor_parcela * (quantidade_parcelas - 1)
-        ultima_parcela = round(valor_total - soma_parcelas, 2)
-
-        for i in range(quantidade_parcelas):
-            numero_parcela = i + 1
-            data_vencimento = data_primeira_parcela + timedelta(days=30 * i)
-            valor = ultima_parcela if numero_parcela == quantidade_parcelas else valor_parcela
-
-            cursor.execute(
-                """
-                INSERT INTO parcelas_debito (
-                    lancamento_debito_id,
-                    numero_parcela,
-                    valor_parcela,
-                    data_vencimento,
-                    status_id
-                )
-                VALUES (%s, %s, %s, %s, 1)
-            """,
-                (lancamento_id, numero_parcela, valor, data_vencimento),
+        # Parcelas em centavos (ajuste na última), vencimento mês a mês
+        parcelas = [
+            (lancamento_id, numero_parcela, valor, data_vencimento)
+            for numero_parcela, valor, data_vencimento in cronograma
+        ]
+        deltas_resumo = [
+            (data_vencimento, resumo_mensal.contribuicao_parcela(valor, 1))
+            for _, _, valor, data_vencimento in parcelas
+        ]
+
+        # Todas as parcelas em uma única instrução multi-linha
+        inserir_em_lote(
+            cursor,
+            """
+            INSERT INTO parcelas_debito (
+                lancamento_debito_id,
+                numero_parcela,
+                valor_parcela,
+                data_vencimento,
+                status_id
             )
+            VALUES %s
+        """,
+            parcelas,
+            template="(%s, %s, %s, %s, 1)",
+        )
+
+        resumo_mensal.registrar_deltas(cursor, usuario_id, deltas_resumo)
 
         conn.commit()
         conn.close()
+        cache.nova_versao_dados(usuario_id)
         return True, lancamento_id, "Lançamento criado com sucesso!"
 
     except Exception as e:
@@ -107,71 +151,197 @@ def criar_lancamento_debito(
 
 
 # =====================================================
-# 📋 LISTAR PARCELAS
+# 💳 REGRA DA FATURA DO CARTÃO
 # =====================================================
-def listar_parcelas_debito(
-    usuario_id,
-    fornecedor_id=None,
-    status_id=None,
-    data_inicio=None,
-    data_fim=None,
-):
+def _regra_cartao(cursor, usuario_id, meio_pagamento_id):
+    """(dia_fechamento, dia_vencimento) do meio de pagamento, ou (None, None)."""
+    cursor.execute(
+        """
+        SELECT dia_fechamento, dia_vencimento
+        FROM meios_pagamento_usuario
+        WHERE id = %s AND usuario_id = %s
+    """,
+        (meio_pagamento_id, usuario_id),
+    )
+    row = cursor.fetchone()
+    if not row:
+        return None, None
+    return row["dia_fechamento"], row["dia_vencimento"]
+
+
+def recalcular_vencimentos_cartao(usuario_id, meio_pagamento_id):
     """
-    Lista parcelas de débito com filtros opcionais.
+    Refaz os vencimentos das parcelas em aberto dos lançamentos feitos
+    com o cartão, pela regra atual da fatura (ex.: depois de mudar o
+    dia de vencimento). Parcelas pagas ou vencidas não mudam.
+    Só entram lançamentos com vencimento_pela_regra: datas escolhidas
+    ou editadas pelo usuário ficam como estão.
+    Todos os lançamentos do cartão são calculados de uma vez.
     """
     conn = get_connection()
     cursor = conn.cursor()
 
-    query = """
-        SELECT 
-            pd.id,
-            pd.lancamento_debito_id,
-            pd.numero_parcela,
-            pd.valor_parcela,
-            pd.data_vencimento,
-            pd.status_id,
-            pd.data_pagamento,
-            pd.valor_pago,
-            pd.observacoes,
-            ld.descricao AS lancamento_descricao,
-            ld.quantidade_parcelas,
-            ld.valor_total AS lancamento_valor_total,
-            f.nome AS fornecedor_nome,
-            f.id AS fornecedor_id,
-            s.descricao AS status_descricao,
-            s.cor AS status_cor,
-            td.descricao AS tipo_documento,
-            fp.descricao AS forma_pagamento,
-            bc.descricao AS bandeira_cartao
-        FROM parcelas_debito pd
-        INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
-        INNER JOIN fornecedores f ON ld.fornecedor_id = f.id
-        INNER JOIN status_documento s ON pd.status_id = s.id
-        INNER JOIN tipos_documento td ON ld.tipo_documento_id = td.id
-        INNER JOIN formas_pagamento fp ON ld.forma_pagamento_id = fp.id
-        LEFT JOIN bandeiras_cartao bc ON ld.bandeira_cartao_id = bc.id
-        WHERE ld.usuario_id = %s
-    """
+    try:
+        dia_fechamento, dia_vencimento = _regra_cartao(cursor, usuario_id, meio_pagamento_id)
+        if not (dia_fechamento and dia_vencimento):
+            conn.close()
+            return False, 0, "Cartão sem dia de fechamento e de vencimento."
+
+        cursor.execute(
+            """
+            SELECT id, valor_total, quantidade_parcelas, data_lancamento
+            FROM lancamentos_debito
+            WHERE usuario_id = %s AND meio_pagamento_id = %s
+              AND vencimento_pela_regra = TRUE
+        """,
+            (usuario_id, meio_pagamento_id),
+        )
+        lancamentos = cursor.fetchall()
+
+        if not lancamentos:
+            conn.close()
+            return True, 0, "Nenhum lançamento com este cartão."
+
+        cronograma = parcelamento.gerar_cronogramas(
+            [l["valor_total"] for l in lancamentos],
+            [l["quantidade_parcelas"] or 1 for l in lancamentos],
+            [l["data_lancamento"] for l in lancamentos],
+            [dia_fechamento] * len(lancamentos),
+            [dia_vencimento] * len(lancamentos),
+        )
+        novos_vencimentos = {
+            (lancamento_id, numero): vencimento
+            for lancamento_id, numero, _, vencimento in parcelamento.linhas_parcelas(
+                cronograma, [l["id"] for l in lancamentos]
+            )
+        }
+
+        cursor.execute(
+            """
+            SELECT pd.id, pd.lancamento_debito_id, pd.numero_parcela,
+                   pd.valor_parcela, pd.data_vencimento
+            FROM parcelas_debito pd
+            INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
+            WHERE ld.usuario_id = %s AND ld.meio_pagamento_id = %s AND pd.status_id = 1
+              AND ld.vencimento_pela_regra = TRUE
+        """,
+            (usuario_id, meio_pagamento_id),
+        )
+
+        alteracoes = []
+        deltas_resumo = []
+        for p in cursor.fetchall():
+            novo = novos_vencimentos.get((p["lancamento_debito_id"], p["numero_parcela"]))
+            if novo is None or novo == p["data_vencimento"]:
+                continue
+
+            contribuicao = resumo_mensal.contribuicao_parcela(p["valor_parcela"], 1)
+            alteracoes.append((p["id"], novo))
+            deltas_resumo.append((p["data_vencimento"], resumo_mensal.negativo(contribuicao)))
+            deltas_resumo.append((novo, contribuicao))
 
+        inserir_em_lote(
+            cursor,
+            """
+            UPDATE parcelas_debito AS pd
+            SET data_vencimento = v.column2
+            FROM (VALUES %s) AS v
+            WHERE pd.id = v.column1
+        """,
+            alteracoes,
+        )
+
+        resumo_mensal.registrar_deltas(cursor, usuario_id, deltas_resumo)
+
+        conn.commit()
+        conn.close()
+        if alteracoes:
+            cache.nova_versao_dados(usuario_id)
+        return True, len(alteracoes), f"{len(alteracoes)} parcela(s) com novo vencimento."
+
+    except Exception as e:
+        conn.rollback()
+        conn.close()
+        return False, 0, f"Erro ao recalcular vencimentos: {str(e)}"
+
+
+# =====================================================
+# 📋 LISTAR PARCELAS
+# =====================================================
+TAMANHO_PAGINA_PADRAO = 50
+
+_SELECT_PARCELAS = """
+    SELECT 
+        pd.id,
+        pd.lancamento_debito_id,
+        pd.numero_parcela,
+        pd.valor_parcela,
+        pd.data_vencimento,
+        pd.status_id,
+        pd.data_pagamento,
+        pd.valor_pago,
+        pd.observacoes,
+        ld.descricao AS lancamento_descricao,
+        ld.quantidade_parcelas,
+        ld.valor_total AS lancamento_valor_total,
+        f.nome AS fornecedor_nome,
+        f.id AS fornecedor_id,
+        s.descricao AS status_descricao,
+        s.cor AS status_cor,
+        td.descricao AS tipo_documento,
+        fp.descricao AS forma_pagamento,
+        bc.descricao AS bandeira_cartao
+    FROM parcelas_debito pd
+    INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
+    INNER JOIN fornecedores f ON ld.fornecedor_id = f.id
+    INNER JOIN status_documento s ON pd.status_id = s.id
+    INNER JOIN tipos_documento td ON ld.tipo_documento_id = td.id
+    INNER JOIN formas_pagamento fp ON ld.forma_pagamento_id = fp.id
+    LEFT JOIN bandeiras_cartao bc ON ld.bandeira_cartao_id = bc.id
+"""
+
+
+def _filtros_parcelas(usuario_id, fornecedor_id, status_id, data_inicio, data_fim):
+    """WHERE comum às listagens de parcelas (usa só pd e ld)."""
+    where = " WHERE ld.usuario_id = %s"
     params = [usuario_id]
 
     if fornecedor_id:
-        query += " AND f.id = %s"
+        where += " AND ld.fornecedor_id = %s"
         params.append(fornecedor_id)
 
     if status_id:
-        query += " AND pd.status_id = %s"
+        where += " AND pd.status_id = %s"
         params.append(status_id)
 
     if data_inicio:
-        query += " AND pd.data_vencimento >= %s"
+        where += " AND pd.data_vencimento >= %s"
         params.append(data_inicio)
 
     if data_fim:
-        query += " AND pd.data_vencimento <= %s"
+        where += " AND pd.data_vencimento <= %s"
         params.append(data_fim)
 
-    query += " ORDER BY pd.data_vencimento, f.nome"
+    return where, params
+
+
+def listar_parcelas_debito(
+    usuario_id,
+    fornecedor_id=None,
+    status_id=None,
+    data_inicio=None,
+    data_fim=None,
+):
+    """
+    Lista parcelas de débito com filtros opcionais.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    where, params = _filtros_parcelas(
+        usuario_id, fornecedor_id, status_id, data_inicio, data_fim
+    )
+    query = _SELECT_PARCELAS + where + " ORDER BY pd.data_vencimento, f.nome"
 
     cursor.execute(query, params)
     rows = cursor.fetchall()
@@ -180,6 +350,90 @@ def listar_parcelas_debito(
     return rows
 
 
+def listar_parcelas_debito_pagina(
+    usuario_id,
+    fornecedor_id=None,
+    status_id=None,
+    data_inicio=None,
+    data_fim=None,
+    apos=None,
+    tamanho_pagina=TAMANHO_PAGINA_PADRAO,
+):
+    """
+    Uma página de parcelas, ordenada por (data_vencimento, id).
+
+    apos: cursor (data_vencimento, id) da última parcela da página anterior.
+    Retorna (parcelas, proximo_cursor); proximo_cursor é None na última página.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    where, params = _filtros_parcelas(
+        usuario_id, fornecedor_id, status_id, data_inicio, data_fim
+    )
+
+    if apos:
+        where += " AND (pd.data_vencimento, pd.id) > (%s, %s)"
+        params.extend(apos)
+
+    # Uma linha a mais indica se existe próxima página
+    query = _SELECT_PARCELAS + where + " ORDER BY pd.data_vencimento, pd.id LIMIT %s"
+    params.append(tamanho_pagina + 1)
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    if len(rows) > tamanho_pagina:
+        rows = rows[:tamanho_pagina]
+        ultima = rows[-1]
+        return rows, (ultima["data_vencimento"], ultima["id"])
+
+    return rows, None
+
+
+def resumir_parcelas_debito(
+    usuario_id,
+    fornecedor_id=None,
+    status_id=None,
+    data_inicio=None,
+    data_fim=None,
+):
+    """
+    Quantidade e totais das parcelas filtradas (cabeçalho da paginação).
+    Os totais saem em Centavos (dinheiro.py).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    where, params = _filtros_parcelas(
+        usuario_id, fornecedor_id, status_id, data_inicio, data_fim
+    )
+
+    cursor.execute(
+        f"""
+        SELECT
+            COUNT(*) AS total,
+            COALESCE(SUM(pd.valor_parcela), 0) AS valor_total,
+            COALESCE(SUM(CASE WHEN pd.status_id IN (1, 3)
+                              THEN pd.valor_parcela ELSE 0 END), 0) AS valor_em_aberto
+        FROM parcelas_debito pd
+        INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
+        {where}
+    """,
+        params,
+    )
+
+    row = cursor.fetchone()
+    conn.close()
+
+    return {
+        "total": row["total"],
+        "valor_total": dinheiro.centavos(row["valor_total"]),
+        "valor_em_aberto": dinheiro.centavos(row["valor_em_aberto"]),
+    }
+
+
 # =====================================================
 # 🔄 ATUALIZAR STATUS AUTOMATICAMENTE (VENCIDAS)
 # =====================================================
@@ -208,6 +462,9 @@ def atualizar_status_parcela_vencida():
         conn.commit()
         conn.close()
 
+        if linhas_afetadas:
+            cache.nova_versao_dados()
+
         return True, linhas_afetadas
 
     except Exception as e:
@@ -229,19 +486,25 @@ def baixar_parcela(
     """
     Baixa (paga) uma parcela, atualizando status, data e valor pago.
     """
+    valor_pago = dinheiro.para_banco(valor_pago)
+
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        # Confere se a parcela pertence ao usuário
+        # Confere se a parcela pertence ao usuário; a linha fica travada
+        # até o commit, para o delta do resumo partir do estado atual
+        iniciar_escrita(cursor)
         cursor.execute(
-            """
-            SELECT pd.id, pd.valor_parcela
+            f"""
+            SELECT pd.id, pd.lancamento_debito_id, pd.valor_parcela,
+                   pd.data_vencimento, pd.status_id, pd.valor_pago
             FROM parcelas_debito pd
             INNER JOIN lancamentos_debito ld
                 ON pd.lancamento_debito_id = ld.id
             WHERE pd.id = %s
               AND ld.usuario_id = %s
+            {para_atualizar(cursor, "pd")}
         """,
             (parcela_id, usuario_id),
         )
@@ -265,12 +528,29 @@ def baixar_parcela(
                 valor_pago = %s,
                 observacoes = %s
             WHERE id = %s
+              AND status_id IN (1, 3)
         """,
             (data_pagamento, valor_pago, observacoes, parcela_id),
         )
+        if cursor.rowcount == 0:
+            conn.rollback()
+            conn.close()
+            return False, "Parcela já está paga ou cancelada."
+
+        resumo_mensal.registrar_deltas(cursor, usuario_id, [
+            (parcela["data_vencimento"], resumo_mensal.negativo(
+                resumo_mensal.contribuicao_parcela(
+                    parcela["valor_parcela"], parcela["status_id"], parcela["valor_pago"]
+                )
+            )),
+            (parcela["data_vencimento"], resumo_mensal.contribuicao_parcela(
+                parcela["valor_parcela"], 2, valor_pago
+            )),
+        ])
 
         conn.commit()
         conn.close()
+        cache.nova_versao_dados(usuario_id)
         return True, "Parcela baixada com sucesso!"
 
     except Exception as e:
@@ -279,6 +559,106 @@ def baixar_parcela(
         return False, f"Erro ao baixar parcela: {str(e)}"
 
 
+# =====================================================
+# 💰 BAIXAR VÁRIAS PARCELAS (PAGAMENTO EM LOTE)
+# =====================================================
+def baixar_parcelas(
+    parcela_ids,
+    usuario_id,
+    data_pagamento=None,
+    observacoes=None,
+):
+    """
+    Baixa várias parcelas em uma transação, com o valor pago igual ao
+    valor da parcela. Posse e status são conferidos no próprio UPDATE.
+
+    Retorna (sucesso, resultados), com resultados = {parcela_id: (ok, mensagem)}.
+    """
+    ids = list(dict.fromkeys(int(i) for i in parcela_ids))
+    if not ids:
+        return False, {}
+
+    if data_pagamento is None:
+        data_pagamento = datetime.now().date()
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        marcadores = ", ".join(["%s"] * len(ids))
+
+        cursor.execute(
+            f"""
+            UPDATE parcelas_debito
+            SET status_id = 2,         -- Pago
+                data_pagamento = %s,
+                valor_pago = valor_parcela,
+                observacoes = COALESCE(%s, observacoes)
+            WHERE id IN ({marcadores})
+              AND status_id IN (1, 3)
+              AND lancamento_debito_id IN (
+                  SELECT id FROM lancamentos_debito WHERE usuario_id = %s
+              )
+            RETURNING id, valor_parcela, data_vencimento
+        """,
+            [data_pagamento, observacoes] + ids + [usuario_id],
+        )
+        baixadas = cursor.fetchall()
+
+        # Aberto (1) e vencido (3) contam igual no resumo: sai de "em
+        # aberto" e entra em "pagos" pelo valor da parcela
+        resumo_mensal.registrar_deltas(cursor, usuario_id, [
+            delta
+            for p in baixadas
+            for delta in (
+                (p["data_vencimento"], resumo_mensal.negativo(
+                    resumo_mensal.contribuicao_parcela(p["valor_parcela"], 1)
+                )),
+                (p["data_vencimento"], resumo_mensal.contribuicao_parcela(
+                    p["valor_parcela"], 2, p["valor_parcela"]
+                )),
+            )
+        ])
+
+        resultados = {
+            p["id"]: (True, "Parcela baixada com sucesso!") for p in baixadas
+        }
+
+        # Só consulta o motivo das que ficaram de fora
+        faltantes = [i for i in ids if i not in resultados]
+        if faltantes:
+            cursor.execute(
+                f"""
+                SELECT pd.id
+                FROM parcelas_debito pd
+                INNER JOIN lancamentos_debito ld
+                    ON pd.lancamento_debito_id = ld.id
+                WHERE pd.id IN ({", ".join(["%s"] * len(faltantes))})
+                  AND ld.usuario_id = %s
+            """,
+                faltantes + [usuario_id],
+            )
+            do_usuario = {r["id"] for r in cursor.fetchall()}
+
+            for i in faltantes:
+                if i in do_usuario:
+                    resultados[i] = (False, "Parcela já está paga ou cancelada.")
+                else:
+                    resultados[i] = (False, "Parcela não encontrada ou sem permissão.")
+
+        conn.commit()
+        conn.close()
+        if baixadas:
+            cache.nova_versao_dados(usuario_id)
+        return bool(baixadas), {i: resultados[i] for i in ids}
+
+    except Exception as e:
+        conn.rollback()
+        conn.close()
+        erro = f"Erro ao baixar parcelas: {str(e)}"
+        return False, {i: (False, erro) for i in ids}
+
+
 # =====================================================
 # ✏️ EDITAR PARCELA
 # =====================================================
@@ -293,24 +673,31 @@ def editar_parcela(
     """
     Edita campos de uma parcela (valor, vencimento, status, observações).
     """
+    valor_parcela = dinheiro.para_banco(valor_parcela)
+
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        # Validar se a parcela pertence ao usuário
+        # Validar se a parcela pertence ao usuário (linha travada até o
+        # commit: o delta do resumo parte deste estado)
+        iniciar_escrita(cursor)
         cursor.execute(
-            """
-            SELECT pd.id
+            f"""
+            SELECT pd.id, pd.lancamento_debito_id, pd.valor_parcela,
+                   pd.data_vencimento, pd.status_id, pd.valor_pago
             FROM parcelas_debito pd
             INNER JOIN lancamentos_debito ld
                 ON pd.lancamento_debito_id = ld.id
             WHERE pd.id = %s
               AND ld.usuario_id = %s
+            {para_atualizar(cursor, "pd")}
         """,
             (parcela_id, usuario_id),
         )
 
-        if not cursor.fetchone():
+        anterior = cursor.fetchone()
+        if not anterior:
             conn.close()
             return False, "Sem permissão para editar esta parcela."
 
@@ -348,8 +735,29 @@ def editar_parcela(
             params,
         )
 
+        if data_vencimento is not None and data_vencimento != anterior["data_vencimento"]:
+            # Data escolhida pelo usuário: a regra do cartão não refaz mais o cronograma
+            cursor.execute(
+                "UPDATE lancamentos_debito SET vencimento_pela_regra = FALSE WHERE id = %s",
+                (anterior["lancamento_debito_id"],),
+            )
+
+        resumo_mensal.registrar_deltas(cursor, usuario_id, [
+            (anterior["data_vencimento"], resumo_mensal.negativo(
+                resumo_mensal.contribuicao_parcela(
+                    anterior["valor_parcela"], anterior["status_id"], anterior["valor_pago"]
+                )
+            )),
+            (data_vencimento or anterior["data_vencimento"], resumo_mensal.contribuicao_parcela(
+                valor_parcela if valor_parcela is not None else anterior["valor_parcela"],
+                status_id if status_id is not None else anterior["status_id"],
+                anterior["valor_pago"],
+            )),
+        ])
+
         conn.commit()
         conn.close()
+        cache.nova_versao_dados(usuario_id)
         return True, "Parcela atualizada com sucesso!"
 
     except Exception as e:
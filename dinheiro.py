@@ -0,0 +1,152 @@
+# ============================================
+# FILE: dinheiro.py
+# Valores monetários em centavos inteiros
+#
+# O banco guarda DECIMAL(10,2). Na aplicação os valores circulam em
+# centavos: Centavos (int) nos escalares e int64 nos DataFrames, de
+# modo que somas são exatas e a agregação de colunas grandes não
+# converte Decimal/float linha a linha.
+#
+# A conversão acontece na fronteira com o banco:
+#   leitura  -> centavos(row["valor"]) / colunas_para_centavos(df, [...])
+#   escrita  -> para_banco(valor)  (Decimal com 2 casas)
+#   tela     -> formatar(valor) / formatacao.moeda(coluna)
+#
+# Não importa o pandas: as funções de coluna usam os métodos da Series.
+# ============================================
+
+from decimal import Decimal, ROUND_HALF_UP
+
+
+class Centavos(int):
+    """
+    Valor em centavos. Continua sendo um int (compara, ordena, vira
+    JSON); soma/subtração com inteiros devolve Centavos.
+    format(c, ",.2f") formata em reais, como o float formatava antes.
+    """
+
+    __slots__ = ()
+
+    def __add__(self, outro):
+        if not isinstance(outro, int):
+            return NotImplemented
+        return Centavos(int(self) + int(outro))
+
+    __radd__ = __add__
+
+    def __sub__(self, outro):
+        if not isinstance(outro, int):
+            return NotImplemented
+        return Centavos(int(self) - int(outro))
+
+    def __rsub__(self, outro):
+        if not isinstance(outro, int):
+            return NotImplemented
+        return Centavos(int(outro) - int(self))
+
+    def __mul__(self, fator):
+        if not isinstance(fator, int):
+            return NotImplemented
+        return Centavos(int(self) * int(fator))
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Centavos(-int(self))
+
+    def __abs__(self):
+        return Centavos(abs(int(self)))
+
+    @property
+    def reais(self):
+        return Decimal(int(self)).scaleb(-2)
+
+    def __repr__(self):
+        return f"Centavos({int(self)})"
+
+    def __str__(self):
+        return formatar(self)
+
+    def __format__(self, especificacao):
+        if not especificacao:
+            return str(self)
+        return format(self.reais, especificacao)
+
+
+# ============================================================
+# 🔁 Conversões escalares
+# ============================================================
+
+def centavos(valor):
+    """
+    Valor em reais (Decimal/float/int/str, como vem do banco ou de um
+    st.number_input) -> Centavos, arredondando meio para cima.
+    Centavos passa direto; None continua None.
+    """
+    if valor is None or isinstance(valor, Centavos):
+        return valor
+    if isinstance(valor, int):
+        return Centavos(valor * 100)
+    if not isinstance(valor, Decimal):
+        # float pela representação curta: 1.005 -> 1,01 (meio para cima)
+        valor = Decimal(str(valor))
+    return Centavos((valor * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def reais(valor_centavos):
+    """Centavos (ou int/numpy int64 em centavos) -> Decimal com 2 casas."""
+    return Decimal(int(valor_centavos)).scaleb(-2)
+
+
+def para_banco(valor):
+    """Valor em reais ou Centavos -> Decimal de 2 casas para o parâmetro da query."""
+    if valor is None:
+        return None
+    return reais(centavos(valor))
+
+
+def somar(valores):
+    """Soma exata de valores em reais (Decimal/float) ou Centavos."""
+    return Centavos(sum(centavos(v) or 0 for v in valores))
+
+
+def formatar(valor):
+    """
+    Valor -> "R$ 1.234,56" (negativos: "-R$ 1.234,56").
+    Aceita Centavos ou valores em reais (Decimal/float/int).
+    """
+    c = int(centavos(valor) or 0)
+    inteiro, resto = divmod(abs(c), 100)
+    texto = f"R$ {inteiro:,}".replace(",", ".") + f",{resto:02d}"
+    return "-" + texto if c < 0 else texto
+
+
+# ============================================================
+# 🧮 Colunas (pandas)
+# ============================================================
+
+def serie_para_centavos(serie):
+    """
+    Coluna em reais (Decimal do PostgreSQL, float do SQLite) -> coluna
+    int64 em centavos, sem laço em Python. Nulos viram NA (Int64).
+
+    Exato para DECIMAL(10,2): em float64, valor*100 fica a menos de
+    1e-6 do inteiro correto, e o arredondamento corrige.
+    """
+    em_centavos = (serie.astype("float64") * 100).round()
+    if em_centavos.isna().any():
+        return em_centavos.astype("Int64")
+    return em_centavos.astype("int64")
+
+
+def colunas_para_centavos(df, colunas):
+    """Converte no lugar as colunas de valor de df; devolve o próprio df."""
+    for coluna in colunas:
+        if coluna in df.columns:
+            df[coluna] = serie_para_centavos(df[coluna])
+    return df
+
+
+def somar_serie(serie):
+    """Total exato de uma coluna em centavos."""
+    return Centavos(int(serie.sum()))
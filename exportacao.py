@@ -0,0 +1,164 @@
+# ============================================
+# FILE: exportacao.py
+# Exportação dos relatórios para CSV, Excel (XLSX) e Parquet
+#
+# Os arquivos são escritos lote a lote a partir dos iteradores
+# de relatorios.py, sem montar um DataFrame intermediário.
+# ============================================
+
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+
+import relatorios
+
+FORMATOS = {
+    # formato: (rótulo, mime)
+    "csv": ("CSV", "text/csv"),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+}
+
+RELATORIOS = {
+    # relatório: (iterador de lotes, colunas)
+    "conta_corrente": (
+        relatorios.iterar_relatorio_conta_corrente,
+        relatorios.COLUNAS_CONTA_CORRENTE,
+    ),
+    "mensal_debitos": (
+        relatorios.iterar_relatorio_mensal_debitos,
+        relatorios.COLUNAS_MENSAL_DEBITOS,
+    ),
+    "por_fornecedor": (
+        relatorios.iterar_relatorio_por_fornecedor,
+        relatorios.COLUNAS_PARCELAS_FORNECEDOR,
+    ),
+}
+
+# Só interessam à tela
+COLUNAS_IGNORADAS = {"status_cor"}
+
+COLUNAS_DINHEIRO = {"valor", "debito", "credito", "saldo", "valor_parcela", "valor_pago"}
+COLUNAS_DATA = {"data", "data_vencimento", "data_pagamento"}
+COLUNAS_INTEIRO = {"id", "numero_parcela", "quantidade_parcelas"}
+
+_CENTAVO = Decimal("0.01")
+
+
+# ============================================================
+# 🧮 Normalização de valores
+# ============================================================
+
+def _dinheiro(valor):
+    if valor is None:
+        return None
+    if not isinstance(valor, Decimal):
+        valor = Decimal(str(valor))
+    return valor.quantize(_CENTAVO)
+
+
+def _data(valor):
+    # Expressões do UNION no SQLite chegam como texto ISO
+    if valor is None or isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor)[:10])
+
+
+def _converter(coluna, valor):
+    if coluna in COLUNAS_DINHEIRO:
+        return _dinheiro(valor)
+    if coluna in COLUNAS_DATA:
+        return _data(valor)
+    return valor
+
+
+def _linhas(lote, colunas):
+    return [[_converter(c, r[c]) for c in colunas] for r in lote]
+
+
+# ============================================================
+# ✍️ Escritores (um lote por vez)
+# ============================================================
+
+def _decimal_br(valor):
+    # 1234.56 -> "1234,56": no Excel pt-BR o ponto é separador de milhar
+    return format(valor, "f").replace(".", ",") if isinstance(valor, Decimal) else valor
+
+
+def _escrever_csv(lotes, colunas):
+    """CSV do Excel pt-BR: ';' entre campos, ',' decimal e BOM UTF-8."""
+    saida = io.StringIO()
+    escritor = csv.writer(saida, delimiter=";")
+    escritor.writerow(colunas)
+    for lote in lotes:
+        escritor.writerows([_decimal_br(v) for v in linha] for linha in _linhas(lote, colunas))
+    # BOM para o Excel reconhecer UTF-8
+    return saida.getvalue().encode("utf-8-sig")
+
+
+def _escrever_xlsx(lotes, colunas):
+    from openpyxl import Workbook
+
+    # write_only grava as linhas sem manter a planilha em memória
+    planilha = Workbook(write_only=True)
+    aba = planilha.create_sheet("Relatório")
+    aba.append(colunas)
+    for lote in lotes:
+        for linha in _linhas(lote, colunas):
+            aba.append(linha)
+
+    saida = io.BytesIO()
+    planilha.save(saida)
+    return saida.getvalue()
+
+
+def _tipo_arrow(pa, coluna):
+    if coluna in COLUNAS_DINHEIRO:
+        return pa.decimal128(16, 2)
+    if coluna in COLUNAS_DATA:
+        return pa.date32()
+    if coluna in COLUNAS_INTEIRO:
+        return pa.int64()
+    return pa.string()
+
+
+def _escrever_parquet(lotes, colunas):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = pa.schema([(c, _tipo_arrow(pa, c)) for c in colunas])
+    saida = pa.BufferOutputStream()
+
+    with pq.ParquetWriter(saida, esquema) as escritor:
+        for lote in lotes:
+            dados = {c: [_converter(c, r[c]) for r in lote] for c in colunas}
+            escritor.write_batch(pa.record_batch(dados, schema=esquema))
+
+    return saida.getvalue().to_pybytes()
+
+
+_ESCRITORES = {
+    "csv": _escrever_csv,
+    "xlsx": _escrever_xlsx,
+    "parquet": _escrever_parquet,
+}
+
+
+# ============================================================
+# 📤 Exportação
+# ============================================================
+
+def exportar(relatorio, formato, usuario_id, **filtros):
+    """
+    Gera o arquivo de um relatório e devolve os bytes.
+    filtros: os argumentos do iterar_relatorio_* correspondente, ex.
+        exportar("mensal_debitos", "csv", 1, ano=2025, mes=3)
+    """
+    iterador, colunas = RELATORIOS[relatorio]
+    colunas = [c for c in colunas if c not in COLUNAS_IGNORADAS]
+    return _ESCRITORES[formato](iterador(usuario_id, **filtros), colunas)
+
+
+def nome_arquivo(relatorio, formato):
+    return f"{relatorio}_{date.today():%Y%m%d}.{formato}"
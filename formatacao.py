@@ -0,0 +1,157 @@
+# ============================================
+# FILE: formatacao.py
+# Formatação brasileira de colunas para exibição
+#
+#   moeda(coluna_em_centavos)  -> "R$ 1.234,56"
+#   datas(coluna_de_datas)     -> "31/12/2025"
+#   tabela(df, colunas_moeda=[...], colunas_data=[...]) -> cópia para st.dataframe
+#
+# Tudo em arrays numpy: o texto de cada linha é montado byte a byte
+# numa matriz (uma linha por valor), sem chamar Python por célula.
+# Valores escalares: dinheiro.formatar / format_br_date (app.py).
+# ============================================
+
+import numpy as np
+import pandas as pd
+
+_ZERO = ord("0")
+
+
+def _texto(matriz, inicio=None):
+    """
+    Matriz de códigos de caractere (uma linha por valor) -> array de
+    str. A matriz é montada em uint32 (UCS4, o formato interno do dtype
+    U do numpy), então a conversão é só uma reinterpretação dos bytes.
+
+    inicio: primeira coluna usada de cada linha (texto alinhado à
+    direita, com uma coluna \0 extra no fim); None quando todas as
+    linhas começam na coluna 0.
+    """
+    largura = matriz.shape[1]
+    if inicio is not None:
+        # Alinha à esquerda: posições além do fim leem a coluna \0, que o dtype U descarta
+        largura -= 1
+        posicoes = np.minimum(inicio[:, None] + np.arange(largura), largura)
+        matriz = np.take_along_axis(matriz, posicoes, axis=1)
+    return np.ascontiguousarray(matriz, dtype=np.uint32).view(f"<U{largura}").ravel()
+
+
+def _para_serie(texto, serie):
+    if isinstance(serie, pd.Series):
+        return pd.Series(texto, index=serie.index, name=serie.name)
+    return texto
+
+
+# ============================================================
+# 💰 Moeda
+# ============================================================
+
+def moeda(serie, zero=None, nulo=""):
+    """
+    Coluna em centavos (int64/Int64, ver dinheiro.py) -> "R$ 1.234,56";
+    negativos como "-R$ 1.234,56".
+
+    zero: texto para valores zerados (ex.: "" em débito/crédito do
+    extrato); None formata normalmente.
+    nulo: texto para NA.
+    """
+    if isinstance(serie, pd.Series):
+        nulos = serie.isna().to_numpy()
+        valores = serie.to_numpy(dtype=np.int64, na_value=0)
+    else:
+        valores = np.asarray(serie, dtype=np.int64)
+        nulos = np.zeros(valores.shape, dtype=bool)
+
+    if not len(valores):
+        return _para_serie(np.array([], dtype=object), serie)
+
+    negativo = valores < 0
+    reais, centavos = np.divmod(np.abs(valores), 100)
+
+    # Quantidade de dígitos dos reais de cada linha (mínimo 1)
+    maior = len(str(int(reais.max())))
+    digitos = np.ones(len(reais), dtype=np.int64)
+    for casa in range(1, maior):
+        digitos += reais >= 10 ** casa
+
+    # "-R$ " + dígitos com pontos + ",dd", alinhado à direita (+ coluna \0)
+    largura = 4 + maior + (maior - 1) // 3 + 3
+    matriz = np.full((len(valores), largura + 1), _ZERO, dtype=np.uint32)
+    matriz[:, -1] = 0
+    matriz[:, -2] += (centavos % 10).astype(np.uint32)
+    matriz[:, -3] += (centavos // 10).astype(np.uint32)
+    matriz[:, -4] = ord(",")
+
+    coluna, resto = largura - 4, reais
+    for casa in range(maior):
+        if casa and casa % 3 == 0:
+            matriz[:, coluna] = ord(".")
+            coluna -= 1
+        matriz[:, coluna] += (resto % 10).astype(np.uint32)
+        resto = resto // 10
+        coluna -= 1
+
+    linhas = np.arange(len(valores))
+    inicio = largura - 3 - (digitos + (digitos - 1) // 3) - 3
+    for deslocamento, caractere in enumerate(b"R$ "):
+        matriz[linhas, inicio + deslocamento] = caractere
+    inicio = inicio - negativo
+    matriz[linhas[negativo], inicio[negativo]] = ord("-")
+
+    texto = _texto(matriz, inicio).astype(object)
+    if zero is not None:
+        texto[valores == 0] = zero
+    texto[nulos] = nulo
+    return _para_serie(texto, serie)
+
+
+# ============================================================
+# 📅 Datas
+# ============================================================
+
+# Posições de "AAAA-MM-DD" na ordem de "DD/MM/AAAA"
+_ORDEM_DATA = [8, 9, 4, 5, 6, 7, 0, 1, 2, 3]
+
+
+def datas(serie, nulo=""):
+    """
+    Coluna de datas (date/datetime, texto ISO do SQLite ou
+    datetime64) -> "DD/MM/AAAA". Vazios e inválidos viram `nulo`.
+    """
+    dias = pd.to_datetime(pd.Series(serie), errors="coerce").to_numpy(dtype="datetime64[D]")
+    if not len(dias):
+        return _para_serie(np.array([], dtype=object), serie)
+
+    nulos = np.isnat(dias)
+    iso = np.where(nulos, np.datetime64("1970-01-01"), dias).astype("S10")
+    matriz = iso.view(np.uint8).reshape(-1, 10)[:, _ORDEM_DATA]
+    matriz[:, [2, 5]] = ord("/")
+
+    texto = _texto(matriz).astype(object)
+    texto[nulos] = nulo
+    return _para_serie(texto, serie)
+
+
+# ============================================================
+# 🧾 Tabelas
+# ============================================================
+
+def tabela(df, colunas_moeda=(), colunas_data=(), colunas_moeda_sem_zero=()):
+    """
+    Cópia de df com as colunas formatadas para exibição
+    (as que não existirem em df são ignoradas).
+
+    colunas_moeda / colunas_moeda_sem_zero: em centavos; nas "sem
+    zero" o valor zerado aparece vazio.
+    """
+    exibicao = df.copy()
+    for coluna in colunas_moeda:
+        if coluna in exibicao.columns:
+            exibicao[coluna] = moeda(exibicao[coluna])
+    for coluna in colunas_moeda_sem_zero:
+        if coluna in exibicao.columns:
+            exibicao[coluna] = moeda(exibicao[coluna], zero="")
+    for coluna in colunas_data:
+        if coluna in exibicao.columns:
+            exibicao[coluna] = datas(exibicao[coluna])
+    return exibicao
@@ -0,0 +1,518 @@
+# ============================================
+# FILE: importacao.py
+# Importação de extratos bancários (OFX / CSV)
+#
+# Valores positivos viram créditos (lancamentos_credito); negativos
+# viram débitos já pagos (lançamento à vista com uma parcela paga).
+# O arquivo é lido em streaming e gravado em lotes, uma transação
+# por lote. Cada linha leva um hash de (data, valor, descrição,
+# ocorrência) e linhas já importadas são ignoradas.
+# ============================================
+
+import csv
+import hashlib
+import html
+import io
+import itertools
+import re
+import unicodedata
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+import cache
+import cadastros
+import resumo_mensal
+from database import get_connection, inserir_em_lote
+
+TAMANHO_LOTE_IMPORTACAO = 5000
+PARCELAS_A_VISTA = 1
+
+# Débitos importados: procurados pela descrição nas tabelas de
+# referência (os ids dependem da ordem em que o banco foi semeado)
+FORMA_PAGAMENTO_A_VISTA = "À Vista"
+STATUS_PAGO = "Pago"
+
+LinhaExtrato = namedtuple("LinhaExtrato", "numero data valor descricao")
+ErroLinha = namedtuple("ErroLinha", "numero mensagem")
+
+
+# ============================================================
+# 🔤 Normalização
+# ============================================================
+
+def normalizar_texto(texto):
+    """Maiúsculas, sem acentos e com espaços simples (para hash e regras)."""
+    sem_acento = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode()
+    return " ".join(sem_acento.upper().split())
+
+
+def _id_referencia(tabela, descricao):
+    """Id da linha de uma tabela de referência pela descrição (sem acento/caixa)."""
+    procurada = normalizar_texto(descricao)
+    for id_, texto in cadastros.descricoes_referencia(tabela).items():
+        if normalizar_texto(texto) == procurada:
+            return id_
+    raise ValueError(f"{descricao!r} não cadastrado em {tabela}")
+
+
+# Ponto só como milhar: 1.234 / 12.345.678 (mas não 0.500 nem 1234.567)
+_RE_MILHAR_PONTO = re.compile(r"[1-9]\d{0,2}(\.\d{3})+")
+
+
+def _valor(texto, separador_decimal=None):
+    """
+    Decimal de um valor de extrato. separador_decimal: "." ou "," quando
+    o formato define (OFX usa "."); None deduz pelo texto.
+    """
+    t = texto.strip().replace("R$", "").replace(" ", "")
+    negativo = t.startswith("-") or t.endswith("-") or (t.startswith("(") and t.endswith(")"))
+    t = t.strip("+-()")
+
+    if separador_decimal == ".":
+        t = t.replace(",", "")
+    elif separador_decimal == ",":
+        t = t.replace(".", "").replace(",", ".")
+    # O último separador é o decimal: 1.234,56 / 1,234.56 / 1234,56
+    elif "," in t and "." in t:
+        if t.rfind(",") > t.rfind("."):
+            t = t.replace(".", "").replace(",", ".")
+        else:
+            t = t.replace(",", "")
+    elif "," in t:
+        t = t.replace(",", ".")
+    elif _RE_MILHAR_PONTO.fullmatch(t):
+        t = t.replace(".", "")
+
+    valor = Decimal(t)
+    return -valor if negativo else valor
+
+
+_FORMATOS_DATA = ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%d-%m-%Y", "%d.%m.%Y")
+
+
+def _data(texto):
+    texto = texto.strip()
+    # Caminho rápido para os formatos mais comuns (strptime é lento)
+    if len(texto) == 10 and texto[2] == "/" and texto[5] == "/":
+        try:
+            return date(int(texto[6:]), int(texto[3:5]), int(texto[:2]))
+        except ValueError:
+            pass
+    elif len(texto) == 10 and texto[4] == "-":
+        try:
+            return date.fromisoformat(texto)
+        except ValueError:
+            pass
+
+    for formato in _FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"data inválida: {texto!r}")
+
+
+def hash_linha(data, valor, descricao, ocorrencia=1):
+    """
+    Identidade de uma linha de extrato. A ocorrência diferencia
+    lançamentos idênticos no mesmo dia (ex.: dois cafés iguais).
+    """
+    return _hash(data, valor, normalizar_texto(descricao), ocorrencia)
+
+
+def _hash(data, valor, texto_normalizado, ocorrencia):
+    chave = f"{data.isoformat()}|{valor:.2f}|{texto_normalizado}|{ocorrencia}"
+    # 128 bits bastam por usuário e deixam o índice único menor
+    return hashlib.sha256(chave.encode("utf-8")).hexdigest()[:32]
+
+
+# ============================================================
+# 📄 Leitura em streaming
+# ============================================================
+
+def _abrir_texto(arquivo):
+    """Texto decodificado de um caminho ou arquivo binário (ex.: st.file_uploader)."""
+    binario = open(arquivo, "rb") if isinstance(arquivo, str) else arquivo
+    amostra = binario.read(65536)
+    binario.seek(0)
+
+    # Extratos de bancos brasileiros costumam vir em cp1252
+    try:
+        amostra.decode("utf-8")
+        codificacao = "utf-8-sig"
+    except UnicodeDecodeError:
+        codificacao = "cp1252"
+
+    return io.TextIOWrapper(binario, encoding=codificacao, errors="replace", newline=""), amostra
+
+
+def _liberar_texto(texto, arquivo):
+    if isinstance(arquivo, str):
+        texto.close()
+    else:
+        texto.detach()  # não fecha o arquivo de quem chamou
+
+
+def _detectar_formato(amostra, nome_arquivo):
+    if nome_arquivo and nome_arquivo.lower().endswith(".ofx"):
+        return "ofx"
+    inicio = amostra[:4096].upper()
+    if b"OFXHEADER" in inicio or b"<OFX>" in inicio:
+        return "ofx"
+    return "csv"
+
+
+_RE_TAG = re.compile(r"<(/?)([A-Za-z0-9_.]+)>([^<]*)")
+
+
+def ler_ofx(texto):
+    """Gera LinhaExtrato / ErroLinha para cada <STMTTRN> (SGML ou XML)."""
+    numero = 0
+    atual = None
+    resto = ""
+
+    def fechar(transacao, numero):
+        try:
+            data = datetime.strptime(transacao["DTPOSTED"][:8], "%Y%m%d").date()
+            valor = _valor(transacao["TRNAMT"], separador_decimal=".")
+            descricao = html.unescape(transacao.get("MEMO") or transacao.get("NAME") or "")
+            return LinhaExtrato(numero, data, valor, descricao)
+        except KeyError as e:
+            return ErroLinha(numero, f"campo {e.args[0]} ausente")
+        except InvalidOperation:
+            return ErroLinha(numero, f"valor inválido: {transacao['TRNAMT']!r}")
+        except ValueError:
+            return ErroLinha(numero, f"data inválida: {transacao['DTPOSTED']!r}")
+
+    while True:
+        bloco = texto.read(65536)
+        buffer = resto + bloco
+        if bloco:
+            # A última tag pode estar incompleta: fica para o próximo bloco
+            corte = buffer.rfind("<")
+            buffer, resto = buffer[:corte], buffer[corte:]
+
+        for barra, tag, valor in _RE_TAG.findall(buffer):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if barra:
+                    if atual is not None:
+                        yield fechar(atual, numero)
+                    atual = None
+                else:
+                    numero += 1
+                    atual = {}
+            elif atual is not None and not barra:
+                atual[tag] = valor.strip()
+
+        if not bloco:
+            break
+
+
+_COLUNAS_CSV = {
+    "data": {"data", "date", "dt", "data lancamento", "data do lancamento", "data movimento"},
+    "descricao": {"descricao", "historico", "description", "memo", "lancamento", "detalhes"},
+    "valor": {"valor", "amount", "value", "valor (r$)", "valor r$"},
+}
+
+
+def ler_csv(texto):
+    """
+    Gera LinhaExtrato / ErroLinha a partir de um CSV com colunas
+    data, descrição e valor (com cabeçalho reconhecível ou nessa ordem).
+    Separador ; ou , detectado pela primeira linha.
+    """
+    primeira = texto.readline()
+    if not primeira:
+        return
+    delimitador = ";" if primeira.count(";") >= primeira.count(",") else ","
+
+    leitor = csv.reader(texto, delimiter=delimitador)
+    cabecalho = next(csv.reader([primeira], delimiter=delimitador))
+    nomes = [normalizar_texto(c).lower() for c in cabecalho]
+
+    posicoes = {}
+    for campo, apelidos in _COLUNAS_CSV.items():
+        for i, nome in enumerate(nomes):
+            if nome in apelidos:
+                posicoes[campo] = i
+                break
+
+    if len(posicoes) < len(_COLUNAS_CSV):
+        # Sem cabeçalho: data; descrição; valor
+        posicoes = {"data": 0, "descricao": 1, "valor": 2}
+        leitor = itertools.chain([cabecalho], leitor)
+        numero = 0
+    else:
+        numero = 1
+
+    i_data, i_desc, i_valor = posicoes["data"], posicoes["descricao"], posicoes["valor"]
+    for campos in leitor:
+        numero += 1
+        if not any(c.strip() for c in campos):
+            continue
+        try:
+            yield LinhaExtrato(numero, _data(campos[i_data]), _valor(campos[i_valor]), campos[i_desc].strip())
+        except IndexError:
+            yield ErroLinha(numero, "colunas faltando")
+        except InvalidOperation:
+            yield ErroLinha(numero, f"valor inválido: {campos[i_valor]!r}")
+        except ValueError as e:
+            yield ErroLinha(numero, str(e))
+
+
+# ============================================================
+# 🧭 Regras de classificação
+# ============================================================
+
+class Classificador:
+    """
+    Decide o destino de cada linha:
+    - crédito: tipo_credito_id da primeira regra cujo texto aparece na
+      descrição, senão tipo_credito_id padrão;
+    - débito: fornecedor_id da primeira regra, senão o fornecedor do
+      usuário cujo nome aparece na descrição, senão o padrão.
+    regras: [{"contem": "SALARIO", "tipo_credito_id": 1},
+             {"contem": "ENERGIA", "fornecedor_id": 7}, ...]
+    """
+
+    def __init__(self, usuario_id, regras=None, tipo_credito_id=None, fornecedor_id=None):
+        self.tipo_credito_padrao = tipo_credito_id
+        self.fornecedor_padrao = fornecedor_id
+        self.regras = [
+            (normalizar_texto(r["contem"]), r.get("tipo_credito_id"), r.get("fornecedor_id"))
+            for r in (regras or [])
+            if r.get("contem")
+        ]
+        # Nomes mais longos primeiro: "Posto Shell Centro" antes de "Shell"
+        self.fornecedores = sorted(
+            ((normalizar_texto(f["nome"]), f["id"]) for f in cadastros.listar_fornecedores(usuario_id)),
+            key=lambda f: -len(f[0]),
+        )
+
+    def tipo_credito(self, texto):
+        """texto: descrição já normalizada (normalizar_texto)."""
+        for contem, tipo_credito_id, _ in self.regras:
+            if tipo_credito_id and contem in texto:
+                return tipo_credito_id
+        return self.tipo_credito_padrao
+
+    def fornecedor(self, texto):
+        """texto: descrição já normalizada (normalizar_texto)."""
+        for contem, _, fornecedor_id in self.regras:
+            if fornecedor_id and contem in texto:
+                return fornecedor_id
+        for nome, fornecedor_id in self.fornecedores:
+            if nome and nome in texto:
+                return fornecedor_id
+        return self.fornecedor_padrao
+
+
+# ============================================================
+# 💾 Gravação em lote
+# ============================================================
+
+def _hashes_existentes(cursor, tabela, usuario_id, hashes):
+    if not hashes:
+        return set()
+    cursor.execute(f"""
+        SELECT hash_importacao
+        FROM {tabela}
+        WHERE usuario_id = %s
+          AND hash_importacao IN ({', '.join(['%s'] * len(hashes))})
+    """, [usuario_id] + hashes)
+    return {r["hash_importacao"] for r in cursor.fetchall()}
+
+
+def _gravar_lote(usuario_id, creditos, debitos, tipo_documento_id, observacoes,
+                 forma_pagamento_id, status_pago_id):
+    """
+    Grava um lote em uma transação.
+    creditos: [(linha, tipo_credito_id, hash)]; debitos: [(linha, fornecedor_id, hash)].
+    forma_pagamento_id / status_pago_id: ids de 'À Vista' e 'Pago' (_id_referencia).
+    Retorna (créditos gravados, débitos gravados, duplicadas).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        existentes = _hashes_existentes(
+            cursor, "lancamentos_credito", usuario_id, [h for _, _, h in creditos]
+        )
+        novos_creditos = [c for c in creditos if c[2] not in existentes]
+
+        existentes = _hashes_existentes(
+            cursor, "lancamentos_debito", usuario_id, [h for _, _, h in debitos]
+        )
+        novos_debitos = [d for d in debitos if d[2] not in existentes]
+
+        inserir_em_lote(cursor, """
+            INSERT INTO lancamentos_credito (
+                usuario_id, tipo_credito_id, valor, descricao,
+                data_recebimento, observacoes, hash_importacao
+            )
+            VALUES %s
+        """, [
+            (usuario_id, tipo_credito_id, linha.valor, linha.descricao,
+             linha.data, observacoes, h)
+            for linha, tipo_credito_id, h in novos_creditos
+        ])
+
+        if novos_debitos:
+            inserir_em_lote(cursor, """
+                INSERT INTO lancamentos_debito (
+                    usuario_id, fornecedor_id, forma_pagamento_id, tipo_documento_id,
+                    valor_total, descricao, quantidade_parcelas, data_lancamento,
+                    observacoes, hash_importacao
+                )
+                VALUES %s
+            """, [
+                (usuario_id, fornecedor_id, forma_pagamento_id, tipo_documento_id,
+                 -linha.valor, linha.descricao, PARCELAS_A_VISTA, linha.data, observacoes, h)
+                for linha, fornecedor_id, h in novos_debitos
+            ])
+
+            hashes = [h for _, _, h in novos_debitos]
+            cursor.execute(f"""
+                SELECT id, hash_importacao
+                FROM lancamentos_debito
+                WHERE usuario_id = %s
+                  AND hash_importacao IN ({', '.join(['%s'] * len(hashes))})
+            """, [usuario_id] + hashes)
+            ids = {r["hash_importacao"]: r["id"] for r in cursor.fetchall()}
+
+            inserir_em_lote(cursor, """
+                INSERT INTO parcelas_debito (
+                    lancamento_debito_id, numero_parcela, valor_parcela,
+                    data_vencimento, status_id, data_pagamento, valor_pago
+                )
+                VALUES %s
+            """, [
+                (ids[h], 1, -linha.valor, linha.data, status_pago_id, linha.data, -linha.valor)
+                for linha, _, h in novos_debitos
+            ])
+
+        resumo_mensal.registrar_deltas(cursor, usuario_id, [
+            (linha.data, {"total_creditos": linha.valor})
+            for linha, _, _ in novos_creditos
+        ] + [
+            (linha.data, resumo_mensal.contribuicao_parcela(-linha.valor, status_pago_id, -linha.valor))
+            for linha, _, _ in novos_debitos
+        ])
+
+        conn.commit()
+        conn.close()
+
+        duplicadas = len(creditos) - len(novos_creditos) + len(debitos) - len(novos_debitos)
+        return len(novos_creditos), len(novos_debitos), duplicadas
+
+    except Exception:
+        conn.rollback()
+        conn.close()
+        raise
+
+
+# ============================================================
+# 📥 Importação
+# ============================================================
+
+def importar_extrato(
+    arquivo,
+    usuario_id,
+    tipo_credito_id=None,
+    fornecedor_id=None,
+    tipo_documento_id=None,
+    regras=None,
+    formato=None,
+    nome_arquivo=None,
+    tamanho_lote=TAMANHO_LOTE_IMPORTACAO,
+):
+    """
+    Importa um extrato OFX ou CSV (caminho ou arquivo binário).
+
+    tipo_credito_id / fornecedor_id: destinos padrão quando nenhuma regra
+    se aplica; tipo_documento_id: tipo dos débitos criados.
+    Retorna (sucesso, relatorio) com as contagens e a lista de erros
+    por linha [(numero, mensagem)].
+    """
+    relatorio = {"lidas": 0, "creditos": 0, "debitos": 0, "duplicadas": 0, "erros": []}
+
+    texto = None
+    try:
+        texto, amostra = _abrir_texto(arquivo)
+        formato = formato or _detectar_formato(amostra, nome_arquivo or getattr(arquivo, "name", None))
+        linhas = ler_ofx(texto) if formato == "ofx" else ler_csv(texto)
+        classificador = Classificador(usuario_id, regras, tipo_credito_id, fornecedor_id)
+        forma_pagamento_id = _id_referencia("formas_pagamento", FORMA_PAGAMENTO_A_VISTA)
+        status_pago_id = _id_referencia("status_documento", STATUS_PAGO)
+    except Exception as e:
+        if texto is not None:
+            _liberar_texto(texto, arquivo)
+        return False, dict(relatorio, erros=[(0, f"Erro ao abrir o extrato: {str(e)}")])
+
+    observacoes = f"Importado de {nome_arquivo or getattr(arquivo, 'name', 'extrato')}"
+    ocorrencias = {}
+    creditos, debitos, numeros = [], [], []
+
+    def gravar():
+        try:
+            c, d, dup = _gravar_lote(
+                usuario_id, creditos, debitos, tipo_documento_id, observacoes,
+                forma_pagamento_id, status_pago_id,
+            )
+            relatorio["creditos"] += c
+            relatorio["debitos"] += d
+            relatorio["duplicadas"] += dup
+        except Exception as e:
+            relatorio["erros"].extend((n, f"Erro ao gravar lote: {str(e)}") for n in numeros)
+        creditos.clear()
+        debitos.clear()
+        numeros.clear()
+
+    try:
+        for linha in linhas:
+            relatorio["lidas"] += 1
+
+            if isinstance(linha, ErroLinha):
+                relatorio["erros"].append(tuple(linha))
+                continue
+            if linha.valor == 0:
+                relatorio["erros"].append((linha.numero, "valor zero"))
+                continue
+
+            texto_normalizado = normalizar_texto(linha.descricao)
+            base = (linha.data, linha.valor, texto_normalizado)
+            ocorrencias[base] = ocorrencias.get(base, 0) + 1
+            h = _hash(linha.data, linha.valor, texto_normalizado, ocorrencias[base])
+
+            if linha.valor > 0:
+                destino = classificador.tipo_credito(texto_normalizado)
+                if destino is None:
+                    relatorio["erros"].append((linha.numero, "nenhum tipo de crédito para a linha"))
+                    continue
+                creditos.append((linha, destino, h))
+            else:
+                destino = classificador.fornecedor(texto_normalizado)
+                if destino is None:
+                    relatorio["erros"].append((linha.numero, "nenhum fornecedor para a linha"))
+                    continue
+                if tipo_documento_id is None:
+                    relatorio["erros"].append((linha.numero, "tipo de documento dos débitos não informado"))
+                    continue
+                debitos.append((linha, destino, h))
+
+            numeros.append(linha.numero)
+            if len(numeros) >= tamanho_lote:
+                gravar()
+
+        if numeros:
+            gravar()
+    finally:
+        _liberar_texto(texto, arquivo)
+
+    if relatorio["creditos"] or relatorio["debitos"]:
+        cache.nova_versao_dados(usuario_id)
+
+    sucesso = relatorio["creditos"] + relatorio["debitos"] + relatorio["duplicadas"] > 0
+    return sucesso or not relatorio["erros"], relatorio
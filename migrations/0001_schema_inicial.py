@@ -0,0 +1,198 @@
+# ============================================
+# 0001 — Schema inicial + dados padrão
+# (antigo conteúdo de database.init_database)
+# ============================================
+
+from migrations import chave_primaria
+
+
+def upgrade(cursor, dialeto):
+    is_postgres = dialeto == "postgres"
+    pk = chave_primaria(dialeto)
+    verdadeiro = "TRUE" if is_postgres else "1"
+
+    # ---------------------------
+    # ✔ Tabelas principais
+    # ---------------------------
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id {pk},
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            nome_completo TEXT NOT NULL,
+            email TEXT,
+            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS fornecedores (
+            id {pk},
+            usuario_id INTEGER NOT NULL,
+            nome TEXT NOT NULL,
+            cpf_cnpj TEXT,
+            telefone TEXT,
+            email TEXT,
+            ativo BOOLEAN DEFAULT {verdadeiro},
+            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS formas_pagamento (
+            id {pk},
+            descricao TEXT NOT NULL,
+            ativo BOOLEAN DEFAULT TRUE
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS tipos_documento (
+            id {pk},
+            descricao TEXT NOT NULL,
+            requer_bandeira BOOLEAN DEFAULT FALSE,
+            permite_parcelamento BOOLEAN DEFAULT FALSE,
+            ativo BOOLEAN DEFAULT TRUE
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS bandeiras_cartao (
+            id {pk},
+            descricao TEXT NOT NULL,
+            ativo BOOLEAN DEFAULT TRUE
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS status_documento (
+            id {pk},
+            descricao TEXT NOT NULL,
+            cor TEXT
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS tipos_credito (
+            id {pk},
+            descricao TEXT NOT NULL,
+            ativo BOOLEAN DEFAULT TRUE
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS lancamentos_debito (
+            id {pk},
+            usuario_id INTEGER NOT NULL,
+            fornecedor_id INTEGER NOT NULL,
+            forma_pagamento_id INTEGER NOT NULL,
+            tipo_documento_id INTEGER NOT NULL,
+            bandeira_cartao_id INTEGER,
+            valor_total DECIMAL(10,2) NOT NULL,
+            descricao TEXT,
+            quantidade_parcelas INTEGER DEFAULT 1,
+            data_lancamento DATE NOT NULL,
+            observacoes TEXT
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS parcelas_debito (
+            id {pk},
+            lancamento_debito_id INTEGER NOT NULL,
+            numero_parcela INTEGER NOT NULL,
+            valor_parcela DECIMAL(10,2) NOT NULL,
+            data_vencimento DATE NOT NULL,
+            status_id INTEGER DEFAULT 1,
+            data_pagamento DATE,
+            valor_pago DECIMAL(10,2),
+            observacoes TEXT
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS lancamentos_credito (
+            id {pk},
+            usuario_id INTEGER NOT NULL,
+            tipo_credito_id INTEGER NOT NULL,
+            valor DECIMAL(10,2) NOT NULL,
+            descricao TEXT,
+            data_recebimento DATE NOT NULL,
+            observacoes TEXT,
+            data_lancamento TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # ---------------------------
+    # ✔ Meios de pagamento por usuário (formato original;
+    #   colunas novas chegam na 0002)
+    # ---------------------------
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS meios_pagamento_usuario (
+            id {pk},
+            usuario_id INTEGER NOT NULL,
+            tipo TEXT NOT NULL,                 -- cartao_credito | cartao_debito | pix
+            banco TEXT NOT NULL,                -- Nubank | Caixa | Santander...
+            bandeira TEXT,                      -- Visa | Master (somente cartões)
+            ultimos_digitos TEXT,               -- 4 últimos dígitos
+            ativo BOOLEAN DEFAULT {verdadeiro},
+            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    _inserir_dados_padrao(cursor, is_postgres)
+
+
+# ============================================
+# Inserir dados padrão
+# ============================================
+def _inserir_dados_padrao(cursor, is_postgres):
+
+    def vazia(tabela):
+        cursor.execute(f"SELECT COUNT(*) AS total FROM {tabela}")
+        return cursor.fetchone()["total"] == 0
+
+    q2 = "%s, %s" if is_postgres else "?, ?"
+    q4 = "%s, %s, %s, %s" if is_postgres else "?, ?, ?, ?"
+
+    if vazia("formas_pagamento"):
+        cursor.executemany(
+            f"INSERT INTO formas_pagamento (descricao, ativo) VALUES ({q2})",
+            [('À Vista', True), ('A Prazo', True)]
+        )
+
+    if vazia("tipos_documento"):
+        cursor.executemany(
+            f"INSERT INTO tipos_documento (descricao, requer_bandeira, permite_parcelamento, ativo) VALUES ({q4})",
+            [
+                ('Carnê', False, True, True),
+                ('Promissória', False, True, True),
+                ('Boleto Bancário', False, True, True),
+                ('Cartão de Crédito', True, True, True),
+                ('Cartão de Débito', True, False, True),
+                ('Dinheiro', False, False, True),
+                ('PIX', False, False, True),
+                ('Financiamento', False, True, True),
+            ]
+        )
+
+    if vazia("bandeiras_cartao"):
+        cursor.executemany(
+            f"INSERT INTO bandeiras_cartao (descricao, ativo) VALUES ({q2})",
+            [('Visa', True), ('Mastercard', True), ('Elo', True),
+             ('American Express', True), ('Hipercard', True)]
+        )
+
+    if vazia("status_documento"):
+        cursor.executemany(
+            f"INSERT INTO status_documento (descricao, cor) VALUES ({q2})",
+            [('Aberto', '#FFA500'), ('Pago', '#28A745'),
+             ('Vencido', '#DC3545'), ('Cancelado', '#6C757D')]
+        )
+
+    if vazia("tipos_credito"):
+        cursor.executemany(
+            f"INSERT INTO tipos_credito (descricao, ativo) VALUES ({q2})",
+            [('Salário', True), ('Premiação', True),
+             ('13º Salário', True), ('Férias', True), ('Outros', True)]
+        )
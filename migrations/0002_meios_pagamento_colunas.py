@@ -0,0 +1,111 @@
+# ============================================
+# 0002 — Colunas usadas por cadastros.py em meios_pagamento_usuario
+# (tipo_pagamento, apelido, bandeira_cartao, chave_pix)
+#
+# As colunas antigas tipo/banco eram NOT NULL e o cadastro atual
+# não as preenche, então deixam de ser obrigatórias.
+# Registros antigos são convertidos para o formato novo.
+# ============================================
+
+from migrations import colunas_da_tabela
+
+NOVAS_COLUNAS = ("tipo_pagamento", "apelido", "bandeira_cartao", "chave_pix")
+
+
+def upgrade(cursor, dialeto):
+    colunas = colunas_da_tabela(cursor, dialeto, "meios_pagamento_usuario")
+
+    if dialeto == "postgres":
+        _upgrade_postgres(cursor, colunas)
+    else:
+        _upgrade_sqlite(cursor, colunas)
+
+
+def _upgrade_postgres(cursor, colunas):
+    for coluna in NOVAS_COLUNAS:
+        cursor.execute(
+            f"ALTER TABLE meios_pagamento_usuario ADD COLUMN IF NOT EXISTS {coluna} TEXT"
+        )
+
+    for coluna in ("tipo", "banco"):
+        if coluna in colunas:
+            cursor.execute(
+                f"ALTER TABLE meios_pagamento_usuario ALTER COLUMN {coluna} DROP NOT NULL"
+            )
+
+    if "tipo" in colunas:
+        cursor.execute("""
+            UPDATE meios_pagamento_usuario
+            SET tipo_pagamento = UPPER(tipo)
+            WHERE tipo_pagamento IS NULL AND tipo IS NOT NULL
+        """)
+
+    if "bandeira" in colunas:
+        cursor.execute("""
+            UPDATE meios_pagamento_usuario
+            SET bandeira_cartao = bandeira
+            WHERE bandeira_cartao IS NULL AND bandeira IS NOT NULL
+        """)
+
+    cursor.execute(_SQL_APELIDO)
+
+
+def _upgrade_sqlite(cursor, colunas):
+    if set(NOVAS_COLUNAS) <= colunas:
+        return
+
+    # SQLite não remove NOT NULL com ALTER TABLE: recria a tabela
+    cursor.execute("""
+        CREATE TABLE meios_pagamento_usuario_nova (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usuario_id INTEGER NOT NULL,
+            tipo_pagamento TEXT,                -- CARTAO_CREDITO | CARTAO_DEBITO | PIX | OUTRO
+            apelido TEXT,
+            banco TEXT,
+            bandeira_cartao TEXT,
+            ultimos_digitos TEXT,
+            chave_pix TEXT,
+            tipo TEXT,                          -- legado
+            bandeira TEXT,                      -- legado
+            ativo BOOLEAN DEFAULT 1,
+            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    def coluna_ou_nulo(nome):
+        return nome if nome in colunas else "NULL"
+
+    cursor.execute(f"""
+        INSERT INTO meios_pagamento_usuario_nova (
+            id, usuario_id, tipo_pagamento, apelido, banco, bandeira_cartao,
+            ultimos_digitos, chave_pix, tipo, bandeira, ativo, data_criacao
+        )
+        SELECT
+            id,
+            usuario_id,
+            COALESCE({coluna_ou_nulo("tipo_pagamento")}, UPPER({coluna_ou_nulo("tipo")})),
+            {coluna_ou_nulo("apelido")},
+            {coluna_ou_nulo("banco")},
+            COALESCE({coluna_ou_nulo("bandeira_cartao")}, {coluna_ou_nulo("bandeira")}),
+            {coluna_ou_nulo("ultimos_digitos")},
+            {coluna_ou_nulo("chave_pix")},
+            {coluna_ou_nulo("tipo")},
+            {coluna_ou_nulo("bandeira")},
+            ativo,
+            data_criacao
+        FROM meios_pagamento_usuario
+    """)
+
+    cursor.execute("DROP TABLE meios_pagamento_usuario")
+    cursor.execute("ALTER TABLE meios_pagamento_usuario_nova RENAME TO meios_pagamento_usuario")
+    cursor.execute(_SQL_APELIDO)
+
+
+# Apelido padrão para registros antigos: "Banco – Bandeira – 1234"
+_SQL_APELIDO = """
+    UPDATE meios_pagamento_usuario
+    SET apelido = COALESCE(banco, tipo_pagamento, 'Meio de pagamento')
+        || COALESCE(' – ' || bandeira_cartao, '')
+        || COALESCE(' – ' || ultimos_digitos, '')
+    WHERE apelido IS NULL
+"""
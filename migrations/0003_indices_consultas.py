@@ -0,0 +1,55 @@
+# ============================================
+# 0003 — Índices para as consultas por usuário e período
+#
+# As consultas quentes (listar_parcelas_debito, relatórios, resumo)
+# filtram lancamentos_debito por usuario_id, juntam parcelas_debito
+# por lancamento_debito_id e filtram por data_vencimento / status_id.
+# A sintaxe (inclusive índice parcial) é a mesma nos dois bancos.
+# ============================================
+
+INDICES = [
+    (
+        "idx_lancamentos_debito_usuario",
+        "lancamentos_debito (usuario_id, fornecedor_id)",
+        None,
+    ),
+    (
+        "idx_parcelas_debito_lancamento_venc",
+        "parcelas_debito (lancamento_debito_id, data_vencimento)",
+        None,
+    ),
+    # Parcelas em aberto/vencidas por vencimento: próximas do vencimento,
+    # marcação de vencidas e totais em aberto.
+    (
+        "idx_parcelas_debito_abertas_venc",
+        "parcelas_debito (data_vencimento, lancamento_debito_id)",
+        "status_id IN (1, 3)",
+    ),
+    (
+        "idx_lancamentos_credito_usuario_data",
+        "lancamentos_credito (usuario_id, data_recebimento)",
+        None,
+    ),
+    (
+        "idx_fornecedores_usuario_nome",
+        "fornecedores (usuario_id, nome)",
+        None,
+    ),
+    (
+        "idx_meios_pagamento_usuario",
+        "meios_pagamento_usuario (usuario_id, tipo_pagamento)",
+        None,
+    ),
+]
+
+
+def sql_criar_indice(nome, alvo, condicao):
+    sql = f"CREATE INDEX IF NOT EXISTS {nome} ON {alvo}"
+    if condicao:
+        sql += f" WHERE {condicao}"
+    return sql
+
+
+def upgrade(cursor, dialeto):
+    for nome, alvo, condicao in INDICES:
+        cursor.execute(sql_criar_indice(nome, alvo, condicao))
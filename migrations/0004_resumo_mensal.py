@@ -0,0 +1,67 @@
+# ============================================
+# 0004 — Tabela resumo_mensal (totais por usuário/ano/mês)
+#
+# Mantida incrementalmente por creditos.py / debitos.py
+# (ver resumo_mensal.py). Aqui criamos a tabela e a
+# populamos a partir dos lançamentos existentes.
+# ============================================
+
+
+def upgrade(cursor, dialeto):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resumo_mensal (
+            usuario_id INTEGER NOT NULL,
+            ano INTEGER NOT NULL,
+            mes INTEGER NOT NULL,
+            total_creditos DECIMAL(14,2) NOT NULL DEFAULT 0,
+            debitos_previstos DECIMAL(14,2) NOT NULL DEFAULT 0,
+            debitos_pagos DECIMAL(14,2) NOT NULL DEFAULT 0,
+            debitos_em_aberto DECIMAL(14,2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (usuario_id, ano, mes)
+        )
+    """)
+
+    if dialeto == "postgres":
+        def ano(coluna):
+            return f"CAST(EXTRACT(YEAR FROM {coluna}) AS INTEGER)"
+
+        def mes(coluna):
+            return f"CAST(EXTRACT(MONTH FROM {coluna}) AS INTEGER)"
+    else:
+        def ano(coluna):
+            return f"CAST(strftime('%Y', {coluna}) AS INTEGER)"
+
+        def mes(coluna):
+            return f"CAST(strftime('%m', {coluna}) AS INTEGER)"
+
+    cursor.execute("DELETE FROM resumo_mensal")
+    cursor.execute(f"""
+        INSERT INTO resumo_mensal (
+            usuario_id, ano, mes,
+            total_creditos, debitos_previstos, debitos_pagos, debitos_em_aberto
+        )
+        SELECT usuario_id, ano, mes, SUM(cred), SUM(prev), SUM(pago), SUM(aberto)
+        FROM (
+            SELECT
+                lc.usuario_id,
+                {ano("lc.data_recebimento")} AS ano,
+                {mes("lc.data_recebimento")} AS mes,
+                lc.valor AS cred, 0 AS prev, 0 AS pago, 0 AS aberto
+            FROM lancamentos_credito lc
+
+            UNION ALL
+
+            SELECT
+                ld.usuario_id,
+                {ano("pd.data_vencimento")},
+                {mes("pd.data_vencimento")},
+                0,
+                pd.valor_parcela,
+                CASE WHEN pd.status_id = 2
+                     THEN COALESCE(pd.valor_pago, pd.valor_parcela) ELSE 0 END,
+                CASE WHEN pd.status_id IN (1, 3) THEN pd.valor_parcela ELSE 0 END
+            FROM parcelas_debito pd
+            INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
+        ) t
+        GROUP BY usuario_id, ano, mes
+    """)
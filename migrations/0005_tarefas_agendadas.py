@@ -0,0 +1,12 @@
+# ============================================
+# 0005 — Marca d'água das tarefas agendadas (ver agendador.py)
+# ============================================
+
+
+def upgrade(cursor, dialeto):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tarefas_agendadas (
+            nome TEXT PRIMARY KEY,
+            ultima_execucao DATE
+        )
+    """)
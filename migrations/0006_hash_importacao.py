@@ -0,0 +1,23 @@
+# ============================================
+# 0006 — Hash de importação de extratos (importacao.py)
+#
+# Lançamentos vindos de extrato bancário guardam um hash de
+# (data, valor, descrição, ocorrência); o índice único por usuário
+# impede importar a mesma linha duas vezes. Lançamentos manuais
+# ficam com NULL (NULLs não colidem no índice único).
+# ============================================
+
+from migrations import colunas_da_tabela
+
+TABELAS = ("lancamentos_credito", "lancamentos_debito")
+
+
+def upgrade(cursor, dialeto):
+    for tabela in TABELAS:
+        if "hash_importacao" not in colunas_da_tabela(cursor, dialeto, tabela):
+            cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN hash_importacao TEXT")
+
+        cursor.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_{tabela}_hash_importacao
+            ON {tabela} (usuario_id, hash_importacao)
+        """)
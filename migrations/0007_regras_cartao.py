@@ -0,0 +1,28 @@
+# ============================================
+# 0007 — Fechamento/vencimento da fatura (parcelamento.py)
+#
+# meios_pagamento_usuario ganha o dia de fechamento e o dia de
+# vencimento da fatura (NULL = sem regra). lancamentos_debito passa
+# a guardar o meio de pagamento usado, para recalcular os
+# vencimentos quando o cartão muda de regra.
+# ============================================
+
+from migrations import colunas_da_tabela
+
+COLUNAS = {
+    "meios_pagamento_usuario": ("dia_fechamento", "dia_vencimento"),
+    "lancamentos_debito": ("meio_pagamento_id",),
+}
+
+
+def upgrade(cursor, dialeto):
+    for tabela, colunas in COLUNAS.items():
+        existentes = colunas_da_tabela(cursor, dialeto, tabela)
+        for coluna in colunas:
+            if coluna not in existentes:
+                cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} INTEGER")
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_lancamentos_debito_meio_pagamento
+        ON lancamentos_debito (meio_pagamento_id)
+    """)
@@ -0,0 +1,83 @@
+# ============================================
+# 0008 — Lançamentos com vencimentos gerados pela regra do cartão
+#
+# lancamentos_debito.vencimento_pela_regra marca os cronogramas que
+# saíram da regra de fechamento/vencimento da fatura. Só esses são
+# refeitos por debitos.recalcular_vencimentos_cartao; datas escolhidas
+# ou editadas pelo usuário não são sobrescritas.
+#
+# Lançamentos existentes: marcados quando todas as parcelas batem com
+# a regra atual do cartão. A regra de datas está copiada aqui (como
+# era em parcelamento.py nesta versão): mudanças futuras no
+# cronograma não mudam o que esta migração marca.
+# ============================================
+
+from calendar import monthrange
+from datetime import date
+
+from migrations import colunas_da_tabela
+
+
+def _somar_meses(data, meses, dia):
+    total = data.year * 12 + data.month - 1 + meses
+    ano, mes = total // 12, total % 12 + 1
+    return date(ano, mes, min(dia, monthrange(ano, mes)[1]))
+
+
+def _vencimentos_pela_regra(quantidade, data_compra, dia_fechamento, dia_vencimento):
+    """{numero_parcela: vencimento} de uma compra no cartão."""
+    # Compras a partir do fechamento entram na fatura seguinte; a fatura
+    # vence no mês seguinte ao fechamento se o vencimento não vier depois
+    fechamento = min(dia_fechamento, monthrange(data_compra.year, data_compra.month)[1])
+    meses = 0 if data_compra.day < fechamento else 1
+    if dia_vencimento <= dia_fechamento:
+        meses += 1
+    primeira = _somar_meses(data_compra, meses, dia_vencimento)
+    return {
+        numero: _somar_meses(primeira, numero - 1, dia_vencimento)
+        for numero in range(1, quantidade + 1)
+    }
+
+
+def upgrade(cursor, dialeto):
+    if "vencimento_pela_regra" not in colunas_da_tabela(cursor, dialeto, "lancamentos_debito"):
+        cursor.execute(
+            "ALTER TABLE lancamentos_debito ADD COLUMN vencimento_pela_regra BOOLEAN DEFAULT FALSE"
+        )
+
+    cursor.execute("""
+        SELECT ld.id, ld.quantidade_parcelas, ld.data_lancamento,
+               mp.dia_fechamento, mp.dia_vencimento
+        FROM lancamentos_debito ld
+        INNER JOIN meios_pagamento_usuario mp ON ld.meio_pagamento_id = mp.id
+        WHERE mp.dia_fechamento IS NOT NULL AND mp.dia_vencimento IS NOT NULL
+    """)
+    lancamentos = cursor.fetchall()
+    if not lancamentos:
+        return
+
+    cursor.execute("""
+        SELECT pd.lancamento_debito_id, pd.numero_parcela, pd.data_vencimento
+        FROM parcelas_debito pd
+        INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
+        WHERE ld.meio_pagamento_id IS NOT NULL
+    """)
+    vencimentos = {}
+    for p in cursor.fetchall():
+        vencimentos.setdefault(p["lancamento_debito_id"], {})[p["numero_parcela"]] = p["data_vencimento"]
+
+    pela_regra = []
+    for l in lancamentos:
+        esperados = _vencimentos_pela_regra(
+            l["quantidade_parcelas"] or 1, l["data_lancamento"],
+            l["dia_fechamento"], l["dia_vencimento"],
+        )
+        if vencimentos.get(l["id"]) == esperados:
+            pela_regra.append(l["id"])
+
+    # ids inteiros vindos do próprio banco
+    for inicio in range(0, len(pela_regra), 1000):
+        ids = ", ".join(str(i) for i in pela_regra[inicio:inicio + 1000])
+        cursor.execute(
+            f"UPDATE lancamentos_debito SET vencimento_pela_regra = TRUE WHERE id IN ({ids})"
+        )
@@ -0,0 +1,161 @@
+# ============================================
+# FILE: migrations/__init__.py
+# Motor de migrações versionadas do schema
+#
+# Cada arquivo NNNN_descricao.py desta pasta define:
+#     def upgrade(cursor, dialeto): ...
+# onde dialeto é "postgres" ou "sqlite". As migrações são
+# aplicadas em ordem, cada uma na sua própria transação, e
+# registradas na tabela schema_migrations.
+# ============================================
+
+import importlib
+import os
+import re
+
+_PADRAO_ARQUIVO = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+# Chave do advisory lock que serializa migrações concorrentes no PostgreSQL
+_LOCK_MIGRACOES = 7_250_001
+
+
+# ============================================
+# 📂 Descoberta
+# ============================================
+def listar_migracoes():
+    """Retorna [(versao, nome, modulo)] em ordem crescente de versão."""
+    pasta = os.path.dirname(__file__)
+    encontradas = []
+
+    for arquivo in os.listdir(pasta):
+        m = _PADRAO_ARQUIVO.match(arquivo)
+        if m:
+            encontradas.append((int(m.group(1)), m.group(2), arquivo[:-3]))
+
+    encontradas.sort()
+
+    versoes = [v for v, _, _ in encontradas]
+    if len(versoes) != len(set(versoes)):
+        raise RuntimeError(f"Versões de migração duplicadas: {versoes}")
+
+    return [
+        (versao, nome, importlib.import_module(f"{__name__}.{modulo}"))
+        for versao, nome, modulo in encontradas
+    ]
+
+
+def versao_mais_recente():
+    migracoes = listar_migracoes()
+    return migracoes[-1][0] if migracoes else 0
+
+
+# ============================================
+# 🔢 Versão atual do banco
+# ============================================
+def versao_atual(conn):
+    """Maior versão aplicada (0 se schema_migrations ainda não existe)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MAX(versao) AS versao FROM schema_migrations")
+        row = cursor.fetchone()
+        conn.rollback()
+        return row["versao"] or 0
+    except Exception:
+        conn.rollback()
+        return 0
+
+
+def _criar_tabela_controle(conn, cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            versao INTEGER PRIMARY KEY,
+            nome TEXT NOT NULL,
+            aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+def _ja_aplicada(cursor, versao, ph):
+    cursor.execute(
+        f"SELECT 1 AS aplicada FROM schema_migrations WHERE versao = {ph}",
+        (versao,),
+    )
+    return cursor.fetchone() is not None
+
+
+# ============================================
+# ▶️ Aplicação
+# ============================================
+def aplicar_migracoes(conn):
+    """
+    Aplica as migrações pendentes e retorna [(versao, nome)] aplicadas.
+    """
+    migracoes = listar_migracoes()
+    if not migracoes:
+        return []
+
+    atual = versao_atual(conn)
+    pendentes = [m for m in migracoes if m[0] > atual]
+    if not pendentes:
+        return []
+
+    dialeto = conn.dialeto
+    ph = "%s" if dialeto == "postgres" else "?"
+    cursor = conn.cursor()
+
+    _criar_tabela_controle(conn, cursor)
+
+    aplicadas = []
+    for versao, nome, modulo in pendentes:
+        try:
+            if dialeto == "postgres":
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (_LOCK_MIGRACOES,))
+            else:
+                # sqlite3 não abre transação sozinho antes de DDL
+                cursor.execute("BEGIN")
+
+            # Outro processo pode ter aplicado enquanto aguardávamos o lock
+            if _ja_aplicada(cursor, versao, ph):
+                conn.rollback()
+                continue
+
+            modulo.upgrade(cursor, dialeto)
+
+            cursor.execute(
+                f"INSERT INTO schema_migrations (versao, nome) VALUES ({ph}, {ph})",
+                (versao, nome),
+            )
+            conn.commit()
+            aplicadas.append((versao, nome))
+
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Falha na migração {versao:04d}_{nome}: {e}") from e
+
+    return aplicadas
+
+
+# ============================================
+# 🧰 Utilidades para os arquivos de migração
+# ============================================
+def colunas_da_tabela(cursor, dialeto, tabela):
+    """Conjunto com os nomes das colunas existentes em `tabela`."""
+    if dialeto == "postgres":
+        cursor.execute(
+            """
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = %s
+            """,
+            (tabela,),
+        )
+        return {row["column_name"] for row in cursor.fetchall()}
+
+    cursor.execute(f"PRAGMA table_info({tabela})")
+    return {row["name"] for row in cursor.fetchall()}
+
+
+def chave_primaria(dialeto):
+    return "SERIAL PRIMARY KEY" if dialeto == "postgres" else "INTEGER PRIMARY KEY AUTOINCREMENT"
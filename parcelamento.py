@@ -0,0 +1,193 @@
+# ============================================
+# FILE: parcelamento.py
+# Cronograma de parcelas: valores e vencimentos
+#
+# - Valores em centavos inteiros (nada de float): a parcela é o
+#   total / quantidade arredondado e a última absorve a diferença.
+# - Vencimentos por mês de calendário, sempre no mesmo dia do mês
+#   (limitado ao último dia: 31/01 -> 28/02 -> 31/03).
+# - Regra de cartão: compras a partir do dia de fechamento entram na
+#   fatura seguinte, que vence no dia de vencimento.
+#
+# gerar_cronogramas() calcula milhares de lançamentos de uma vez
+# (numpy); gerar_parcelas() faz o mesmo para um lançamento só, em
+# Python puro. O numpy só é importado nas funções de lote: quem lança
+# um débito (ou só importa debitos) não paga por ele.
+# ============================================
+
+from calendar import monthrange
+from datetime import date
+
+import dinheiro
+
+
+# ============================================================
+# 💰 Divisão em parcelas
+# ============================================================
+
+def dividir_centavos(centavos_totais, quantidades):
+    """
+    Valor de cada parcela: (centavos_parcela, centavos_ultima).
+    Aceita inteiros ou arrays numpy alinhados (um item por lançamento).
+    """
+    # total / quantidade arredondado meio para cima, só com inteiros
+    parcela = (2 * centavos_totais + quantidades) // (2 * quantidades)
+    ultima = centavos_totais - parcela * (quantidades - 1)
+    return parcela, ultima
+
+
+# ============================================================
+# 📅 Datas
+# ============================================================
+
+def somar_meses(data, meses, dia=None):
+    """data + meses de calendário, no dia `dia` (padrão: o de data) ou no último do mês."""
+    total = data.year * 12 + data.month - 1 + meses
+    ano, mes = total // 12, total % 12 + 1
+    return date(ano, mes, min(dia or data.day, monthrange(ano, mes)[1]))
+
+
+def primeiro_vencimento_cartao(data_compra, dia_fechamento, dia_vencimento):
+    """Vencimento da fatura em que entra uma compra no cartão."""
+    fechamento = min(dia_fechamento, monthrange(data_compra.year, data_compra.month)[1])
+    meses = 0 if data_compra.day < fechamento else 1
+    if dia_vencimento <= dia_fechamento:
+        meses += 1  # a fatura vence no mês seguinte ao fechamento
+    return somar_meses(data_compra, meses, dia_vencimento)
+
+
+def _dias_no_mes(meses):
+    """Array datetime64[M] -> quantidade de dias de cada mês."""
+    import numpy as np
+
+    return ((meses + 1).astype("datetime64[D]") - meses.astype("datetime64[D]")).astype(np.int64)
+
+
+# ============================================================
+# 🧮 Cronogramas em lote
+# ============================================================
+
+def gerar_cronogramas(
+    valores_totais,
+    quantidades,
+    datas_base,
+    dias_fechamento=None,
+    dias_vencimento=None,
+    meses_primeira=0,
+):
+    """
+    Cronogramas de vários lançamentos de uma vez.
+
+    valores_totais, quantidades, datas_base: um item por lançamento.
+    datas_base é o vencimento da 1ª parcela (ou a data do lançamento,
+    com meses_primeira=1 para "um mês depois" no mesmo dia); nos
+    lançamentos com regra de cartão (dias_fechamento/dias_vencimento
+    preenchidos, None ou 0 = sem regra) é a data da compra.
+
+    Retorna dict de arrays numpy com uma posição por parcela:
+        "lancamento" (índice na entrada), "numero", "centavos",
+        "vencimento" (datetime64[D])
+    """
+    import numpy as np
+
+    quantidades = np.asarray(quantidades, dtype=np.int64)
+    if quantidades.size and quantidades.min() < 1:
+        raise ValueError("Quantidade de parcelas deve ser pelo menos 1.")
+
+    centavos_totais = np.fromiter(
+        (dinheiro.centavos(v) for v in valores_totais), dtype=np.int64, count=len(quantidades)
+    )
+    datas = np.asarray(datas_base, dtype="datetime64[D]")
+    meses = datas.astype("datetime64[M]")
+    dias = (datas - meses.astype("datetime64[D]")).astype(np.int64) + 1
+    meses_sem_regra = meses + np.asarray(meses_primeira, dtype=np.int64)
+
+    # Regra de cartão: desloca o mês da 1ª parcela e ancora no dia de vencimento
+    if dias_fechamento is not None and dias_vencimento is not None:
+        fechamento = np.array([d or 0 for d in dias_fechamento], dtype=np.int64)
+        vencimento = np.array([d or 0 for d in dias_vencimento], dtype=np.int64)
+        cartao = (fechamento > 0) & (vencimento > 0)
+
+        depois_do_fechamento = dias >= np.minimum(fechamento, _dias_no_mes(meses))
+        deslocamento = depois_do_fechamento.astype(np.int64) + (vencimento <= fechamento)
+        meses = np.where(cartao, meses + deslocamento, meses_sem_regra)
+        dias = np.where(cartao, vencimento, dias)
+    else:
+        meses = meses_sem_regra
+
+    # Uma posição por parcela
+    fim_grupo = np.cumsum(quantidades)
+    lancamento = np.repeat(np.arange(len(quantidades)), quantidades)
+    numero = np.arange(len(lancamento)) - np.repeat(fim_grupo - quantidades, quantidades) + 1
+
+    meses_parcela = np.repeat(meses, quantidades) + (numero - 1)
+    dia_parcela = np.minimum(np.repeat(dias, quantidades), _dias_no_mes(meses_parcela))
+    vencimentos = meses_parcela.astype("datetime64[D]") + (dia_parcela - 1)
+
+    parcela, ultima = dividir_centavos(centavos_totais, quantidades)
+    centavos = np.repeat(parcela, quantidades)
+    centavos[fim_grupo - 1] = ultima
+
+    return {
+        "lancamento": lancamento,
+        "numero": numero,
+        "centavos": centavos,
+        "vencimento": vencimentos,
+    }
+
+
+def linhas_parcelas(cronograma, lancamento_ids):
+    """
+    Converte o cronograma em tuplas para o INSERT:
+    (lancamento_debito_id, numero_parcela, valor_parcela, data_vencimento)
+    lancamento_ids: id de cada lançamento, na ordem da entrada.
+    """
+    import numpy as np
+
+    ids = np.asarray(lancamento_ids)[cronograma["lancamento"]].tolist()
+
+    # Valores e datas se repetem muito: converte cada distinto uma vez
+    centavos = cronograma["centavos"]
+    distintos, posicoes = np.unique(centavos, return_inverse=True)
+    decimais = [dinheiro.reais(c) for c in distintos.tolist()]
+    valores = [decimais[i] for i in posicoes.tolist()]
+
+    distintas, posicoes = np.unique(cronograma["vencimento"], return_inverse=True)
+    datas = distintas.astype(object).tolist()
+    vencimentos = [datas[i] for i in posicoes.tolist()]
+
+    return list(zip(ids, cronograma["numero"].tolist(), valores, vencimentos))
+
+
+def gerar_parcelas(
+    valor_total, quantidade, data_base, dia_fechamento=None, dia_vencimento=None, meses_primeira=0
+):
+    """
+    Cronograma de um lançamento: [(numero_parcela, valor, data_vencimento)].
+    Sem regra de cartão a 1ª parcela vence meses_primeira meses após
+    data_base; com regra, data_base é a data da compra.
+
+    Mesmas regras de gerar_cronogramas, em Python puro: para um
+    lançamento só, montar os arrays custa mais que o cálculo.
+    """
+    if quantidade < 1:
+        raise ValueError("Quantidade de parcelas deve ser pelo menos 1.")
+
+    if dia_fechamento and dia_vencimento:
+        primeira = primeiro_vencimento_cartao(data_base, dia_fechamento, dia_vencimento)
+        dia = dia_vencimento
+    else:
+        primeira = somar_meses(data_base, meses_primeira)
+        dia = data_base.day
+
+    parcela, ultima = dividir_centavos(dinheiro.centavos(valor_total), quantidade)
+    valor_parcela, valor_ultima = dinheiro.reais(parcela), dinheiro.reais(ultima)
+
+    return [
+        (
+            numero,
+            valor_ultima if numero == quantidade else valor_parcela,
+            somar_meses(primeira, numero - 1, dia),
+        )
+        for numero in range(1, quantidade + 1)
+    ]
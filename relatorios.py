@@ -5,31 +5,169 @@
 # ============================================================
 
 from database import get_connection
-from datetime import datetime
-import pandas as pd
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import uuid
+import dinheiro
+import resumo_mensal
 
 
 # ============================================================
-# 🔍 (Opcional) Função de ajuste – hoje usamos direto %s
+# 🧾 Leitura para DataFrame
 # ============================================================
 
-def ajustar_placeholders(query, params):
+def ler_dataframe(conn, query, params, colunas_dinheiro=()):
     """
-    Mantida apenas se você quiser reaproveitar queries com '?'
-    (Hoje todas as queries deste arquivo já estão em %s).
+    Executa a query no cursor da conexão e monta o DataFrame.
+    (pd.read_sql com RealDictCursor devolve os nomes das colunas
+    no lugar dos valores.)
+    colunas_dinheiro saem em centavos (int64), ver dinheiro.py.
     """
-    count = query.count("?")
-    query_corrigida = query.replace("?", "%s")
-    return query_corrigida, params[:count]
+    import pandas as pd  # só quando um relatório vira DataFrame
+
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    colunas = [d[0] for d in cursor.description]
+    rows = cursor.fetchall()
+    cursor.close()
+    df = pd.DataFrame([dict(r) for r in rows], columns=colunas)
+    return dinheiro.colunas_para_centavos(df, colunas_dinheiro)
+
+
+# ============================================================
+# 🌊 Leitura em lotes (streaming)
+# ============================================================
+
+TAMANHO_LOTE_STREAM = 1000
+
+
+def iterar_consulta(query, params, tamanho_lote=TAMANHO_LOTE_STREAM):
+    """
+    Executa a query e gera lotes de até tamanho_lote linhas (dicts).
+
+    PostgreSQL: cursor nomeado (server-side), um FETCH por lote.
+    SQLite: fetchmany sobre o cursor comum, que já lê sob demanda.
+    A conexão volta ao pool mesmo se o consumidor abandonar o gerador.
+    """
+    conn = get_connection()
+
+    if conn.dialeto == "postgres":
+        cursor = conn.cursor(name=f"relatorio_{uuid.uuid4().hex}")
+        cursor.itersize = tamanho_lote
+    else:
+        cursor = conn.cursor()
+
+    try:
+        cursor.execute(query, params)
+        while True:
+            linhas = cursor.fetchmany(tamanho_lote)
+            if not linhas:
+                break
+            yield linhas
+
+    finally:
+        cursor.close()
+        if conn.dialeto == "postgres":
+            conn.rollback()  # encerra a transação de leitura do cursor nomeado
+        # SQLite: a conexão da thread pode estar emprestada também a quem
+        # chamou, com escritas ainda sem commit; o pool só desfaz a
+        # transação quando o último empréstimo é devolvido
+        conn.close()
 
 
 # ============================================================
 # 📌 RELATÓRIO: CONTA CORRENTE (CRÉDITOS + DÉBITOS)
 # ============================================================
 
-def gerar_relatorio_conta_corrente(usuario_id, data_inicio=None, data_fim=None, fornecedor_id=None):
+COLUNAS_CONTA_CORRENTE = [
+    "data", "tipo", "categoria", "descricao", "valor", "debito", "credito",
+    "fornecedor", "status", "status_cor", "saldo",
+]
+
+# Desempate estável da ordenação (data, débitos antes dos créditos, id):
+# o saldo acumulado e o cursor de paginação dependem de uma ordem total.
+COLUNAS_ORDEM_CONTA_CORRENTE = ["ordem_tipo", "ordem_id"]
+
+TAMANHO_PAGINA_CONTA_CORRENTE = 50
+
+_CENTAVO = Decimal("0.01")
+
+
+def _data_iso(valor):
+    if isinstance(valor, str):
+        return date.fromisoformat(valor[:10])
+    return valor
+
+
+def _sql_saldo_anterior(usuario_id, data_inicio, fornecedor_id):
+    """
+    Expressão SQL (subconsulta escalar) do saldo antes de data_inicio.
+
+    Sem filtro de fornecedor, os meses inteiros vêm do resumo_mensal
+    (uma linha por mês) e só o mês de data_inicio é somado nos
+    lançamentos. Com fornecedor, soma os créditos e os débitos do
+    fornecedor anteriores ao período.
+    """
+    if not data_inicio:
+        return "0", []
+
+    data_inicio = _data_iso(data_inicio)
+
+    if fornecedor_id:
+        sql = """(
+            (SELECT COALESCE(SUM(lc.valor), 0) FROM lancamentos_credito lc
+             WHERE lc.usuario_id = %s AND lc.data_recebimento < %s)
+            -
+            (SELECT COALESCE(SUM(pd.valor_parcela), 0) FROM parcelas_debito pd
+             INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
+             WHERE ld.usuario_id = %s AND ld.fornecedor_id = %s AND pd.data_vencimento < %s)
+        )"""
+        return sql, [usuario_id, data_inicio, usuario_id, fornecedor_id, data_inicio]
+
+    inicio_mes = data_inicio.replace(day=1)
+    sql = """(
+        (SELECT COALESCE(SUM(rm.total_creditos - rm.debitos_previstos), 0) FROM resumo_mensal rm
+         WHERE rm.usuario_id = %s AND (rm.ano < %s OR (rm.ano = %s AND rm.mes < %s)))
+        +
+        (SELECT COALESCE(SUM(lc.valor), 0) FROM lancamentos_credito lc
+         WHERE lc.usuario_id = %s AND lc.data_recebimento >= %s AND lc.data_recebimento < %s)
+        -
+        (SELECT COALESCE(SUM(pd.valor_parcela), 0) FROM parcelas_debito pd
+         INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
+         WHERE ld.usuario_id = %s AND pd.data_vencimento >= %s AND pd.data_vencimento < %s)
+    )"""
+    params = [
+        usuario_id, data_inicio.year, data_inicio.year, data_inicio.month,
+        usuario_id, inicio_mes, data_inicio,
+        usuario_id, inicio_mes, data_inicio,
+    ]
+    return sql, params
+
+
+def saldo_anterior(usuario_id, data_inicio, fornecedor_id=None):
+    """Saldo acumulado antes de data_inicio (saldo de abertura do extrato), em Centavos."""
+    sql, params = _sql_saldo_anterior(usuario_id, data_inicio, fornecedor_id)
+
     conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {sql} AS saldo", params)
+    row = cursor.fetchone()
+    conn.close()
 
+    return dinheiro.centavos(_decimal(row["saldo"]))
+
+
+def _sql_conta_corrente(
+    usuario_id, data_inicio, data_fim, fornecedor_id, apos=None, limite=None
+):
+    """
+    Monta o extrato com o saldo acumulado calculado no banco:
+    saldo de abertura + SUM(credito - debito) OVER (ordem do extrato).
+
+    apos: cursor (data, ordem_tipo, ordem_id, saldo) da última linha já
+    lida; o saldo dela passa a ser o de abertura e as linhas anteriores
+    nem entram na janela.
+    """
     # --------------------------------------------
     # Créditos
     # --------------------------------------------
@@ -44,7 +182,9 @@ def gerar_relatorio_conta_corrente(usuario_id, data_inicio=None, data_fim=None,
             lc.valor AS credito,
             NULL AS fornecedor,
             NULL AS status,
-            NULL AS status_cor
+            NULL AS status_cor,
+            1 AS ordem_tipo,
+            lc.id AS ordem_id
         FROM lancamentos_credito lc
         INNER JOIN tipos_credito tc ON lc.tipo_credito_id = tc.id
         WHERE lc.usuario_id = %s
@@ -59,6 +199,11 @@ def gerar_relatorio_conta_corrente(usuario_id, data_inicio=None, data_fim=None,
         query_creditos += " AND lc.data_recebimento <= %s"
         params_creditos.append(data_fim)
 
+    if apos:
+        # Condição repetida em cada ramo: o SQLite não a empurra para dentro do UNION
+        query_creditos += " AND lc.data_recebimento >= %s AND (lc.data_recebimento, 1, lc.id) > (%s, %s, %s)"
+        params_creditos += [apos[0], apos[0], apos[1], apos[2]]
+
     # --------------------------------------------
     # Débitos
     # --------------------------------------------
@@ -73,7 +218,9 @@ def gerar_relatorio_conta_corrente(usuario_id, data_inicio=None, data_fim=None,
             0 AS credito,
             f.nome AS fornecedor,
             s.descricao AS status,
-            s.cor AS status_cor
+            s.cor AS status_cor,
+            0 AS ordem_tipo,
+            pd.id AS ordem_id
         FROM parcelas_debito pd
         INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
         INNER JOIN fornecedores f ON ld.fornecedor_id = f.id
@@ -95,37 +242,156 @@ def gerar_relatorio_conta_corrente(usuario_id, data_inicio=None, data_fim=None,
         query_debitos += " AND f.id = %s"
         params_debitos.append(fornecedor_id)
 
+    if apos:
+        query_debitos += " AND pd.data_vencimento >= %s AND (pd.data_vencimento, 0, pd.id) > (%s, %s, %s)"
+        params_debitos += [apos[0], apos[0], apos[1], apos[2]]
+
+    # --------------------------------------------
+    # Saldo de abertura e paginação
     # --------------------------------------------
-    # UNION FINAL — 100% PostgreSQL válido
+    if apos:
+        abertura, params_abertura = "%s", [apos[3]]
+    else:
+        abertura, params_abertura = _sql_saldo_anterior(usuario_id, data_inicio, fornecedor_id)
+
+    # --------------------------------------------
+    # UNION + janela — PostgreSQL e SQLite (3.25+)
     # --------------------------------------------
     query_final = f"""
-        {query_creditos}
-        UNION ALL
-        {query_debitos}
-        ORDER BY data, tipo DESC
+        SELECT
+            cc.data, cc.tipo, cc.categoria, cc.descricao, cc.valor,
+            cc.debito, cc.credito, cc.fornecedor, cc.status, cc.status_cor,
+            {abertura} + SUM(cc.credito - cc.debito) OVER (
+                ORDER BY cc.data, cc.ordem_tipo, cc.ordem_id
+                ROWS UNBOUNDED PRECEDING
+            ) AS saldo,
+            cc.ordem_tipo, cc.ordem_id
+        FROM (
+            {query_creditos}
+            UNION ALL
+            {query_debitos}
+        ) cc
+        ORDER BY cc.data, cc.ordem_tipo, cc.ordem_id
     """
 
-    params_final = params_creditos + params_debitos
+    params_final = params_abertura + params_creditos + params_debitos
+
+    if limite:
+        query_final += " LIMIT %s"
+        params_final.append(limite)
+
+    return query_final, params_final
 
-    df = pd.read_sql(query_final, conn, params=params_final)
+
+def gerar_relatorio_conta_corrente(usuario_id, data_inicio=None, data_fim=None, fornecedor_id=None):
+    conn = get_connection()
+
+    query_final, params_final = _sql_conta_corrente(
+        usuario_id, data_inicio, data_fim, fornecedor_id
+    )
+
+    df = ler_dataframe(
+        conn, query_final, params_final, colunas_dinheiro=("valor", "debito", "credito", "saldo")
+    )
     conn.close()
 
-    # Saldo acumulado
+    df = df.drop(columns=COLUNAS_ORDEM_CONTA_CORRENTE)
+
     if not df.empty:
-        df["saldo"] = (df["credito"] - df["debito"]).cumsum()
+        primeira = df.iloc[0]
+        df.attrs["saldo_anterior"] = dinheiro.Centavos(
+            int(primeira["saldo"] - primeira["credito"] + primeira["debito"])
+        )
     else:
         df["saldo"] = 0
+        df.attrs["saldo_anterior"] = saldo_anterior(usuario_id, data_inicio, fornecedor_id)
 
     return df
 
 
+def _decimal(valor):
+    # No SQLite as colunas do UNION chegam ora Decimal, ora float/int
+    if isinstance(valor, Decimal):
+        return valor
+    return Decimal(str(valor or 0)).quantize(_CENTAVO)
+
+
+def listar_conta_corrente_pagina(
+    usuario_id,
+    data_inicio=None,
+    data_fim=None,
+    fornecedor_id=None,
+    apos=None,
+    tamanho_pagina=TAMANHO_PAGINA_CONTA_CORRENTE,
+):
+    """
+    Uma página do extrato (paginação por cursor).
+    Retorna (linhas, proximo_cursor); proximo_cursor é None na última
+    página. O saldo de cada página continua o da anterior.
+    """
+    query_final, params_final = _sql_conta_corrente(
+        usuario_id, data_inicio, data_fim, fornecedor_id,
+        apos=apos, limite=tamanho_pagina + 1,
+    )
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(query_final, params_final)
+    rows = cursor.fetchall()
+    conn.close()
+
+    for r in rows:
+        r["debito"] = _decimal(r["debito"])
+        r["credito"] = _decimal(r["credito"])
+        r["saldo"] = _decimal(r["saldo"])
+
+    proximo_cursor = None
+    if len(rows) > tamanho_pagina:
+        rows = rows[:tamanho_pagina]
+        ultima = rows[-1]
+        proximo_cursor = (ultima["data"], ultima["ordem_tipo"], ultima["ordem_id"], ultima["saldo"])
+
+    return rows, proximo_cursor
+
+
+def iterar_relatorio_conta_corrente(
+    usuario_id,
+    data_inicio=None,
+    data_fim=None,
+    fornecedor_id=None,
+    tamanho_lote=TAMANHO_LOTE_STREAM,
+):
+    """
+    Versão em streaming do extrato: gera lotes de linhas com as
+    COLUNAS_CONTA_CORRENTE; o saldo acumulado (a partir do saldo
+    anterior ao período) já vem calculado do banco.
+    """
+    query_final, params_final = _sql_conta_corrente(
+        usuario_id, data_inicio, data_fim, fornecedor_id
+    )
+
+    for linhas in iterar_consulta(query_final, params_final, tamanho_lote):
+        # As linhas já são dicts (RealDictRow / _linha_dict): completa no lugar
+        for r in linhas:
+            r["debito"] = _decimal(r["debito"])
+            r["credito"] = _decimal(r["credito"])
+            r["saldo"] = _decimal(r["saldo"])
+        yield linhas
+
+
 # ============================================================
 # 📅 RELATÓRIO MENSAL DE DÉBITOS
 # ============================================================
 
-def gerar_relatorio_mensal_debitos(usuario_id, ano, mes):
+COLUNAS_MENSAL_DEBITOS = [
+    "data_vencimento", "fornecedor", "descricao", "tipo_documento",
+    "numero_parcela", "quantidade_parcelas", "valor_parcela", "status",
+    "status_cor", "data_pagamento", "valor_pago",
+]
+
+
+def _sql_mensal_debitos(usuario_id, ano, mes):
     from calendar import monthrange
-    conn = get_connection()
 
     ultimo = monthrange(ano, mes)[1]
     inicio = f"{ano}-{mes:02d}-01"
@@ -154,35 +420,36 @@ def gerar_relatorio_mensal_debitos(usuario_id, ano, mes):
         ORDER BY pd.data_vencimento, f.nome
     """
 
-    df = pd.read_sql(query, conn, params=[usuario_id, inicio, fim])
+    return query, [usuario_id, inicio, fim]
+
+
+def gerar_relatorio_mensal_debitos(usuario_id, ano, mes):
+    conn = get_connection()
+
+    query, params = _sql_mensal_debitos(usuario_id, ano, mes)
+    df = ler_dataframe(conn, query, params, colunas_dinheiro=("valor_parcela", "valor_pago"))
     conn.close()
 
     return df
 
 
+def iterar_relatorio_mensal_debitos(usuario_id, ano, mes, tamanho_lote=TAMANHO_LOTE_STREAM):
+    query, params = _sql_mensal_debitos(usuario_id, ano, mes)
+    return iterar_consulta(query, params, tamanho_lote)
+
+
 # ============================================================
 # 🧾 RELATÓRIO POR FORNECEDOR
 # ============================================================
 
-def gerar_relatorio_por_fornecedor(usuario_id, fornecedor_id, data_inicio=None, data_fim=None):
-    conn = get_connection()
-    cursor = conn.cursor()
+COLUNAS_PARCELAS_FORNECEDOR = [
+    "id", "data_vencimento", "descricao", "tipo_documento", "numero_parcela",
+    "quantidade_parcelas", "valor_parcela", "status", "status_cor",
+    "data_pagamento", "valor_pago",
+]
 
-    # Dados do fornecedor
-    cursor.execute("""
-        SELECT id, nome, cpf_cnpj, telefone, email
-        FROM fornecedores
-        WHERE id = %s AND usuario_id = %s
-    """, (fornecedor_id, usuario_id))
-
-    fornecedor = cursor.fetchone()
-    if not fornecedor:
-        conn.close()
-        return None
-
-    fornecedor_info = fornecedor
 
-    # Parcelas
+def _sql_parcelas_fornecedor(usuario_id, fornecedor_id, data_inicio, data_fim):
     query = """
         SELECT 
             pd.id,
@@ -216,7 +483,45 @@ def gerar_relatorio_por_fornecedor(usuario_id, fornecedor_id, data_inicio=None,
 
     query += " ORDER BY pd.data_vencimento DESC"
 
-    df_parcelas = pd.read_sql(query, conn, params=params)
+    return query, params
+
+
+def iterar_relatorio_por_fornecedor(
+    usuario_id,
+    fornecedor_id,
+    data_inicio=None,
+    data_fim=None,
+    tamanho_lote=TAMANHO_LOTE_STREAM,
+):
+    """Parcelas do relatório por fornecedor, em lotes."""
+    query, params = _sql_parcelas_fornecedor(usuario_id, fornecedor_id, data_inicio, data_fim)
+    return iterar_consulta(query, params, tamanho_lote)
+
+
+def gerar_relatorio_por_fornecedor(usuario_id, fornecedor_id, data_inicio=None, data_fim=None):
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # Dados do fornecedor
+    cursor.execute("""
+        SELECT id, nome, cpf_cnpj, telefone, email
+        FROM fornecedores
+        WHERE id = %s AND usuario_id = %s
+    """, (fornecedor_id, usuario_id))
+
+    fornecedor = cursor.fetchone()
+    if not fornecedor:
+        conn.close()
+        return None
+
+    fornecedor_info = fornecedor
+
+    # Parcelas
+    query, params = _sql_parcelas_fornecedor(usuario_id, fornecedor_id, data_inicio, data_fim)
+
+    df_parcelas = ler_dataframe(
+        conn, query, params, colunas_dinheiro=("valor_parcela", "valor_pago")
+    )
 
     # Estatísticas
     cursor.execute("""
@@ -233,9 +538,12 @@ def gerar_relatorio_por_fornecedor(usuario_id, fornecedor_id, data_inicio=None,
         AND ld.usuario_id = %s
     """, (fornecedor_id, usuario_id))
 
-    estatisticas = cursor.fetchone()
+    estatisticas = dict(cursor.fetchone())
     conn.close()
 
+    for campo in ("valor_em_aberto", "valor_pago"):
+        estatisticas[campo] = dinheiro.centavos(estatisticas[campo] or 0)
+
     return {
         "fornecedor": fornecedor_info,
         "parcelas": df_parcelas,
@@ -247,83 +555,183 @@ def gerar_relatorio_por_fornecedor(usuario_id, fornecedor_id, data_inicio=None,
 # 📊 RESUMO FINANCEIRO DO USUÁRIO (Dashboard)
 # ============================================================
 
-def get_resumo_financeiro(usuario_id, data_inicio=None, data_fim=None):
-    conn = get_connection()
-    cursor = conn.cursor()
+def _condicao_periodo(coluna, inicio, fim, params):
+    partes = []
 
-    # -----------------------------
-    # Créditos
-    # -----------------------------
-    where_cred = "WHERE usuario_id = %s"
-    params_cred = [usuario_id]
+    if inicio:
+        partes.append(f"{coluna} >= %s")
+        params.append(inicio)
 
-    if data_inicio:
-        where_cred += " AND data_recebimento >= %s"
-        params_cred.append(data_inicio)
+    if fim:
+        partes.append(f"{coluna} <= %s")
+        params.append(fim)
 
-    if data_fim:
-        where_cred += " AND data_recebimento <= %s"
-        params_cred.append(data_fim)
+    return " AND ".join(partes) if partes else "1 = 1"
 
-    cursor.execute(f"""
-        SELECT COALESCE(SUM(valor), 0) AS total_creditos
-        FROM lancamentos_credito
-        {where_cred}
-    """, params_cred)
-    total_creditos = float(cursor.fetchone()["total_creditos"])
 
-    # -----------------------------
-    # Débitos totais
-    # -----------------------------
-    where_deb = "WHERE ld.usuario_id = %s"
-    params_deb = [usuario_id]
+def _limites_periodos(coluna, janelas, params):
+    """Restringe a varredura ao intervalo que cobre todas as janelas."""
+    inicios = [ini for ini, _ in janelas]
+    fins = [fim for _, fim in janelas]
 
-    if data_inicio:
-        where_deb += " AND pd.data_vencimento >= %s"
-        params_deb.append(data_inicio)
+    limites = ""
+    if all(inicios):
+        limites += f" AND {coluna} >= %s"
+        params.append(min(inicios))
+    if all(fins):
+        limites += f" AND {coluna} <= %s"
+        params.append(max(fins))
+    return limites
 
-    if data_fim:
-        where_deb += " AND pd.data_vencimento <= %s"
-        params_deb.append(data_fim)
 
-    cursor.execute(f"""
-        SELECT COALESCE(SUM(pd.valor_parcela), 0) AS total_debitos
-        FROM parcelas_debito pd
-        INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
-        {where_deb}
-    """, params_deb)
-    total_debitos = float(cursor.fetchone()["total_debitos"])
+def _dividir_janela(data_inicio, data_fim):
+    """
+    Separa a janela em meses inteiros e bordas de mês parcial, como o
+    _sql_saldo_anterior: os meses vêm do resumo_mensal e só as bordas
+    são somadas nos lançamentos.
+
+    Retorna ((primeiro dia, último dia) dos meses inteiros ou None,
+    [(início, fim) de cada borda]).
+    """
+    data_inicio, data_fim = _data_iso(data_inicio), _data_iso(data_fim)
+
+    primeiro = data_inicio
+    if data_inicio is not None and data_inicio.day != 1:
+        primeiro = (data_inicio.replace(day=1) + timedelta(days=32)).replace(day=1)
+    ultimo = data_fim
+    if data_fim is not None and not resumo_mensal.janela_alinhada(None, data_fim):
+        ultimo = data_fim.replace(day=1) - timedelta(days=1)
+
+    if primeiro is not None and ultimo is not None and primeiro > ultimo:
+        return None, [(data_inicio, data_fim)]
+
+    bordas = []
+    if data_inicio is not None and data_inicio != primeiro:
+        bordas.append((data_inicio, primeiro - timedelta(days=1)))
+    if data_fim is not None and data_fim != ultimo:
+        bordas.append((ultimo + timedelta(days=1), data_fim))
+    return (primeiro, ultimo), bordas
+
+
+def _condicao_bordas(coluna, bordas, params):
+    if not bordas:
+        return "1 = 0"
+    return " OR ".join(
+        f"({_condicao_periodo(coluna, ini, fim, params)})" for ini, fim in bordas
+    )
+
+
+def _somar_bordas(cursor, usuario_id, bordas_por_janela):
+    """
+    Totais dos lançamentos nas bordas de cada janela (uma consulta,
+    agregação condicional). Devolve um dict por janela, campos do
+    resumo_mensal.
+    """
+    todas = [b for bordas in bordas_por_janela for b in bordas]
 
     # -----------------------------
-    # Débitos em aberto (status 1 e 3)
+    # Créditos: uma coluna por janela
     # -----------------------------
-    cursor.execute(f"""
-        SELECT COALESCE(SUM(pd.valor_parcela), 0) AS debitos_em_aberto
-        FROM parcelas_debito pd
-        INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
-        {where_deb} AND pd.status_id IN (1,3)
-    """, params_deb)
-    debitos_em_aberto = float(cursor.fetchone()["debitos_em_aberto"])
+    colunas_cred, params_cred = [], []
+    for i, bordas in enumerate(bordas_por_janela):
+        cond = _condicao_bordas("lc.data_recebimento", bordas, params_cred)
+        colunas_cred.append(
+            f"COALESCE(SUM(CASE WHEN {cond} THEN lc.valor ELSE 0 END), 0) AS total_creditos_{i}"
+        )
+
+    params_cred.append(usuario_id)
+    where_cred = "WHERE lc.usuario_id = %s"
+    where_cred += _limites_periodos("lc.data_recebimento", todas, params_cred)
 
     # -----------------------------
-    # Débitos pagos (status 2)
+    # Débitos: total, em aberto (1 e 3) e pagos (2) por janela
     # -----------------------------
+    colunas_deb, params_deb = [], []
+    for i, bordas in enumerate(bordas_por_janela):
+        cond = _condicao_bordas("pd.data_vencimento", bordas, params_deb)
+        cond_aberto = _condicao_bordas("pd.data_vencimento", bordas, params_deb)
+        cond_pago = _condicao_bordas("pd.data_vencimento", bordas, params_deb)
+        colunas_deb += [
+            f"COALESCE(SUM(CASE WHEN {cond} "
+            f"THEN pd.valor_parcela ELSE 0 END), 0) AS debitos_previstos_{i}",
+            f"COALESCE(SUM(CASE WHEN ({cond_aberto}) AND pd.status_id IN (1,3) "
+            f"THEN pd.valor_parcela ELSE 0 END), 0) AS debitos_em_aberto_{i}",
+            f"COALESCE(SUM(CASE WHEN ({cond_pago}) AND pd.status_id = 2 "
+            f"THEN COALESCE(pd.valor_pago, pd.valor_parcela) ELSE 0 END), 0) AS debitos_pagos_{i}",
+        ]
+
+    params_deb.append(usuario_id)
+    where_deb = "WHERE ld.usuario_id = %s"
+    where_deb += _limites_periodos("pd.data_vencimento", todas, params_deb)
+
     cursor.execute(f"""
-        SELECT COALESCE(SUM(COALESCE(pd.valor_pago, pd.valor_parcela)), 0) AS debitos_pagos
-        FROM parcelas_debito pd
-        INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
-        {where_deb} AND pd.status_id = 2
-    """, params_deb)
-    debitos_pagos = float(cursor.fetchone()["debitos_pagos"])
+        SELECT cred.*, deb.*
+        FROM (
+            SELECT {', '.join(colunas_cred)}
+            FROM lancamentos_credito lc
+            {where_cred}
+        ) cred
+        CROSS JOIN (
+            SELECT {', '.join(colunas_deb)}
+            FROM parcelas_debito pd
+            INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
+            {where_deb}
+        ) deb
+    """, params_cred + params_deb)
+
+    row = cursor.fetchone()
+    return [
+        {campo: row[f"{campo}_{i}"] for campo in resumo_mensal.CAMPOS}
+        for i in range(len(bordas_por_janela))
+    ]
+
+
+def get_resumo_financeiro(usuario_id, data_inicio=None, data_fim=None, janelas=None):
+    """
+    Totais do dashboard. Os valores saem em Centavos (dinheiro.py).
 
-    conn.close()
+    Cada janela é dividida em meses inteiros, lidos do resumo_mensal,
+    e bordas de mês parcial, somadas nos lançamentos: no máximo uma
+    consulta de cada tipo, qualquer que seja o número de janelas.
 
-    saldo = total_creditos - total_debitos
+    Com `janelas` — lista de (data_inicio, data_fim) — devolve uma lista
+    de resumos na mesma ordem.
+    """
+    periodos = list(janelas) if janelas is not None else [(data_inicio, data_fim)]
+    if not periodos:
+        return []
 
-    return {
-        "total_creditos": total_creditos,
-        "total_debitos": total_debitos,
-        "debitos_em_aberto": debitos_em_aberto,
-        "debitos_pagos": debitos_pagos,
-        "saldo": saldo,
-    }
+    partes = [_dividir_janela(ini, fim) for ini, fim in periodos]
+    totais = [dict.fromkeys(resumo_mensal.CAMPOS, Decimal("0")) for _ in periodos]
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    com_meses = [i for i, (meses, _) in enumerate(partes) if meses is not None]
+    if com_meses:
+        mensais = resumo_mensal.ler_resumos(cursor, usuario_id, [partes[i][0] for i in com_meses])
+        for i, m in zip(com_meses, mensais):
+            for campo in resumo_mensal.CAMPOS:
+                totais[i][campo] += _decimal(m[campo])
+
+    if any(bordas for _, bordas in partes):
+        somas = _somar_bordas(cursor, usuario_id, [bordas for _, bordas in partes])
+        for total, soma in zip(totais, somas):
+            for campo in resumo_mensal.CAMPOS:
+                total[campo] += _decimal(soma[campo])
+
+    conn.close()
+
+    resumos = []
+    for t in totais:
+        total_creditos = dinheiro.centavos(t["total_creditos"])
+        total_debitos = dinheiro.centavos(t["debitos_previstos"])
+        resumos.append({
+            "total_creditos": total_creditos,
+            "total_debitos": total_debitos,
+            "debitos_em_aberto": dinheiro.centavos(t["debitos_em_aberto"]),
+            "debitos_pagos": dinheiro.centavos(t["debitos_pagos"]),
+            "saldo": total_creditos - total_debitos,
+        })
+
+    return resumos if janelas is not None else resumos[0]
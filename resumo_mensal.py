@@ -0,0 +1,266 @@
+# ============================================
+# FILE: resumo_mensal.py
+# Resumo mensal materializado (usuario_id, ano, mes)
+#
+# Guarda, por mês, o total de créditos e os débitos previstos,
+# pagos e em aberto. creditos.py e debitos.py aplicam deltas na
+# mesma transação da escrita; reconstruir()/verificar() refazem ou
+# conferem a tabela a partir dos lançamentos.
+# ============================================
+
+from calendar import monthrange
+from datetime import date
+from decimal import Decimal
+
+from database import get_connection, inserir_em_lote
+
+CAMPOS = ("total_creditos", "debitos_previstos", "debitos_pagos", "debitos_em_aberto")
+
+
+# ============================================================
+# 🧮 Contribuições
+# ============================================================
+
+def _dec(valor):
+    if valor is None:
+        return Decimal("0")
+    if isinstance(valor, Decimal):
+        return valor
+    return Decimal(str(valor))
+
+
+def _ano_mes(data):
+    if isinstance(data, str):
+        return int(data[:4]), int(data[5:7])
+    return data.year, data.month
+
+
+def contribuicao_parcela(valor_parcela, status_id, valor_pago=None):
+    """Quanto uma parcela soma em cada campo do resumo do seu mês."""
+    valor = _dec(valor_parcela)
+    pago = _dec(valor_pago) if valor_pago is not None else valor
+    return {
+        "debitos_previstos": valor,
+        "debitos_em_aberto": valor if status_id in (1, 3) else Decimal("0"),
+        "debitos_pagos": pago if status_id == 2 else Decimal("0"),
+    }
+
+
+def negativo(contribuicao):
+    return {campo: -valor for campo, valor in contribuicao.items()}
+
+
+# ============================================================
+# ✍️ Atualização incremental (na transação de quem chama)
+# ============================================================
+
+def registrar_deltas(cursor, usuario_id, deltas):
+    """
+    Aplica deltas ao resumo do usuário.
+    deltas: iterável de (data, {campo: valor}) — a data define o mês.
+    Não faz commit: roda na transação da escrita que originou o delta.
+    """
+    por_mes = {}
+    for data, valores in deltas:
+        acumulado = por_mes.setdefault(_ano_mes(data), dict.fromkeys(CAMPOS, Decimal("0")))
+        for campo, valor in valores.items():
+            acumulado[campo] += _dec(valor)
+
+    linhas = [
+        (usuario_id, ano, mes) + tuple(valores[c] for c in CAMPOS)
+        for (ano, mes), valores in por_mes.items()
+        if any(valores.values())
+    ]
+    if not linhas:
+        return
+
+    inserir_em_lote(cursor, f"""
+        INSERT INTO resumo_mensal (usuario_id, ano, mes, {', '.join(CAMPOS)})
+        VALUES %s
+        ON CONFLICT (usuario_id, ano, mes) DO UPDATE SET
+            {', '.join(f"{c} = resumo_mensal.{c} + excluded.{c}" for c in CAMPOS)}
+    """, linhas)
+
+
+# ============================================================
+# 📖 Leitura por janelas alinhadas ao mês
+# ============================================================
+
+def janela_alinhada(data_inicio, data_fim):
+    """True se a janela começa no dia 1 e termina no último dia do mês."""
+    if data_inicio is not None and (not isinstance(data_inicio, date) or data_inicio.day != 1):
+        return False
+    if data_fim is not None:
+        if not isinstance(data_fim, date):
+            return False
+        if data_fim.day != monthrange(data_fim.year, data_fim.month)[1]:
+            return False
+    return True
+
+
+def ler_resumos(cursor, usuario_id, janelas):
+    """
+    Totais por janela lidos do resumo mensal (uma consulta).
+    Todas as janelas devem estar alinhadas ao mês.
+    """
+    colunas, params = [], []
+    for i, (ini, fim) in enumerate(janelas):
+        condicoes = []
+        if ini:
+            condicoes.append("ano * 100 + mes >= %s")
+        if fim:
+            condicoes.append("ano * 100 + mes <= %s")
+        cond = " AND ".join(condicoes) if condicoes else "1 = 1"
+
+        for campo in CAMPOS:
+            colunas.append(f"COALESCE(SUM(CASE WHEN {cond} THEN {campo} ELSE 0 END), 0) AS {campo}_{i}")
+            if ini:
+                params.append(ini.year * 100 + ini.month)
+            if fim:
+                params.append(fim.year * 100 + fim.month)
+
+    params.append(usuario_id)
+    cursor.execute(f"""
+        SELECT {', '.join(colunas)}
+        FROM resumo_mensal
+        WHERE usuario_id = %s
+    """, params)
+
+    row = cursor.fetchone()
+    return [
+        {campo: row[f"{campo}_{i}"] for campo in CAMPOS}
+        for i in range(len(janelas))
+    ]
+
+
+# ============================================================
+# 🔁 Reconstrução e verificação
+# ============================================================
+
+def _sql_esperado(dialeto, filtro_usuario):
+    if dialeto == "postgres":
+        ano = "CAST(EXTRACT(YEAR FROM {}) AS INTEGER)"
+        mes = "CAST(EXTRACT(MONTH FROM {}) AS INTEGER)"
+    else:
+        ano = "CAST(strftime('%Y', {}) AS INTEGER)"
+        mes = "CAST(strftime('%m', {}) AS INTEGER)"
+
+    where_cred = "WHERE lc.usuario_id = %s" if filtro_usuario else ""
+    where_deb = "WHERE ld.usuario_id = %s" if filtro_usuario else ""
+
+    return f"""
+        SELECT usuario_id, ano, mes,
+               SUM(cred) AS total_creditos,
+               SUM(prev) AS debitos_previstos,
+               SUM(pago) AS debitos_pagos,
+               SUM(aberto) AS debitos_em_aberto
+        FROM (
+            SELECT
+                lc.usuario_id,
+                {ano.format("lc.data_recebimento")} AS ano,
+                {mes.format("lc.data_recebimento")} AS mes,
+                lc.valor AS cred, 0 AS prev, 0 AS pago, 0 AS aberto
+            FROM lancamentos_credito lc
+            {where_cred}
+
+            UNION ALL
+
+            SELECT
+                ld.usuario_id,
+                {ano.format("pd.data_vencimento")},
+                {mes.format("pd.data_vencimento")},
+                0,
+                pd.valor_parcela,
+                CASE WHEN pd.status_id = 2
+                     THEN COALESCE(pd.valor_pago, pd.valor_parcela) ELSE 0 END,
+                CASE WHEN pd.status_id IN (1, 3) THEN pd.valor_parcela ELSE 0 END
+            FROM parcelas_debito pd
+            INNER JOIN lancamentos_debito ld ON pd.lancamento_debito_id = ld.id
+            {where_deb}
+        ) t
+        GROUP BY usuario_id, ano, mes
+    """
+
+
+def reconstruir(usuario_id=None):
+    """Refaz o resumo (de um usuário ou de todos) a partir dos lançamentos."""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        params = [usuario_id, usuario_id] if usuario_id else []
+
+        if usuario_id:
+            cursor.execute("DELETE FROM resumo_mensal WHERE usuario_id = %s", (usuario_id,))
+        else:
+            cursor.execute("DELETE FROM resumo_mensal")
+
+        cursor.execute(f"""
+            INSERT INTO resumo_mensal (usuario_id, ano, mes, {', '.join(CAMPOS)})
+            {_sql_esperado(conn.dialeto, usuario_id)}
+        """, params)
+
+        linhas = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return True, linhas
+
+    except Exception as e:
+        conn.rollback()
+        conn.close()
+        return False, str(e)
+
+
+def verificar(usuario_id=None):
+    """
+    Compara o resumo gravado com o recalculado.
+    Retorna lista de divergências (usuario_id, ano, mes, campo, esperado, gravado).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    params = [usuario_id, usuario_id] if usuario_id else []
+    cursor.execute(_sql_esperado(conn.dialeto, usuario_id), params)
+    esperado = {(r["usuario_id"], r["ano"], r["mes"]): r for r in cursor.fetchall()}
+
+    if usuario_id:
+        cursor.execute("SELECT * FROM resumo_mensal WHERE usuario_id = %s", (usuario_id,))
+    else:
+        cursor.execute("SELECT * FROM resumo_mensal")
+    gravado = {(r["usuario_id"], r["ano"], r["mes"]): r for r in cursor.fetchall()}
+    conn.close()
+
+    divergencias = []
+    for chave in sorted(set(esperado) | set(gravado)):
+        for campo in CAMPOS:
+            valor_esperado = _dec(esperado[chave][campo]) if chave in esperado else Decimal("0")
+            valor_gravado = _dec(gravado[chave][campo]) if chave in gravado else Decimal("0")
+            if abs(valor_esperado - valor_gravado) >= Decimal("0.005"):
+                divergencias.append((*chave, campo, valor_esperado, valor_gravado))
+
+    return divergencias
+
+
+# ============================================================
+# Execução direta
+# ============================================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manutenção do resumo mensal")
+    acao = parser.add_mutually_exclusive_group(required=True)
+    acao.add_argument("--reconstruir", action="store_true", help="Refaz a tabela resumo_mensal")
+    acao.add_argument("--verificar", action="store_true", help="Confere a tabela sem alterá-la")
+    parser.add_argument("--usuario", type=int, help="Restringe a um usuário")
+    args = parser.parse_args()
+
+    if args.reconstruir:
+        ok, resultado = reconstruir(args.usuario)
+        print(f"✔ {resultado} linhas reconstruídas." if ok else f"❌ Erro: {resultado}")
+    else:
+        divergencias = verificar(args.usuario)
+        for usuario, ano, mes, campo, esperado, gravado in divergencias:
+            print(f"❌ usuário {usuario} {mes:02d}/{ano} {campo}: esperado {esperado}, gravado {gravado}")
+        if not divergencias:
+            print("✔ Resumo mensal consistente.")
+        raise SystemExit(1 if divergencias else 0)